@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import argparse, time
+import numpy as np
+from chimera.fasta import FastaIO
+from chimera.align import align, score
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-uid', nargs=2, default=['NC_005831.2', 'NC_006213.1'])
+parser.add_argument('-sizes', type=int, nargs='+', default=[100, 200, 400, 800])
+parser.add_argument('-full', action='store_true', help='Also align the complete genomes (new engine only)')
+args = parser.parse_args(sys.argv[1:])
+
+# Reference: the original alignment.py dynamic programming loop, full score and traceback matrices
+def reference(seq1, seq2):
+    n, m = len(seq1), len(seq2)
+    score_matrix = np.zeros((n+1, m+1))
+    traceback_matrix = np.zeros((n+1, m+1))
+    score_matrix[0, 1:] = np.arange(-1, -m-1, -1)
+    score_matrix[1:, 0] = np.arange(-1, -n-1, -1)
+    for i in range(1, n+1):
+        for j in range(1, m+1):
+            match = score_matrix[i-1, j-1] + (seq1[i-1] == seq2[j-1])
+            delete = score_matrix[i-1, j] - 1
+            insert = score_matrix[i, j-1] - 1
+            scores = np.array([match, delete, insert])
+            score_matrix[i, j] = np.max(scores)
+            traceback_matrix[i, j] = np.argmax(scores)
+    return score_matrix[n, m]
+
+def timed(fn, *a):
+    t0 = time.perf_counter()
+    out = fn(*a)
+    return out, time.perf_counter() - t0
+
+f1, f2 = FastaIO(args.uid[0], lazy=True), FastaIO(args.uid[1], lazy=True)
+print(f"{args.uid[0]} ({len(f1.genome)}) vs {args.uid[1]} ({len(f2.genome)})")
+print(f"{'Bases':>8} | {'Reference':>10} | {'Score':>10} | {'Align':>10} | Speed-up")
+
+for size in args.sizes:
+    s1, s2 = f1.genome[:size], f2.genome[:size]
+    expected, t_ref = timed(reference, s1, s2)
+    result, t_score = timed(score, s1, s2)
+    (_, _, aligned), t_align = timed(align, s1, s2)
+    assert expected == result == aligned, size
+    print(f"{size:>8} | {t_ref:>9.3f}s | {t_score:>9.4f}s | {t_align:>9.4f}s | {t_ref/t_align:.0f}x")
+
+if args.full:
+    result, t_score = timed(score, f1.genome, f2.genome)
+    (_, _, aligned), t_align = timed(align, f1.genome, f2.genome)
+    assert result == aligned
+    print(f"{'Full':>8} | {'-':>10} | {t_score:>9.2f}s | {t_align:>9.2f}s | Score: {result:.0f}")
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import argparse, glob, os, time
+from chimera.compression import compressed_sizes
+from chimera.faidx import IndexedFasta
+from chimera.huffman import HuffmanCodec, decompress
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-directory', type=str, default='genome')
+parser.add_argument('-k', type=int, nargs='+', default=[1, 2, 3, 4], help='Symbol widths, 3 for codons')
+args = parser.parse_args(sys.argv[1:])
+
+# Huffman over the whole corpus against zlib and the 2-bit packing, every genome round tripped
+genomes = {}
+for path in sorted(glob.glob(os.path.join(args.directory, '*.fasta'))):
+    reader = IndexedFasta(path)
+    genomes[os.path.basename(path)] = reader.fetch(reader.records()[0])
+    reader.close()
+total = sum(len(seq) for seq in genomes.values())
+
+baseline = {'zlib': 0, '2bit': 0}
+for seq in genomes.values():
+    for codec, size in compressed_sizes(seq, codecs=tuple(baseline)).items():
+        baseline[codec] += size
+
+print(f"Genomes: {len(genomes)} | Bases: {total}")
+print(f"{'Codec':>10} | {'Bytes':>9} | {'Bits/base':>9} | {'Encode':>10} | {'Decode':>10}")
+for codec, size in baseline.items():
+    print(f"{codec:>10} | {size:>9} | {size * 8 / total:>9.3f} | {'-':>10} | {'-':>10}")
+
+for k in args.k:
+    size, encode, decode = 0, 0.0, 0.0
+    for name, seq in genomes.items():
+        t0 = time.perf_counter()
+        data = HuffmanCodec.fit(seq, k).encode(seq)
+        t1 = time.perf_counter()
+        assert decompress(data) == seq.encode('ascii'), (name, k)
+        t2 = time.perf_counter()
+        size, encode, decode = size + len(data), encode + t1 - t0, decode + t2 - t1
+    print(f"{'huffman-' + str(k):>10} | {size:>9} | {size * 8 / total:>9.3f} | {total / encode / 1e6:>5.1f} MB/s | {total / decode / 1e6:>5.1f} MB/s")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import argparse, glob, os
+from chimera import measure
+from chimera.align import align, score
+from chimera.benchmark import compare, ladder, load, measure as bench, missing, save
+from chimera.fasta import FastaIO
+from chimera.huffman import HuffmanCodec
+from chimera.render import average_hash, genome_hash, seq_to_pixels
+from chimera.structure import CellList, clashes, contacts, read_pdb
+from chimera.translate import translate
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-output', type=str, default=None, help='Write the results as JSON')
+parser.add_argument('-compare', type=str, default=None, help='Baseline JSON, exits with 1 when a case regresses or is missing')
+parser.add_argument('-current', type=str, default=None, help='Compare this results JSON instead of running the suite')
+parser.add_argument('-threshold', type=float, default=0.25, help='Allowed slowdown, 0.25 = 25%%')
+parser.add_argument('-memory_threshold', type=float, default=None, help='Allowed peak memory growth')
+parser.add_argument('-cases', type=str, nargs='+', default=None, help='Only run cases whose name contains one of these')
+parser.add_argument('-steps', type=int, default=4, help='Genomes on the size ladder')
+parser.add_argument('-slices', type=int, nargs='+', default=[250, 500, 1000], help='Alignment slice lengths')
+parser.add_argument('-align_uid', nargs=2, default=['NC_005831.2', 'NC_006213.1'])
+parser.add_argument('-repeat', type=int, default=3)
+parser.add_argument('-min_time', type=float, default=0.2, help='Seconds per timed run')
+args = parser.parse_args(sys.argv[1:])
+
+# Hot paths over a size ladder of the genome/ corpus and the hip/pdb structures.
+# Sizes are bases for sequence cases, residues for peptide metrics, bytes or atoms for PDB files.
+PEPTIDE_METRICS = ['peptype', 'molecular_weight', 'charge_at_pH', 'isoelectric_point', 'hydropathy_index',
+                   'atomic_composition', 'amino_count', 'charged_residues', 'extinction_coefficient',
+                   'instability_index', 'aliphatic_index']
+
+def selected(name):
+    return args.cases is None or any(c in name for c in args.cases)
+
+def cases():
+    # (name, input, size, unit, callable) of the selected cases, inputs are only prepared for those
+    genome_cases = ['fasta.load', 'translate', 'measure.gc_content', 'measure.compress', 'render.seq_to_pixels',
+                    'render.average_hash', 'render.genome_hash', 'huffman.encode'] + [f"measure.{m}" for m in PEPTIDE_METRICS]
+    paths = ladder(glob.glob('genome/*.fasta'), args.steps) if any(map(selected, genome_cases)) else []
+    for path in paths:
+        uid = os.path.basename(path)[:-len('.fasta')]
+        FASTA = FastaIO(uid, lazy=True, cache=None)
+        genome = FASTA.genome
+
+        for name, fn in (('fasta.load', lambda: FASTA.load(path)),
+                         ('translate', lambda: translate(genome)),
+                         ('measure.gc_content', lambda: measure.gc_content(genome)),
+                         ('measure.compress', lambda: measure.compress(genome))):
+            if selected(name):
+                yield name, uid, len(genome), 'bases', fn
+        metrics = [m for m in PEPTIDE_METRICS if selected(f"measure.{m}")]
+        if metrics:
+            peptides = [p for p in translate(genome).split('*') if len(p) >= 2]
+            residues = sum(map(len, peptides))
+        for metric in metrics:
+            fn = getattr(measure, metric)
+            if metric == 'charge_at_pH':
+                run = lambda: [measure.charge_at_pH(7.0, p) for p in peptides]
+            else:
+                run = lambda fn=fn: [fn(p) for p in peptides]
+            yield f"measure.{metric}", uid, residues, 'residues', run
+        if selected('render.seq_to_pixels'):
+            yield 'render.seq_to_pixels', uid, len(genome), 'bases', lambda: seq_to_pixels(genome)
+        if selected('render.average_hash'):
+            image = seq_to_pixels(genome)
+            yield 'render.average_hash', uid, len(genome), 'bases', lambda: average_hash(image)
+        if selected('render.genome_hash'):
+            yield 'render.genome_hash', uid, len(genome), 'bases', lambda: genome_hash(genome)
+        if selected('huffman.encode'):
+            yield 'huffman.encode', uid, len(genome), 'bases', lambda: HuffmanCodec.fit(genome, 2).encode(genome)
+
+    if selected('align.score') or selected('align.align'):
+        seq1 = FastaIO(args.align_uid[0], lazy=True, cache=None).genome
+        seq2 = FastaIO(args.align_uid[1], lazy=True, cache=None).genome
+        for size in args.slices:
+            s1, s2 = seq1[:size], seq2[:size]
+            for name, fn in (('align.score', lambda: score(s1, s2)), ('align.align', lambda: align(s1, s2))):
+                if selected(name):
+                    yield name, f"{size}x{size}", size * size, 'cells', fn
+
+    for path in sorted(glob.glob('hip/pdb/*.pdb'), key=os.path.getsize):
+        name = os.path.basename(path)
+        if selected('structure.read_pdb'):
+            yield 'structure.read_pdb', name, os.path.getsize(path), 'bytes', lambda: read_pdb(path)
+        if not any(map(selected, ('structure.pairs', 'structure.contacts', 'structure.clashes'))):
+            continue
+        atoms = read_pdb(path)
+        for case, fn in (('structure.pairs', lambda: CellList(atoms['coord'], 4.5).pairs(4.5)),
+                         ('structure.contacts', lambda: contacts(atoms)),
+                         ('structure.clashes', lambda: clashes(atoms))):
+            if selected(case):
+                yield case, name, len(atoms), 'atoms', fn
+
+def run():
+    results = []
+    print(f"{'Case':<34} | {'Input':<14} | {'Time':>10} | {'Peak memory':>11} | Throughput")
+    for name, input, size, unit, fn in cases():
+        result = bench(name, input, size, unit, fn, args.repeat, args.min_time)
+        print(f"{name:<34} | {input:<14} | {result['time']*1000:>8.3f}ms | {result['peak_memory']/2**20:>9.2f}MB | "
+              f"{result['throughput']:.3g} {unit}/s")
+        results.append(result)
+    return results
+
+results = load(args.current) if args.current else run()
+if args.output:
+    save(results, args.output)
+    print(f"{len(results)} results written to {args.output}")
+
+if args.compare:
+    rows = compare(load(args.compare), results, args.threshold, args.memory_threshold)
+    print(f"\n{'Case':<52} | {'Baseline':>10} | {'Current':>10} | {'Ratio':>6} | Memory")
+    for case, base, current, ratio, regressed in rows:
+        print(f"{case:<52} | {base['time']*1000:>8.3f}ms | {current['time']*1000:>8.3f}ms | {ratio:>5.2f}x | "
+              f"{current['peak_memory']/max(base['peak_memory'], 1):>5.2f}x{' REGRESSION' if regressed else ''}")
+    # Baseline cases left out by -cases are not expected, any other one that did not run fails the comparison
+    absent = [r for r in missing(load(args.compare), results) if selected(r['name'])]
+    for r in absent:
+        print(f"{r['name'] + ' [' + r['input'] + ']':<52} | MISSING")
+    regressions = [row for row in rows if row[-1]]
+    print(f"{len(rows)} cases compared, {len(regressions)} regressions (threshold {args.threshold:.0%}), {len(absent)} missing")
+    if regressions or absent:
+        sys.exit(1)
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import argparse, sys
+from chimera.catalog import COLUMNS, METRICS, Catalog
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-catalog', type=str, default='genome/catalog.db')
+parser.add_argument('-uid', type=str, nargs='+', default=None, help='Look genomes up by accession')
+parser.add_argument('-hash', type=str, default=None, help='Genomes with this average hash')
+parser.add_argument('-min_length', type=int, default=None)
+parser.add_argument('-max_length', type=int, default=None)
+parser.add_argument('-import_csv', type=str, default=None, help='Append the rows of a catalog CSV')
+parser.add_argument('-export_csv', type=str, default=None, help='Write the catalog as CSV, sorted by uid')
+parser.add_argument('-workers', type=int, default=None)
+args = parser.parse_args(sys.argv[1:])
+
+catalog = Catalog.open(args.catalog, workers=args.workers)
+if args.import_csv:
+    print(f"{catalog.import_csv(args.import_csv)} genomes imported from {args.import_csv}")
+    catalog.update(args.workers)
+
+if args.uid:
+    rows = [row for row in map(catalog.get, args.uid) if row]
+elif args.hash:
+    rows = catalog.by_hash(args.hash)
+elif args.min_length is not None or args.max_length is not None:
+    rows = catalog.by_length(args.min_length, args.max_length)
+else:
+    rows = []
+
+for row in rows:
+    print(' | '.join(f"{row[c]:.2f}" if isinstance(row[c], float) else str(row[c]) for c in COLUMNS + METRICS))
+if args.export_csv:
+    catalog.export_csv(args.export_csv)
+    print(f"{len(catalog)} genomes written to {args.export_csv}")
+print(f"Catalog: {len(catalog)} genomes")
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+import collections
+import numpy as np
+from chimera.translate import AMBIGUOUS, encode_bases
+
+# A gap of length L scores gap_open + (L-1) * gap_extend, defaults reproduce alignment.py (+1 match | 0 mismatch | -1 per gap)
+Scoring = collections.namedtuple('Scoring', ['match', 'mismatch', 'gap_open', 'gap_extend'], defaults=[1, 0, -1, -1])
+
+def score_type(scoring):
+    # Integer scores run on int32 rows, half the memory traffic of float64
+    return np.int32 if all(float(v).is_integer() for v in scoring) else np.float64
+
+def substitution(scoring):
+    matrix = np.full((AMBIGUOUS+1, AMBIGUOUS+1), scoring.mismatch, dtype=score_type(scoring))
+    matrix[np.arange(AMBIGUOUS), np.arange(AMBIGUOUS)] = scoring.match # Ambiguous bases never match
+    return matrix
+
+def gap_costs(scoring):
+    if scoring.gap_open > scoring.gap_extend or scoring.gap_extend > 0:
+        raise ValueError("Gap scores must satisfy gap_open <= gap_extend <= 0")
+    dtype = score_type(scoring)
+    return dtype(scoring.gap_open - scoring.gap_extend), dtype(scoring.gap_extend) # g (opening surcharge), h (per base)
+
+def forward(a, b, subst, g, h, tb):
+    # Gotoh recurrences one row at a time over the whole of b, linear memory.
+    # CC[j]: best score of a[:i] vs b[:j] | DD[j]: best score ending in a deletion (a[i-1] against a gap)
+    # tb: opening score of a deletion run that starts at the top-left corner
+    # The insertion chain within a row is resolved with a running maximum instead of a per-cell loop.
+    n, dtype = len(b), subst.dtype
+    g, h, tb = dtype.type(g), dtype.type(h), dtype.type(tb)
+    hcols = h * np.arange(n + 1, dtype=dtype)
+    CC = hcols + g
+    CC[0] = 0
+    DD = np.full(n + 1, np.iinfo(dtype).min // 2 if dtype.kind == 'i' else -np.inf, dtype=dtype)
+    T, E = np.empty(n + 1, dtype=dtype), np.empty(n + 1, dtype=dtype)
+    rows = subst[:, b]
+
+    for i in range(1, len(a) + 1):
+        c0 = tb + h * i
+        np.add(CC[:-1], rows[a[i-1]], out=E[1:])                # Diagonal
+        np.add(CC, g, out=CC)
+        np.maximum(DD, CC, out=DD)
+        np.add(DD, h, out=DD)
+        DD[0] = T[0] = c0
+        np.maximum(DD[1:], E[1:], out=T[1:])
+        np.subtract(T, hcols, out=E)
+        np.maximum.accumulate(E, out=E)
+        np.add(E[:-1], hcols[1:], out=CC[1:])                   # Insertion
+        np.add(CC[1:], g, out=CC[1:])
+        np.maximum(CC[1:], T[1:], out=CC[1:])
+        CC[0] = c0
+    return CC, DD
+
+def gap(length, g, h):
+    return g + h * length if length > 0 else 0
+
+def diff(a, b, subst, g, h, tb, te, ops):
+    # Myers-Miller divide and conquer: split a in half, find where the optimal path crosses the middle row
+    # from a forward and a reverse pass, then solve both halves. tb / te are the deletion opening scores
+    # at the top-left and bottom-right corners, 0 when the gap continues from a neighbouring subproblem.
+    m, n = len(a), len(b)
+    if n == 0:
+        ops.append(('D', m))
+        return
+    if m == 0:
+        ops.append(('I', n))
+        return
+    if m == 1:
+        j = np.arange(1, n + 1)
+        aligned = (np.where(j > 1, g + h * (j - 1), 0) + subst[a[0], b] +
+                   np.where(j < n, g + h * (n - j), 0))
+        best = int(np.argmax(aligned))
+        if max(tb, te) + h + gap(n, g, h) > aligned[best]:
+            ops.extend([('D', 1), ('I', n)] if tb >= te else [('I', n), ('D', 1)])
+        else:
+            ops.extend([('I', best), ('M', 1), ('I', n - best - 1)])
+        return
+
+    mid = m // 2
+    CC, DD = forward(a[:mid], b, subst, g, h, tb)
+    RR, SS = forward(a[mid:][::-1], b[::-1], subst, g, h, te)
+    RR, SS = RR[::-1], SS[::-1]
+    join = CC + RR
+    split = DD + SS - g
+    j1, j2 = int(np.argmax(join)), int(np.argmax(split))
+    if join[j1] >= split[j2]:
+        diff(a[:mid], b[:j1], subst, g, h, tb, g, ops)
+        diff(a[mid:], b[j1:], subst, g, h, g, te, ops)
+    else:
+        diff(a[:mid-1], b[:j2], subst, g, h, tb, 0, ops)
+        ops.append(('D', 2))
+        diff(a[mid+1:], b[j2:], subst, g, h, 0, te, ops)
+
+def score(seq1, seq2, scoring=Scoring()):
+    g, h = gap_costs(scoring)
+    a, b = encode_bases(seq1), encode_bases(seq2)
+    CC, _ = forward(a, b, substitution(scoring), g, h, g)
+    return float(CC[-1])
+
+def align(seq1, seq2, scoring=Scoring()):
+    g, h = gap_costs(scoring)
+    a, b = encode_bases(seq1), encode_bases(seq2)
+    ops = []
+    diff(a, b, substitution(scoring), g, h, g, g, ops)
+
+    # Expand the edit transcript into gapped strings
+    s1, s2 = str(seq1), str(seq2)
+    i = j = 0
+    aligned1, aligned2 = [], []
+    for op, count in ops:
+        if count == 0:
+            continue
+        if op == 'M':
+            aligned1.append(s1[i: i+count])
+            aligned2.append(s2[j: j+count])
+            i, j = i + count, j + count
+        elif op == 'D':
+            aligned1.append(s1[i: i+count])
+            aligned2.append('-' * count)
+            i += count
+        else:
+            aligned1.append('-' * count)
+            aligned2.append(s2[j: j+count])
+            j += count
+    aligned1, aligned2 = ''.join(aligned1), ''.join(aligned2)
+    return aligned1, aligned2, alignment_score(aligned1, aligned2, scoring)
+
+def alignment_score(aligned1, aligned2, scoring=Scoring()):
+    x = np.frombuffer(aligned1.encode('ascii'), dtype=np.uint8)
+    y = np.frombuffer(aligned2.encode('ascii'), dtype=np.uint8)
+    dash = ord('-')
+    pairs = (x != dash) & (y != dash)
+    same = pairs & (x == y) & (encode_bases(aligned1) != AMBIGUOUS)
+    total = scoring.match * same.sum() + scoring.mismatch * (pairs & ~same).sum()
+    for gaps in (x == dash, y == dash):
+        edges = np.diff(np.concatenate(([0], gaps.view(np.int8), [0])))
+        runs = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+        total += scoring.gap_open * len(runs) + scoring.gap_extend * (runs - 1).sum()
+    return float(total)
+
+def identity(aligned1, aligned2):
+    x = np.frombuffer(aligned1.encode('ascii'), dtype=np.uint8)
+    y = np.frombuffer(aligned2.encode('ascii'), dtype=np.uint8)
+    return int(np.count_nonzero((x == y) & (x != ord('-'))))
+
+# Local hit from a banded extension: coordinates are 0-based, ends exclusive
+Extension = collections.namedtuple('Extension', ['score', 'start1', 'end1', 'start2', 'end2', 'matches', 'columns'])
+
+def banded_local(seq1, targets, diagonals, band, scoring=Scoring(2, -3, -5, -2)):
+    # Smith-Waterman of seq1 against each target, restricted to a band of +/- band columns around j = i + diagonal.
+    # Row i holds cells j = i + diagonal - band + d for d in [0, 2 * band], so the diagonal predecessor
+    # keeps d, the deletion predecessor is d + 1 of the previous row and the insertion predecessor d - 1.
+    # All targets advance through the rows of seq1 together, memory is one traceback byte per band cell.
+    g, h = gap_costs(scoring)
+    a = encode_bases(seq1)
+    targets = [encode_bases(t) for t in targets]
+    subst = substitution(scoring).astype(np.float64)
+    count, width = len(targets), 2 * band + 1
+    if len(a) == 0 or count == 0:
+        return [Extension(0.0, 0, 0, 0, 0, 0, 0) for _ in targets]
+
+    # Targets are laid end to end, cells are gathered through per-target offsets
+    lengths = np.array([len(t) for t in targets])[:, None]
+    starts = np.concatenate(([0], np.cumsum(lengths[:, 0])[:-1]))[:, None]
+    b = np.concatenate(targets + [np.full(1, AMBIGUOUS, dtype=np.uint8)])
+    diagonals = np.asarray(diagonals)[:, None]
+    offsets = np.arange(width)[None, :]
+    hcols = h * offsets
+    neg = -np.inf
+
+    j = diagonals - band + offsets
+    H = np.where((j >= 0) & (j <= lengths), 0.0, neg)
+    F = np.full((count, width), neg)
+    column = np.full((count, 1), neg)
+    trace = np.zeros((len(a) + 1, count, width), dtype=np.uint8)    # 2 bits source of H | bit 2: F extends | bit 3: E extends
+    best = np.zeros(count)
+    best_cell = np.zeros((count, 2), dtype=np.int64)
+    rows = np.arange(count)
+    for i in range(1, len(a) + 1):
+        j += 1
+        valid = (j >= 1) & (j <= lengths)
+        diag = H + np.where(valid, subst[a[i-1], b[np.where(valid, starts + j - 1, -1)]], neg)
+
+        up = np.concatenate((H[:, 1:], column), axis=1) + g
+        F_ext = np.concatenate((F[:, 1:], column), axis=1)
+        F = np.maximum(F_ext, up) + h
+        F_flag = F_ext >= up
+
+        T = np.maximum(np.maximum(diag, F), 0.0)
+        T[~valid] = neg
+        E = np.maximum.accumulate(T - hcols, axis=1)
+        E = np.concatenate((column, E[:, :-1] + g + hcols[:, 1:]), axis=1)
+        H = np.maximum(T, E)
+        H[~valid] = neg
+        H[j == 0] = 0.0                                             # Local alignments may start anywhere along a target
+
+        # Extension flag of E from the finished row: extension wins when E[d-1] + h >= H[d-1] + g + h
+        E_flag = np.concatenate((np.zeros((count, 1), dtype=bool), E[:, :-1] >= H[:, :-1] + g), axis=1)
+        source = np.select([H <= 0, H == diag, H == F], [0, 1, 2], 3)
+        trace[i] = source | F_flag << 2 | E_flag << 3
+        F[~valid] = neg
+
+        d = np.argmax(H, axis=1)
+        improved = H[rows, d] > best
+        best[improved] = H[rows, d][improved]
+        best_cell[improved] = np.stack([np.full(count, i), d], axis=1)[improved]
+
+    return [traceback_local(a, targets[c], trace[:, c], int(diagonals[c, 0]), band, float(best[c]), *best_cell[c])
+            for c in range(count)]
+
+def traceback_local(a, b, trace, diagonal, band, best, i, d):
+    # Walk back from the best cell until the score drops to zero
+    end1, end2 = i, i + diagonal - band + d
+    matches = columns = 0
+    state = 0
+    while i > 0 and best > 0:
+        flags = trace[i, d]
+        if state == 0:
+            source = flags & 3
+            if source == 0:
+                break
+            if source == 1:
+                matches += int(a[i-1] == b[i + diagonal - band + d - 1] and a[i-1] != AMBIGUOUS)
+                columns += 1
+                i -= 1
+                continue
+            state = source - 1
+        if state == 1:                                              # Deletion: seq1 base against a gap
+            columns += 1
+            state = 1 if flags >> 2 & 1 else 0
+            i, d = i - 1, d + 1
+        else:                                                       # Insertion: target base against a gap
+            columns += 1
+            state = 2 if flags >> 3 & 1 else 0
+            d -= 1
+    if best <= 0:
+        return Extension(0.0, 0, 0, 0, 0, 0, 0)
+    return Extension(best, int(i), int(end1), int(i + diagonal - band + d), int(end2), matches, columns)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import datetime, json, os, platform, subprocess, sys, time, tracemalloc
+import numpy as np
+
+# Benchmark harness: every case is timed over enough loops to run for at least MIN_TIME, the best of `repeat` runs
+# is kept, then one more traced call gives the peak memory allocated by the case (numpy buffers included).
+# Results are plain dicts so a run is saved as JSON and compared against a stored baseline.
+MIN_TIME = 0.2
+
+def timed(fn, repeat=3, min_time=MIN_TIME):
+    # Seconds per call, best and mean of the runs, loops doubled until a run lasts min_time
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time:
+            break
+        loops *= 2
+    runs = [elapsed / loops]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        runs.append((time.perf_counter() - t0) / loops)
+    return min(runs), sum(runs) / len(runs), loops
+
+def peak_memory(fn):
+    # Bytes allocated at the peak of a single call
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def measure(name, input, size, unit, fn, repeat=3, min_time=MIN_TIME):
+    best, mean, loops = timed(fn, repeat, min_time)
+    return {
+        'name': name,
+        'input': input,
+        'size': size,
+        'unit': unit,
+        'time': best,
+        'mean': mean,
+        'loops': loops,
+        'repeat': repeat,
+        'peak_memory': peak_memory(fn),
+        'throughput': size / best if best else float('inf'),
+        }
+
+def ladder(paths, steps=4):
+    # Files nearest to `steps` sizes spaced geometrically between the smallest and the largest
+    sizes = {path: os.path.getsize(path) for path in paths}
+    if len(sizes) <= steps:
+        return sorted(sizes, key=sizes.get)
+    targets = np.geomspace(min(sizes.values()), max(sizes.values()), steps)
+    chosen = []
+    for target in targets:
+        path = min((p for p in sizes if p not in chosen), key=lambda p: abs(np.log(sizes[p] / target)))
+        chosen.append(path)
+    return sorted(chosen, key=sizes.get)
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'argv': sys.argv[1:],
+        }
+
+def save(results, path):
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=1)
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)['results']
+
+def compare(baseline, current, threshold=0.25, memory_threshold=None):
+    # (case, baseline, current, ratio, regressed) for every case found in both runs, matched on name and input
+    # A case regresses when its time grows by more than `threshold` (0.25 = 25% slower), or its peak memory by
+    # more than memory_threshold when one is given
+    reference = {(r['name'], r['input']): r for r in baseline}
+    rows = []
+    for result in current:
+        base = reference.get((result['name'], result['input']))
+        if base is None:
+            continue
+        ratio = result['time'] / base['time'] if base['time'] else 1.0
+        regressed = ratio > 1 + threshold
+        if memory_threshold is not None and base['peak_memory']:
+            regressed |= result['peak_memory'] / base['peak_memory'] > 1 + memory_threshold
+        rows.append((f"{result['name']} [{result['input']}]", base, result, ratio, regressed))
+    return rows
+
+def missing(baseline, current):
+    # Baseline results without a case of the same name and input in the current run
+    found = {(r['name'], r['input']) for r in current}
+    return [r for r in baseline if (r['name'], r['input']) not in found]
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+import hashlib, os, pickle, time
+from chimera.trace import traced
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Content-addressed disk cache: entries are keyed by the SHA-1 of the input file and of the source of the code
+# that produced them, so editing either one simply misses the old entries, which age out.
+# Entries are written to a temporary file then renamed, readers never see a partial entry and any number of
+# processes can share the directory. Reads refresh the modification time. Writers keep a running total of the
+# entry sizes in the .size file, once it grows past max_bytes one scan removes the least recently used entries
+# down to LOW_WATER of the limit, along with temporary files left by crashed writers.
+# CHIMERA_CACHE sets the directory ('off' disables caching), CHIMERA_CACHE_SIZE the limit in bytes.
+MISSING = object()
+CHUNK = 1 << 20
+LOW_WATER = 0.75    # Share of max_bytes left after an eviction, so the scan runs once per many writes
+STALE = 3600        # Seconds after which a temporary file belongs to a writer that is gone
+
+def code_version(*modules):
+    h = hashlib.sha1()
+    for module in modules:
+        with open(module.__file__, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+class DiskCache():
+    def __init__(self, directory='genome/cache', max_bytes=1 << 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, *parts):
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.pkl')
+
+    @traced('cache.get')
+    def get(self, key, default=None):
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):    # Missing, evicted meanwhile or unreadable
+            return default
+        return value
+
+    @traced('cache.put')
+    def put(self, key, value):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        size = os.path.getsize(temporary)
+        try:
+            size -= os.path.getsize(path)       # Replaced entry
+        except OSError:
+            pass
+        os.replace(temporary, path)
+        with self.locked():
+            total = self.account(size)
+        if total > self.max_bytes:
+            self.evict()
+
+    def memoize(self, key, fn):
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = fn()
+            self.put(key, value)
+        return value
+
+    def entries(self, suffix='.pkl'):
+        # (last use, size, path) of every entry, or of the temporary files
+        entries = []
+        for folder in os.scandir(self.directory):
+            if folder.is_dir():
+                for entry in os.scandir(folder.path):
+                    if entry.name.endswith(suffix):
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def locked(self):
+        # Exclusive lock on the directory, held until the returned file is closed
+        lock = open(os.path.join(self.directory, '.lock'), 'w')
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def account(self, change):
+        # Running total of the entry sizes after a write, from a scan when the .size file is missing. Call locked.
+        path = os.path.join(self.directory, '.size')
+        try:
+            with open(path) as f:
+                total = int(f.read()) + change
+        except (OSError, ValueError):
+            total = self.size()
+        with open(path, 'w') as f:
+            f.write(str(total))
+        return total
+
+    def evict(self, limit=None):
+        # Least recently used entries first down to limit (LOW_WATER of max_bytes), one process at a time
+        limit = int(self.max_bytes * LOW_WATER) if limit is None else limit
+        with self.locked():
+            stale = time.time_ns() - STALE * 10 ** 9
+            for modified, _, path in self.entries('.tmp'):
+                if modified < stale:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+            entries = sorted(self.entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= limit:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+            with open(os.path.join(self.directory, '.size'), 'w') as f:
+                f.write(str(total))
+
+    def clear(self):
+        self.evict(0)
+
+    def file_digest(self, path):
+        # SHA-1 of a file's content, remembered against its size, modification time and inode
+        stat = os.stat(path)
+        key = self.key('digest', os.path.abspath(path), stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        return self.memoize(key, lambda: file_digest(path))
+
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+DEFAULT = {}
+
+def default_cache():
+    # Shared per process, None when caching is turned off
+    directory = os.environ.get('CHIMERA_CACHE', 'genome/cache')
+    if directory.lower() in ('off', '0', ''):
+        return None
+    if directory not in DEFAULT:
+        DEFAULT[directory] = DiskCache(directory, int(os.environ.get('CHIMERA_CACHE_SIZE', 1 << 30)))
+    return DEFAULT[directory]
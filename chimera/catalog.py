@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+import csv, os, sqlite3, time
+from concurrent.futures import ProcessPoolExecutor
+from chimera.compression import compressed_sizes
+from chimera.faidx import IndexedFasta
+from chimera.measure import gc_content
+from chimera.render import genome_hash
+from chimera.sketch import SketchLibrary
+
+# Genome catalog in SQLite (WAL journal): uid is the primary key, hash and length are indexed, so lookups are
+# B-tree searches instead of scans over genome_db.csv. Rows are only ever appended, genome_db.csv stays the
+# exported, versioned view (COLUMNS), the other metrics are precomputed from the FASTA file when a genome is added.
+# MinHash sketches are not stored in the catalog but in genome/sketches.npz (chimera.sketch.SketchLibrary),
+# Catalog.sketch serves them from there.
+COLUMNS = ['uid', 'name', 'length', 'zlib', 'hash']
+METRICS = ['gc', 'bz2', 'lzma', 'twobit']
+CODEC_COLUMNS = {'zlib': 'zlib', 'bz2': 'bz2', 'lzma': 'lzma', '2bit': 'twobit'}
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS genomes (
+    uid TEXT PRIMARY KEY,
+    name TEXT,
+    length INTEGER,
+    zlib INTEGER,
+    hash TEXT,
+    gc REAL,
+    bz2 INTEGER,
+    lzma INTEGER,
+    twobit INTEGER,
+    added REAL
+);
+CREATE INDEX IF NOT EXISTS genomes_hash ON genomes (hash);
+CREATE INDEX IF NOT EXISTS genomes_length ON genomes (length);
+"""
+
+def catalog_row(path):
+    # Catalog row of one FASTA file, every metric included
+    reader = IndexedFasta(path)
+    record = reader.records()[0]
+    label, seq = reader.header(record), reader.fetch(record)
+    reader.close()
+    if not seq:
+        raise ValueError(f"{path}: empty sequence")
+    sizes = compressed_sizes(seq)
+    row = {'uid': os.path.basename(path)[:-len('.fasta')],
+           'name': " ".join(label.split(" ")[1:]),
+           'length': len(seq),
+           'hash': genome_hash(seq),
+           'gc': gc_content(seq)}
+    row.update({column: sizes[codec] for codec, column in CODEC_COLUMNS.items()})
+    return row
+
+def catalog_rows(uids, directory='genome', workers=None):
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(catalog_row, [os.path.join(directory, f"{uid}.fasta") for uid in uids]))
+
+class Catalog():
+    def __init__(self, path='genome/catalog.db', directory='genome'):
+        self.path = path
+        self.directory = directory
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+        self.library = None
+
+    @classmethod
+    def open(cls, path='genome/catalog.db', directory='genome', csv_path='genome_db.csv', workers=None):
+        # A new catalog starts from the exported CSV, genomes missing their metrics are measured in parallel
+        new = not os.path.exists(path)
+        catalog = cls(path, directory)
+        if new and os.path.exists(csv_path):
+            catalog.import_csv(csv_path)
+        catalog.update(workers)
+        return catalog
+
+    def close(self):
+        self.db.close()
+
+    def insert(self, rows):
+        # Append-only: rows whose uid is already catalogued are left untouched, returns the number inserted
+        names = COLUMNS + METRICS + ['added']
+        values = [[dict(row, added=row.get('added', time.time())).get(n) for n in names] for row in rows]
+        with self.db:
+            before = self.db.total_changes
+            self.db.executemany(f"INSERT OR IGNORE INTO genomes ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})", values)
+            return self.db.total_changes - before
+
+    def update(self, workers=None):
+        # Fills the metrics of rows imported without them, returns the uids measured
+        todo = [r['uid'] for r in self.db.execute("SELECT uid FROM genomes WHERE gc IS NULL ORDER BY uid")
+                if os.path.exists(os.path.join(self.directory, f"{r['uid']}.fasta"))]
+        if todo:
+            rows = catalog_rows(todo, self.directory, workers)
+            with self.db:
+                self.db.executemany(f"UPDATE genomes SET {', '.join(f'{m} = ?' for m in METRICS)} WHERE uid = ?",
+                                    [[row[m] for m in METRICS] + [row['uid']] for row in rows])
+        return todo
+
+    def import_csv(self, path='genome_db.csv'):
+        with open(path, newline='') as f:
+            return self.insert(dict(row, length=int(row['length']), zlib=int(row['zlib'])) for row in csv.DictReader(f))
+
+    def export_csv(self, path='genome_db.csv'):
+        # Sorted by uid like the original catalog, written to a temporary file then renamed
+        with open(path + '.part', 'w', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(COLUMNS)
+            writer.writerows(self.db.execute(f"SELECT {', '.join(COLUMNS)} FROM genomes ORDER BY uid"))
+        os.replace(path + '.part', path)
+
+    def rows(self, query, parameters=()):
+        return [dict(r) for r in self.db.execute(query, parameters)]
+
+    def get(self, uid):
+        rows = self.rows("SELECT * FROM genomes WHERE uid = ?", (uid,))
+        return rows[0] if rows else None
+
+    def by_hash(self, hash):
+        return self.rows("SELECT * FROM genomes WHERE hash = ? ORDER BY uid", (hash,))
+
+    def by_length(self, low=None, high=None):
+        return self.rows("SELECT * FROM genomes WHERE length BETWEEN ? AND ? ORDER BY length, uid",
+                         (0 if low is None else low, 2 ** 62 if high is None else high))
+
+    def uids(self):
+        return [r['uid'] for r in self.db.execute("SELECT uid FROM genomes ORDER BY uid")]
+
+    def sketches(self):
+        # Sketch library of the directory, catalogued genomes missing from it are sketched once and saved
+        if self.library is None:
+            self.library = SketchLibrary.open(self.directory, path=os.path.join(self.directory, 'sketches.npz'))
+            missing = [uid for uid in self.uids() if uid not in self.library.uids
+                       and os.path.exists(os.path.join(self.directory, f"{uid}.fasta"))]
+            for uid in missing:
+                reader = IndexedFasta(os.path.join(self.directory, f"{uid}.fasta"))
+                self.library.add(uid, reader.fetch(reader.records()[0]))
+                reader.close()
+            if missing:
+                self.library.save()
+        return self.library
+
+    def sketch(self, uid):
+        library = self.sketches()
+        return library.get(uid) if uid in library.uids else None
+
+    def __contains__(self, uid):
+        return self.db.execute("SELECT 1 FROM genomes WHERE uid = ?", (uid,)).fetchone() is not None
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM genomes").fetchone()[0]
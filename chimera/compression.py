@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+import bz2, glob, lzma, os, zlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from chimera.faidx import IndexedFasta
+from chimera.translate import AMBIGUOUS, BASE_LUT
+
+# Compressed sizes of genomes, fed to every codec in chunks so a genome is never copied whole into bytes.
+# zlib at its default level matches measure.compress and the zlib column of genome_db.csv.
+CHUNK = 1 << 20
+
+class TwoBit():
+    # Baseline the text codecs have to beat: 2 bits per base plus a (start, end) u64 pair per ambiguous run,
+    # the size of a genome in the packed library (chimera.packed)
+    def __init__(self):
+        self.length = 0
+        self.runs = 0
+        self.last = False
+
+    def compress(self, data):
+        ambiguous = BASE_LUT[np.frombuffer(data, dtype=np.uint8)] == AMBIGUOUS
+        if len(ambiguous):
+            self.runs += int(ambiguous[0] and not self.last) + int(np.count_nonzero(ambiguous[1:] & ~ambiguous[:-1]))
+            self.last = bool(ambiguous[-1])
+        self.length += len(data)
+        return b''
+
+    def flush(self):
+        return b'\0' * (-(-self.length // 4) + 16 * self.runs)
+
+CODECS = {
+    'zlib': zlib.compressobj,
+    'bz2': bz2.BZ2Compressor,
+    'lzma': lzma.LZMACompressor,
+    '2bit': TwoBit,
+    }
+
+def chunks(seq, size=CHUNK):
+    for i in range(0, len(seq), size):
+        part = seq[i: i + size]
+        yield part.encode('ascii', 'replace') if isinstance(part, str) else bytes(part)
+
+def compressed_sizes(*sequences, codecs=tuple(CODECS), size=CHUNK):
+    # Size of the sequences laid end to end under every codec, in one pass over the chunks
+    compressors = {name: CODECS[name]() for name in codecs}
+    sizes = dict.fromkeys(codecs, 0)
+    for seq in sequences:
+        for chunk in chunks(seq, size):
+            for name, compressor in compressors.items():
+                sizes[name] += len(compressor.compress(chunk))
+    for name, compressor in compressors.items():
+        sizes[name] += len(compressor.flush())
+    return sizes
+
+def compressed_size(seq, codec='zlib'):
+    return compressed_sizes(seq, codecs=(codec,))[codec]
+
+def ncd(size1, size2, joint):
+    # Normalized compression distance: (C(xy) - min(C(x), C(y))) / max(C(x), C(y))
+    return (joint - min(size1, size2)) / max(size1, size2)
+
+def compressibility_profile(seq, window=1000, step=100, codec='zlib'):
+    # Compressed over raw size of every window, returns the window starts and ratios.
+    # Low ratios mark repeats and low-complexity stretches.
+    starts = np.arange(0, max(len(seq) - window, 0) + 1, step)
+    ratios = np.array([compressed_size(seq[s: s + window], codec) / len(seq[s: s + window]) for s in starts.tolist()])
+    return starts, ratios
+
+def low_complexity(seq, window=1000, step=100, threshold=0.2, codec='zlib'):
+    # Base ranges [start, end) covered by windows compressing below the threshold, overlapping windows merged
+    starts, ratios = compressibility_profile(seq, window, step, codec)
+    merged = []
+    for s in starts[ratios < threshold].tolist():
+        e = min(s + window, len(seq))
+        if merged and s <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], e)
+        else:
+            merged.append((s, e))
+    return merged
+
+def genome_sizes(path):
+    reader = IndexedFasta(path)
+    seq = reader.fetch(reader.records()[0])
+    reader.close()
+    return compressed_sizes(seq)
+
+class CompressionLibrary():
+    # Genomes x codecs compressed sizes for the library, genomes are only compressed once
+    def __init__(self, path='genome/compression.npz', directory='genome'):
+        self.path = path
+        self.directory = directory
+        self.codecs = list(CODECS)
+        self.uids = []
+        self.sizes = np.empty((0, len(self.codecs)), dtype=np.int64)
+
+    @classmethod
+    def load(cls, path='genome/compression.npz'):
+        with np.load(path) as data:
+            library = cls(path, str(data['directory']))
+            library.codecs = data['codecs'].tolist()
+            library.uids = data['uids'].tolist()
+            library.sizes = data['sizes']
+        return library
+
+    @classmethod
+    def open(cls, directory='genome', path='genome/compression.npz', workers=None):
+        library = cls.load(path) if os.path.exists(path) else cls(path, directory)
+        library.update(workers)
+        return library
+
+    def save(self):
+        np.savez(self.path, directory=self.directory, codecs=np.array(self.codecs), uids=np.array(self.uids), sizes=self.sizes)
+
+    def add(self, uid, seq):
+        self.set(uid, compressed_sizes(seq, codecs=self.codecs))
+
+    def set(self, uid, sizes):
+        row = np.array([sizes[c] for c in self.codecs], dtype=np.int64)
+        if uid in self.uids:
+            self.sizes[self.uids.index(uid)] = row
+        else:
+            self.uids.append(uid)
+            self.sizes = np.concatenate((self.sizes, row[None]))
+
+    def update(self, workers=None):
+        # Genomes missing from the cache are compressed in parallel, returns the uids that were compressed
+        paths = {os.path.basename(p)[:-len('.fasta')]: p for p in sorted(glob.glob(os.path.join(self.directory, '*.fasta')))}
+        todo = [uid for uid in paths if uid not in self.uids]
+        if todo:
+            with ProcessPoolExecutor(workers) as pool:
+                for uid, sizes in zip(todo, pool.map(genome_sizes, [paths[uid] for uid in todo])):
+                    self.set(uid, sizes)
+        return todo
+
+    def size(self, uid, codec='zlib'):
+        return int(self.sizes[self.uids.index(uid), self.codecs.index(codec)])
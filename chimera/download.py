@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import glob, os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Batch ingest from NCBI E-utilities: accessions go `batch` at a time into one efetch request over a pooled session,
+# with at most `workers` requests in flight (NCBI allows 3 requests/s without an API key, 10 with one).
+# Records are written through a temporary file and a rename, an interrupted run only leaves complete FASTA files
+# and the next run carries on with the accessions that are still missing.
+# Accessions asked without a version are stored under the versioned accession efetch returns.
+EFETCH = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi'
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+def session(workers=3, retries=5, backoff=0.5):
+    # Keep-alive connections shared by the threads, failed requests retried after backoff * 2 ** attempt seconds
+    s = requests.Session()
+    retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=RETRY_STATUS, allowed_methods=None, raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+    s.mount('http://', adapter)
+    s.mount('https://', adapter)
+    return s
+
+def split_records(text):
+    # Multi-FASTA response -> {accession: record}, the accession is the first word of the header
+    records = {}
+    for chunk in ('\n' + text.strip()).split('\n>')[1:]:
+        records[chunk.split(None, 1)[0]] = '>' + chunk.rstrip('\n') + '\n'
+    return records
+
+def fetch_batch(s, uids, url=EFETCH, api_key=None, timeout=60):
+    # One efetch request for the batch, accessions asked without a version match any version returned
+    params = {'db': 'nuccore', 'id': ','.join(uids), 'rettype': 'fasta', 'retmode': 'text'}
+    if api_key:
+        params['api_key'] = api_key
+    response = s.post(url, data=params, timeout=timeout)
+    response.raise_for_status()
+    records = split_records(response.text)
+    versions = {accession.split('.')[0]: accession for accession in records}
+    resolved = {uid: uid if uid in records else versions.get(uid) for uid in uids}
+    return {uid: (accession, records[accession]) for uid, accession in resolved.items() if accession}
+
+def local(directory, uid):
+    # Accession of the FASTA file stored for uid, the latest version for an accession without one, None when missing
+    if os.path.exists(os.path.join(directory, f"{uid}.fasta")):
+        return uid
+    if '.' in uid:
+        return None
+    versions = [os.path.basename(p)[:-len('.fasta')] for p in glob.glob(os.path.join(directory, f"{glob.escape(uid)}.*.fasta"))]
+    versions = [v for v in versions if v.rsplit('.', 1)[1].isdigit()]
+    return max(versions, key=lambda v: int(v.rsplit('.', 1)[1]), default=None)
+
+def write_record(directory, uid, record):
+    path = os.path.join(directory, f"{uid}.fasta")
+    with open(path + '.part', 'w') as f:
+        f.write(record)
+    os.replace(path + '.part', path)
+    return path
+
+def download(uids, directory='genome', batch=20, workers=3, url=EFETCH, api_key=None, retries=5, backoff=0.5, log=None):
+    # Fetches the accessions that have no FASTA file in directory yet,
+    # returns the versioned accessions written and the uids that failed
+    todo = [uid for uid in dict.fromkeys(uids) if not local(directory, uid)]
+    batches = [todo[i: i + batch] for i in range(0, len(todo), batch)]
+    written, failed = [], []
+    with session(workers, retries, backoff) as s, ThreadPoolExecutor(workers) as pool:
+        futures = {pool.submit(fetch_batch, s, b, url, api_key): b for b in batches}
+        for done, future in enumerate(as_completed(futures), 1):
+            b = futures[future]
+            try:
+                found = future.result()
+            except requests.RequestException as e:
+                failed += b
+                if log:
+                    log(f"[{done}/{len(batches)}] Batch of {len(b)} failed: {e}")
+                continue
+            for accession, record in dict(found.values()).items():
+                write_record(directory, accession, record)
+                written.append(accession)
+            failed += [uid for uid in b if uid not in found]
+            if log:
+                log(f"[{done}/{len(batches)}] {len(found)}/{len(b)} records")
+    return written, failed
@@ -1,12 +1,11 @@
 #!/usr/bin/env python3
 
+import hashlib, struct, zlib
+import numpy as np
+
 def encode(binary, encoding):
-    string = []
-    for n in [binary[i: i+2] for i in range(0, len(binary), 2)]:
-        for key in list(encoding.keys()):
-            if n == key:
-                string.append(encoding.get(key))
-    return "".join(string)
+    width = len(next(iter(encoding)))
+    return ''.join(encoding[binary[i: i+width]] for i in range(0, len(binary), width))
 
 mapping = {
     "00": "A",
@@ -15,10 +14,129 @@ mapping = {
     "11": "T"
     }
 
-data = "ABC123<>?!@£$%^&*()"
-binary = ''.join(format(x, '08b') for x in bytearray(data, 'utf-8'))
-DNA = encode(binary, mapping)
+# DNA storage: bytes -> bases, most significant bit pair first, 00 = A | 01 = G | 10 = C | 11 = T as in mapping.
+# Streams are cut into blocks, every block is one strand holding the block and its CRC32.
+# Rotating code (Goldman et al. 2013): 3 bytes become 16 base-3 digits and every digit picks one of the three bases
+# that differ from the previous one, so no base repeats (1.5 bits per base instead of 2).
+# Whitening XORs every block with a seeded keystream so runs of zeros or text still come out GC balanced.
+# The keystream is SHAKE-128 over the seed and block index (u64 each, little-endian), fixed by the format.
+BASES = np.frombuffer(b'AGCT', dtype=np.uint8)
+CODES = np.full(256, 255, dtype=np.uint8)
+CODES[BASES] = np.arange(4)
+SHIFTS = np.array([6, 4, 2, 0], dtype=np.uint8)
+TRITS = 16          # 3 ** 16 > 2 ** 24
+BLOCK = 1 << 16     # Bytes per block
+
+def bytes_to_dna(data):
+    return BASES[(np.frombuffer(data, dtype=np.uint8)[:, None] >> SHIFTS) & 3].tobytes()
+
+def base_codes(dna):
+    codes = CODES[np.frombuffer(dna, dtype=np.uint8)]
+    if np.any(codes > 3):
+        raise ValueError("Strand holds a base other than A, C, G or T")
+    return codes
+
+def dna_to_bytes(dna):
+    codes = base_codes(dna)
+    if len(codes) % 4:
+        raise ValueError("Strand length is not a multiple of 4 bases")
+    quads = codes.reshape(-1, 4)
+    return ((quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]).tobytes()
+
+def bytes_to_trits(data):
+    words = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.uint32)
+    value = (words[:, 0] << 16) | (words[:, 1] << 8) | words[:, 2]
+    trits = np.empty((len(value), TRITS), dtype=np.uint8)
+    for i in range(TRITS - 1, -1, -1):
+        trits[:, i] = value % 3
+        value //= 3
+    return trits.ravel()
+
+def trits_to_bytes(trits):
+    digits = trits.reshape(-1, TRITS).astype(np.uint32)
+    value = np.zeros(len(digits), dtype=np.uint32)
+    for i in range(TRITS):
+        value = value * 3 + digits[:, i]
+    if np.any(value >= 1 << 24):
+        raise ValueError("Strand holds a base-3 word past 24 bits")
+    return np.stack((value >> 16, (value >> 8) & 255, value & 255), axis=1).astype(np.uint8).tobytes()
+
+def rotate(trits):
+    # Base i = base i-1 + 1 + trit i (mod 4) from an implicit A, a running sum
+    return BASES[np.cumsum(trits.astype(np.int64) + 1) % 4].tobytes()
+
+def unrotate(dna):
+    steps = (np.diff(np.concatenate(([0], base_codes(dna))).astype(np.int64)) - 1) % 4
+    if np.any(steps == 3):
+        raise ValueError("Strand repeats a base, not a rotating code")
+    return steps.astype(np.uint8)
+
+def max_homopolymer(dna):
+    codes = np.frombuffer(dna, dtype=np.uint8)
+    if not len(codes):
+        return 0
+    edges = np.flatnonzero(np.diff(codes)) + 1
+    return int(np.diff(np.concatenate(([0], edges, [len(codes)]))).max())
+
+def gc_fraction(dna):
+    codes = np.frombuffer(dna, dtype=np.uint8)
+    return np.count_nonzero((codes == ord('G')) | (codes == ord('C'))) / max(len(codes), 1)
+
+class DNACodec():
+    def __init__(self, block=BLOCK, rotating=False, whiten=False, seed=0):
+        self.block = block
+        self.rotating = rotating
+        self.whiten = whiten
+        self.seed = seed
+
+    def keystream(self, payload, index):
+        if not self.whiten:
+            return payload
+        stream = np.frombuffer(hashlib.shake_128(struct.pack('<QQ', self.seed, index)).digest(len(payload)), dtype=np.uint8)
+        return (np.frombuffer(payload, dtype=np.uint8) ^ stream).tobytes()
+
+    def encode_block(self, chunk, index=0):
+        payload = self.keystream(chunk + struct.pack('<I', zlib.crc32(chunk)), index)
+        if not self.rotating:
+            return bytes_to_dna(payload)
+        pad = -len(payload) % 3                                 # First digit of the strand
+        return rotate(np.concatenate(([pad], bytes_to_trits(payload + b'\0' * pad))))
+
+    def decode_block(self, strand, index=0):
+        if self.rotating:
+            trits = unrotate(strand)
+            if len(trits) % TRITS != 1 or trits[0] > 2:
+                raise ValueError(f"Block {index}: truncated strand")
+            payload = trits_to_bytes(trits[1:])[:len(trits) // TRITS * 3 - int(trits[0])]
+        else:
+            payload = dna_to_bytes(strand)
+        if len(payload) < 4:                                    # Shorter than the CRC alone
+            raise ValueError(f"Block {index}: truncated strand")
+        payload = self.keystream(payload, index)
+        chunk, (checksum,) = payload[:-4], struct.unpack('<I', payload[-4:])
+        if zlib.crc32(chunk) != checksum:
+            raise ValueError(f"Block {index}: checksum mismatch")
+        return chunk
+
+    def encode_stream(self, f):
+        # One strand per block read from a binary file object
+        index = 0
+        while True:
+            chunk = f.read(self.block)
+            if not chunk:
+                return
+            yield self.encode_block(chunk, index)
+            index += 1
+
+    def decode_stream(self, strands):
+        for index, strand in enumerate(strands):
+            yield self.decode_block(strand.rstrip(b'\r\n'), index)
+
+if __name__ == "__main__":
+    data = "ABC123<>?!@£$%^&*()"
+    binary = ''.join(format(x, '08b') for x in bytearray(data, 'utf-8'))
+    DNA = encode(binary, mapping)
 
-print(f"Message: {data}")
-print(f"Binary: {binary}")
-print(f"Residue: {DNA}")
\ No newline at end of file
+    print(f"Message: {data}")
+    print(f"Binary: {binary}")
+    print(f"Residue: {DNA}")
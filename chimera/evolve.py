@@ -1,13 +1,131 @@
 #!/usr/bin/env python3
 
-def score(aa):
-    return
+import collections, time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from chimera.residue import *
+from chimera.titration import ionizable_groups, isoelectric_point
 
-def mutate(acid, epitope):
-    return
+# Candidates are rows of residue codes (chimera.residue), one row per member of the population.
+# Fitness terms map a (candidates x length) array of full protein sequences to one score per row, higher is better.
+STANDARD = len(RESIDUES)
+Generation = collections.namedtuple('Generation', ['generation', 'best', 'mean', 'evaluations', 'seconds', 'rate'])
+
+def composition(population):
+    rows = np.repeat(np.arange(len(population)), population.shape[1])
+    return np.bincount(rows * SIZE + population.ravel(), minlength=len(population) * SIZE).reshape(len(population), SIZE)
+
+class Stability():
+    # Lower instability index (measure.instability_index) scores higher
+    def __call__(self, population):
+        return -10 / population.shape[1] * DIPEPTIDE[population[:, :-1], population[:, 1:]].sum(axis=1)
+
+class IsoelectricPoint():
+    def __init__(self, target=7.0):
+        self.target = target
+
+    def __call__(self, population):
+        groups = ionizable_groups(composition(population), population[:, 0], population[:, -1])
+        return -np.abs(isoelectric_point(groups) - self.target)
+
+class Hydropathy():
+    # Distance of the GRAVY score (measure.hydropathy_index) to a target
+    def __init__(self, target=0.0):
+        self.target = target
+
+    def __call__(self, population):
+        return -np.abs(HYDROPATHY[population].mean(axis=1) - self.target)
+
+class Identity():
+    # Share of positions kept from the reference sequence, within region [start, end) when given.
+    # Holds candidates close to the original epitope.
+    def __init__(self, reference, region=None):
+        self.reference = encode_residues(reference)
+        self.region = slice(*region) if region else slice(None)
+
+    def __call__(self, population):
+        return (population[:, self.region] == self.reference[self.region]).mean(axis=1)
+
+class Fitness():
+    # Weighted sum of fitness terms
+    def __init__(self, *terms):
+        self.terms = [(1.0, t) if callable(t) else t for t in terms]
+
+    def __call__(self, population):
+        return sum(weight * term(population) for weight, term in self.terms)
+
+FITNESS = {
+    'stability': Stability,
+    'pI': IsoelectricPoint,
+    'hydropathy': Hydropathy,
+    }
 
 def splice(sequence, epitope, mutant):
-    return
+    # Full sequences with every mutant row written over the epitope [start, end) of the sequence
+    start, end = epitope
+    full = np.repeat(encode_residues(sequence)[None, :], len(mutant), axis=0)
+    full[:, start: end] = mutant
+    return full
+
+def mutate(population, rate, rng):
+    # Independent point mutations to any other standard residue
+    hits = rng.random(population.shape) < rate
+    shift = rng.integers(1, STANDARD, size=population.shape)
+    return np.where(hits, (population + shift) % STANDARD, population).astype(population.dtype)
+
+def crossover(parents, partners, rate, rng):
+    # Uniform recombination: each position comes from the partner with probability 0.5 on recombining rows
+    recombine = rng.random(len(parents)) < rate
+    take = (rng.random(parents.shape) < 0.5) & recombine[:, None]
+    return np.where(take, partners, parents)
+
+def select(fitness, count, rng, size=3):
+    # Tournament selection: the fittest of `size` random candidates, `count` times
+    entrants = rng.integers(0, len(fitness), size=(count, size))
+    return entrants[np.arange(count), np.argmax(fitness[entrants], axis=1)]
+
+def score(population, fitness, sequence=None, epitope=None, pool=None, chunks=1):
+    # Fitness of every candidate in the context of the full sequence, split across a process pool when given
+    full = population if sequence is None else splice(sequence, epitope, population)
+    if pool is None or chunks <= 1:
+        return fitness(full)
+    return np.concatenate(list(pool.map(fitness, np.array_split(full, chunks))))
+
+def evolve(sequence, epitope, fitness=None, population=200, generations=100, mutation=0.02, recombination=0.7,
+           elite=2, seed=0, workers=None, log=None):
+    # Evolves the epitope [start, end) of a protein sequence, returns the best epitope, its fitness and per-generation statistics
+    if population <= elite:
+        raise ValueError(f"population ({population}) must be larger than elite ({elite})")
+    start, end = epitope
+    original = encode_residues(sequence)[start: end]
+    fitness = fitness or Fitness(Stability())
+    rng = np.random.default_rng(seed)
+
+    # First generation: mutants of the original epitope, the original itself kept as the first row
+    pop = mutate(np.repeat(original[None, :], population, axis=0), 0.1, rng)
+    pop[0] = original
+    pool = ProcessPoolExecutor(workers) if workers and workers > 1 else None
+    history = []
+    try:
+        scores = score(pop, fitness, sequence, epitope, pool, workers or 1)
+        for generation in range(1, generations + 1):
+            t0 = time.perf_counter()
+            order = np.argsort(-scores, kind='stable')
+            parents = pop[select(scores, population - elite, rng)]
+            partners = pop[select(scores, population - elite, rng)]
+            children = mutate(crossover(parents, partners, recombination, rng), mutation, rng)
+            pop = np.concatenate((pop[order[:elite]], children))
+            scores = np.concatenate((scores[order[:elite]], score(children, fitness, sequence, epitope, pool, workers or 1)))
+            seconds = time.perf_counter() - t0
+            stats = Generation(generation, float(scores.max()), float(scores.mean()), len(children), seconds,
+                               len(children) / seconds if seconds > 0 else float('inf'))
+            history.append(stats)
+            if log:
+                log(stats)
+    finally:
+        if pool:
+            pool.shutdown()
 
-def evolve(sequence, epitope):
-    return
+    best = int(np.argmax(scores))
+    residues = np.array(list(RESIDUES + 'X'))
+    return ''.join(residues[pop[best]]), float(scores[best]), history
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import collections, mmap, os
+
+# Sidecar index, one tab separated line per record (samtools faidx layout)
+# name: first word of the header | length: bases | offset: byte of the first base | linebases: bases per line | linewidth: bytes per line
+FaiRecord = collections.namedtuple('FaiRecord', ['name', 'length', 'offset', 'linebases', 'linewidth'])
+
+def build_index(fasta):
+    records = []
+    with open(fasta, 'rb') as f:
+        name, length, offset, linebases, linewidth, short = None, 0, 0, 0, 0, False
+        pos, seen = 0, set()
+        for line in f:
+            if line.startswith(b'>'):
+                if name is not None:
+                    records.append(FaiRecord(name, length, offset, linebases, linewidth))
+                name = line[1:].split(None, 1)[0].decode() if line[1:].strip() else ''
+                if name in seen:
+                    raise ValueError(f"{fasta}: duplicate record name {name}")
+                seen.add(name)
+                length, offset, linebases, linewidth, short = 0, pos + len(line), 0, 0, False
+            elif name is not None:
+                bases = len(line.rstrip(b'\r\n'))
+                if not linebases:
+                    linebases, linewidth = bases, len(line)
+                elif short and bases or bases > linebases or bases == linebases and line.endswith(b'\n') and len(line) != linewidth:
+                    raise ValueError(f"{fasta}: record {name} has inconsistent line lengths")
+                short = short or bases < linebases
+                length += bases
+            pos += len(line)
+        if name is not None:
+            records.append(FaiRecord(name, length, offset, linebases, linewidth))
+
+    with open(fasta + '.fai', 'w') as f:
+        for r in records:
+            f.write('\t'.join(str(v) for v in r) + '\n')
+    return records
+
+def read_index(fasta):
+    fai = fasta + '.fai'
+    if not os.path.exists(fai) or os.path.getmtime(fai) < os.path.getmtime(fasta):
+        return build_index(fasta)
+    with open(fai) as f:
+        return [FaiRecord(name, *map(int, values)) for name, *values in (line.rstrip('\n').split('\t') for line in f)]
+
+class IndexedFasta():
+    def __init__(self, fasta):
+        self.path = fasta
+        records = read_index(fasta)
+        self.index = collections.OrderedDict((r.name, r) for r in records)
+        if len(self.index) != len(records):
+            raise ValueError(f"{fasta}: duplicate record names")
+        with open(fasta, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(fasta) else b''
+        # Byte offset of every header line: the header is the single line just before the first base, so it is
+        # found from the line break ending the previous record, a '>' inside the header does not matter
+        self.headers = {r.name: self.data.rfind(b'\n', 0, r.offset - 1) + 1 for r in records}
+
+    def records(self):
+        return list(self.index.keys())
+
+    def __len__(self):
+        return len(self.index)
+
+    def length(self, record):
+        return self.index[record].length
+
+    def header(self, record):
+        return self.data[self.headers[record]: self.index[record].offset].rstrip(b'\r\n').decode()
+
+    def byte_offset(self, r, pos):
+        return r.offset + pos // r.linebases * r.linewidth + pos % r.linebases if r.linebases else r.offset
+
+    def fetch(self, record, start=0, end=None):
+        r = self.index[record]
+        start, end, _ = slice(start, end).indices(r.length)
+        if start >= end:
+            return ''
+        # Only the requested bytes are touched, line breaks inside the region are stripped
+        chunk = self.data[self.byte_offset(r, start): self.byte_offset(r, end)]
+        return chunk.replace(b'\n', b'').replace(b'\r', b'').decode()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
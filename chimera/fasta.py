@@ -1,39 +1,62 @@
 #!/usr/bin/env python3
 
+import sys
+from chimera import codon, translate as translation
+from chimera.cache import code_version, default_cache
 from chimera.codon import RNA
+from chimera.faidx import IndexedFasta
+from chimera.trace import traced
+from chimera.translate import translate
+
+# Parsed genomes and residue chains are cached by file content (chimera.cache), the residue chain is only
+# translated when it is first used
+VERSION = code_version(sys.modules[__name__], codon, translation)
 
 class FastaIO():
-    def __init__(self, UID):
+    def __init__(self, UID, lazy=False, cache=True):
         self.UID = UID
         self.path = f"genome/{self.UID}.fasta"
         self.codon = RNA()
-        
-        self.label, self.genome = self.load(self.path)
-        self.res = self.translate(self.genome)
+        self.cache = default_cache() if cache is True else cache or None
+
+        if not lazy:
+            self.label, self.genome = self.cached('fasta', lambda: self.load(self.path))
+
+    def __getattr__(self, name):
+        # Lazy mode: the index is built on first use, the genome on first access. The residue chain is always lazy.
+        if name == 'index':
+            self.index = IndexedFasta(self.path)
+            self.record = self.index.records()[0]
+        elif name == 'record':
+            self.index
+        elif name in ('label', 'genome'):
+            self.label = self.index.header(self.record)
+            self.genome = self.index.fetch(self.record)
+        elif name == 'res':
+            self.res = self.cached('residues', lambda: self.translate(self.genome))
+        elif name == 'digest':
+            self.digest = self.cache.file_digest(self.path)
+        else:
+            raise AttributeError(name)
+        return self.__dict__[name]
 
+    def cached(self, kind, fn):
+        if self.cache is None:
+            return fn()
+        return self.cache.memoize(self.cache.key(kind, VERSION, self.digest), fn)
+
+    @traced('fasta.load')
     def load(self, fasta):
         with open(fasta) as f:
             header = f.readline().rstrip()
             seq = ''.join(line.strip() for line in f)
         return header, seq
 
+    def region(self, start, end, record=None):
+        return self.index.fetch(record or self.record, start, end)
+
     def transcribe(self, seq):
         return seq.replace('T', 'U') # DNA > RNA transcription - Thymine (T) is replaced with Uracil (U).
 
     def translate(self, seq):
-        i, count = 0, 1
-        res = ''
-        while i < len(seq):
-            codon = self.transcribe(seq[i:i+3])
-            amino = [k for k, v in self.codon.items() if codon in v]
-
-            if codon=='AUG':                                                        # START open reading frame
-                count = 3
-            if count==3 and len(codon)==3:
-                res += str(amino).split('/')[1].replace("']", "").strip()
-            if codon=='UAG' or codon=='UAA' or codon=='UGA':                        # STOP open reading frame
-                i += 2
-                count = 1
-
-            i += count
-        return res
\ No newline at end of file
+        return translate(seq) # START/STOP gated residue chain, see chimera.translate
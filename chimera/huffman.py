@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
 
+import collections, heapq, io, itertools, struct
+import numpy as np
+from chimera.compression import chunks
+
 class NodeTree(object):
     def __init__(self, left=None, right=None):
         self.left = left
@@ -9,14 +13,15 @@ class NodeTree(object):
         return self.left, self.right
 
 def build_tree(nodes):
-    while len(nodes) > 1:
-        (key1, c1) = nodes[-1]
-        (key2, c2) = nodes[-2]
-        nodes = nodes[:-2]
-        node = NodeTree(key1, key2)
-        nodes.append((node, c1 + c2))
-        nodes = sorted(nodes, key=lambda x: x[1], reverse=True)
-    return nodes[0][0]
+    # nodes: (symbol, count) pairs, the two lightest subtrees are merged off a heap
+    heap = [(count, i, key) for i, (key, count) in enumerate(nodes)]
+    heapq.heapify(heap)
+    order = itertools.count(len(heap))
+    while len(heap) > 1:
+        c1, _, key1 = heapq.heappop(heap)
+        c2, _, key2 = heapq.heappop(heap)
+        heapq.heappush(heap, (c1 + c2, next(order), NodeTree(key1, key2)))
+    return heap[0][2]
 
 def assign_code(node, bin=''):
     if type(node) is str:
@@ -28,6 +33,157 @@ def assign_code(node, bin=''):
     return d
 
 def encode(str, dict):
-    output = ''
-    for ch in str: output += dict[ch]
-    return output
\ No newline at end of file
+    return ''.join(dict[ch] for ch in str)
+
+# Bit-packed canonical Huffman codec over k-byte symbols: k = 1 for bases or residues, 3 for codons, up to 8 for k-mers.
+# Symbols are the big-endian integers of their k bytes, only code lengths are stored and codes are rebuilt in
+# canonical (length, symbol) order. Codes are written most significant bit first.
+# Stream: magic 'CHUF' | version u8 | k u8 | symbols u32 | symbols * k bytes | code length u8 per symbol
+#         blocks of (symbols u32 | payload bytes u32 | payload), a block of 0 symbols holds the len % k trailing bytes
+MAGIC = b'CHUF'
+VERSION = 1
+MAX_LENGTH = 16     # Longest code, the decoding table has 2 ** MAX_LENGTH entries at most
+BLOCK = 1 << 18     # Symbols per block
+
+def kmer_values(data, k):
+    words = np.frombuffer(data, dtype=np.uint8).reshape(-1, k).astype(np.uint64)
+    return (words << np.arange(8 * (k - 1), -1, -8, dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+
+def value_bytes(values, k):
+    return ((values[:, None] >> np.arange(8 * (k - 1), -1, -8, dtype=np.uint64)) & np.uint64(255)).astype(np.uint8).tobytes()
+
+def code_lengths(counts, limit=MAX_LENGTH):
+    # Optimal code lengths of at most `limit` bits by package-merge. Level l merges the sorted counts with the
+    # pairs of level l + 1, the first 2n - 2 items of level 1 are the coins spent: every level a symbol is spent
+    # at adds one bit to its code, and the packages spent at one level are the first items paid for at the next.
+    counts = np.asarray(counts, dtype=np.int64)
+    if len(counts) == 1:
+        return np.ones(1, dtype=np.uint8)
+    if len(counts) > 1 << limit:
+        raise ValueError(f"{len(counts)} symbols do not fit codes of at most {limit} bits")
+    order = np.argsort(counts, kind='stable')
+    weights = counts[order]
+    items, leaves = weights, [np.ones(len(weights), dtype=bool)]
+    for _ in range(limit - 1):
+        packages = items[0: len(items) - 1: 2] + items[1::2]
+        merged = np.argsort(np.concatenate((weights, packages)), kind='stable')      # Symbols first on ties
+        items = np.concatenate((weights, packages))[merged]
+        leaves.append(merged < len(weights))
+    lengths = np.zeros(len(weights), dtype=np.int64)
+    spent = 2 * len(weights) - 2
+    for leaf in reversed(leaves):
+        symbols = int(leaf[:spent].sum())
+        lengths[:symbols] += 1
+        spent = 2 * (spent - symbols)
+    result = np.zeros(len(counts), dtype=np.uint8)
+    result[order] = lengths
+    return result
+
+def canonical_codes(lengths):
+    codes = np.zeros(len(lengths), dtype=np.uint32)
+    order = np.lexsort((np.arange(len(lengths)), lengths))
+    code, previous = -1, int(lengths[order[0]])
+    for s in order.tolist():
+        code = (code + 1) << (int(lengths[s]) - previous)
+        previous = int(lengths[s])
+        codes[s] = code
+    return codes
+
+def decoding_table(codes, lengths, width):
+    # Symbol and code length for every width-bit window, codes in increasing order tile the table
+    order = np.argsort(codes.astype(np.int64) << (width - lengths.astype(np.int64)), kind='stable')
+    spans = 1 << (width - lengths[order].astype(np.int64))
+    symbol = np.zeros(1 << width, dtype=np.int32)
+    length = np.full(1 << width, width, dtype=np.int32)   # Unused windows (single symbol alphabets) never get read
+    symbol[:spans.sum()] = np.repeat(order, spans)
+    length[:spans.sum()] = np.repeat(lengths[order], spans)
+    return symbol, length
+
+class HuffmanCodec():
+    def __init__(self, symbols, lengths, k=1):
+        self.k = k
+        self.symbols = np.asarray(symbols, dtype=np.uint64)     # Sorted symbol values
+        self.lengths = np.asarray(lengths, dtype=np.uint8)
+        self.codes = canonical_codes(self.lengths)
+        self.width = int(self.lengths.max())
+        self.table = decoding_table(self.codes, self.lengths, self.width)
+
+    @classmethod
+    def fit(cls, seq, k=1, limit=MAX_LENGTH, size=BLOCK):
+        # Symbol counts over the whole sequence, chunk by chunk
+        counts = collections.Counter()
+        for data in chunks(seq, size * k):
+            values, n = np.unique(kmer_values(data[:len(data) - len(data) % k], k), return_counts=True)
+            counts.update(dict(zip(values.tolist(), n.tolist())))
+        if not counts:
+            counts[0] = 1
+        symbols = np.array(sorted(counts), dtype=np.uint64)
+        return cls(symbols, code_lengths([counts[s] for s in symbols.tolist()], limit), k)
+
+    def header(self):
+        return (MAGIC + struct.pack('<BBI', VERSION, self.k, len(self.symbols)) + value_bytes(self.symbols, self.k)
+                + self.lengths.tobytes())
+
+    @classmethod
+    def read_header(cls, f):
+        magic, (version, k, count) = f.read(4), struct.unpack('<BBI', f.read(6))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a CHUF stream")
+        symbols = kmer_values(f.read(count * k), k)
+        return cls(symbols, np.frombuffer(f.read(count), dtype=np.uint8), k)
+
+    def encode_block(self, values):
+        ids = np.minimum(np.searchsorted(self.symbols, values), len(self.symbols) - 1)
+        if np.any(self.symbols[ids] != values):
+            raise ValueError("Symbol outside the alphabet of the codec")
+        lengths, codes = self.lengths[ids].astype(np.int64), self.codes[ids]
+        ends = np.cumsum(lengths)
+        offset = np.arange(ends[-1]) - np.repeat(ends - lengths, lengths)
+        shift = (np.repeat(lengths, lengths) - 1 - offset).astype(np.uint32)
+        return np.packbits(((np.repeat(codes, lengths) >> shift) & 1).astype(np.uint8)).tobytes()
+
+    def decode_block(self, payload, count):
+        # Table lookup at every bit position, then the chain of code starts from bit 0 by pointer doubling
+        bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
+        n = len(bits)
+        padded = np.concatenate((bits, np.zeros(self.width, dtype=np.uint8)))
+        window = np.zeros(n, dtype=np.int32)
+        for j in range(self.width):
+            window = (window << 1) | padded[j: j + n]
+        symbol, length = self.table[0][window], self.table[1][window]
+        jump = np.append(np.minimum(np.arange(n, dtype=np.int32) + length, n), np.int32(n))
+        positions = np.zeros(1, dtype=np.int32)
+        while len(positions) < count:
+            positions = np.concatenate((positions, jump[positions]))
+            jump = jump[jump]
+        return self.symbols[symbol[positions[:count]]]
+
+    def encode_stream(self, seq, size=BLOCK):
+        yield self.header()
+        tail = b''
+        for data in chunks(seq, size * self.k):
+            whole = len(data) - len(data) % self.k
+            tail = data[whole:]
+            if whole:
+                payload = self.encode_block(kmer_values(data[:whole], self.k))
+                yield struct.pack('<II', whole // self.k, len(payload)) + payload
+        yield struct.pack('<II', 0, len(tail)) + tail
+
+    def encode(self, seq, size=BLOCK):
+        return b''.join(self.encode_stream(seq, size))
+
+def decode_stream(f):
+    # Decoded bytes block by block from a binary file object
+    codec = HuffmanCodec.read_header(f)
+    while True:
+        count, nbytes = struct.unpack('<II', f.read(8))
+        if count == 0:
+            yield f.read(nbytes)
+            return
+        yield value_bytes(codec.decode_block(f.read(nbytes), count), codec.k)
+
+def compress(seq, k=1):
+    return HuffmanCodec.fit(seq, k).encode(seq)
+
+def decompress(data):
+    return b''.join(decode_stream(io.BytesIO(data)))
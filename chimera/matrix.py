@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+import functools, hashlib, json, os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from chimera.align import align, identity
+from chimera.compression import compressed_size, compressed_sizes, ncd
+from chimera.faidx import IndexedFasta
+from chimera.sketch import jaccard, mash_distance, sketch
+
+def content_hash(seq):
+    return hashlib.sha1(str(seq).encode('ascii')).hexdigest()
+
+@functools.lru_cache(maxsize=8)
+def load_sequence(path):
+    reader = IndexedFasta(path)
+    seq = reader.fetch(reader.records()[0])
+    reader.close()
+    return seq
+
+def align_similarity(seq1, seq2):
+    # Matching columns of the global alignment over the longer genome, in percent
+    aligned1, aligned2, _ = align(seq1, seq2)
+    return identity(aligned1, aligned2) / max(len(seq1), len(seq2), 1) * 100
+
+def minhash_distance(seq1, seq2):
+    return mash_distance(jaccard(sketch(seq1), sketch(seq2))[0])
+
+def ncd_distance(seq1, seq2, size1=None, size2=None):
+    # lzma rather than zlib, whose 32 KiB window cannot reach back into the first genome of a longer pair.
+    # The sizes of the genomes on their own are the lzma column of the catalog when known, only the pair is compressed.
+    size1 = compressed_size(seq1, 'lzma') if size1 is None else size1
+    size2 = compressed_size(seq2, 'lzma') if size2 is None else size2
+    return ncd(size1, size2, compressed_sizes(seq1, seq2, codecs=('lzma',))['lzma'])
+
+# name: (pair function, estimated cost from the two lengths, 'similarity' (percent) | 'distance' (0-1))
+METRICS = {
+    'align': (align_similarity, lambda n, m: n * m, 'similarity'),
+    'minhash': (minhash_distance, lambda n, m: n + m, 'distance'),
+    'ncd': (ncd_distance, lambda n, m: n + m, 'distance'),
+    }
+
+def compute_pair(metric, path1, path2, *known):
+    return METRICS[metric][0](load_sequence(path1), load_sequence(path2), *known)
+
+class PairCache():
+    # Append-only JSON lines keyed by metric and the content hashes of both sequences.
+    # Every finished pair is flushed straight away so an interrupted run resumes where it stopped.
+    def __init__(self, path):
+        self.path = path
+        self.values = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError: # Torn last line of an interrupted run
+                        continue
+                    self.values[self.key(entry['metric'], entry['a'], entry['b'])] = entry['value']
+
+    def key(self, metric, hash1, hash2):
+        return (metric,) + tuple(sorted((hash1, hash2)))
+
+    def get(self, metric, hash1, hash2):
+        return self.values.get(self.key(metric, hash1, hash2))
+
+    def put(self, metric, hash1, hash2, value):
+        key = self.key(metric, hash1, hash2)
+        self.values[key] = value
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({'metric': metric, 'a': key[1], 'b': key[2], 'value': value}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+def pairwise(library, metric='align', workers=None, cache='genome/pairs.jsonl', log=None, sizes=None):
+    # library: uid -> FASTA path, sizes: uid -> lzma size of the genome (catalog column) for ncd.
+    # Returns the uids and an N x N matrix in the metric's own units.
+    fn, cost, kind = METRICS[metric]
+    uids = list(library)
+    lengths, hashes = {}, {}
+    for uid in uids:
+        seq = load_sequence(library[uid])
+        lengths[uid], hashes[uid] = len(seq), content_hash(seq)
+
+    matrix = np.full((len(uids), len(uids)), np.nan)
+    np.fill_diagonal(matrix, 100.0 if kind == 'similarity' else 0.0)
+    store = PairCache(cache)
+
+    todo = []
+    for i in range(len(uids)):
+        for j in range(i + 1, len(uids)):
+            value = store.get(metric, hashes[uids[i]], hashes[uids[j]])
+            if value is None:
+                todo.append((i, j))
+            else:
+                matrix[i, j] = matrix[j, i] = value
+
+    # Most expensive pairs first so the pool does not finish on a single long straggler
+    todo.sort(key=lambda p: -cost(lengths[uids[p[0]]], lengths[uids[p[1]]]))
+    if log:
+        log(f"{len(uids)} genomes | {len(todo)} pairs to compute | {len(uids)*(len(uids)-1)//2 - len(todo)} cached")
+
+    def known(i, j):
+        # Sizes of the genomes on their own, which ncd would otherwise compress again in every worker
+        return (sizes.get(uids[i]), sizes.get(uids[j])) if metric == 'ncd' and sizes else ()
+
+    with ProcessPoolExecutor(workers) as pool:
+        futures = {pool.submit(compute_pair, metric, library[uids[i]], library[uids[j]], *known(i, j)): (i, j) for i, j in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            i, j = futures[future]
+            value = float(future.result())
+            store.put(metric, hashes[uids[i]], hashes[uids[j]], value)
+            matrix[i, j] = matrix[j, i] = value
+            if log:
+                log(f"[{done}/{len(todo)}] {uids[i]} | {uids[j]} | {value:.4f}")
+    return uids, matrix
+
+def to_distance(matrix, kind):
+    return 1.0 - matrix / 100.0 if kind == 'similarity' else matrix
@@ -1,19 +1,27 @@
 #!/usr/bin/env python3
 
 import numpy as np
-import collections, math, zlib
-from PIL import Image
+import collections
 from chimera.codon import *
+from chimera.residue import *
+from chimera import titration
+from chimera.compression import compressed_size
+from chimera.render import average_hash, binary_array_to_hex, genome_hash, seq_to_pixels
+from chimera.trace import traced
 
+@traced()
 def lookup_value(input, dict):
     return [v for k, v in dict.items() if input in k.split('/')[1]][0]
 
+@traced()
 def lookup_amino(peptide):
     return [k for k, _ in RNA().items() if peptide in k.split('/')[1]][0]
 
+@traced()
 def gc_content(seq):
     return (seq.count('G') + seq.count('C')) / len(seq)*100
 
+@traced()
 def peptype(peptide):
     length = len(peptide)
     if length >= 2 and length <= 20:
@@ -22,58 +30,29 @@ def peptype(peptide):
         type = "Polypeptide"
     return type
 
+@traced()
 def molecular_weight(peptide):
-    water_mass = 18.01524
-    weight = 0
-    for i in peptide:
-        weight += lookup_value(i, amino_weight())
-    weight -= water_mass * (len(peptide)-1)
-    return weight
+    weight = WEIGHT[encode_residues(peptide)].sum()
+    weight -= WATER_MASS * (len(peptide)-1)
+    return float(weight)
 
+@traced()
 def charge_at_pH(pH, peptide):
-    alpha_amino = [v for k, v in pKa().items() if k == 'alpha_amino'][0]
-    alpha_carboxy = [v for k, v in pKa().items() if k == 'alpha_carboxy'][0]
-    sidechain_positive = [v for k, v in pKa().items() if k == 'sidechain_positive'][0]
-    sidechain_negative = [v for k, v in pKa().items() if k == 'sidechain_negative'][0]
-    nterm, cterm = peptide[0], peptide[-1]
-
-    net_charge = 0.0
-    net_charge += math.pow(10, alpha_amino[nterm]) / (math.pow(10, alpha_amino[nterm]) + math.pow(10, pH))
-    net_charge -= math.pow(10, pH) / (math.pow(10, alpha_carboxy[cterm]) + math.pow(10, pH))
-
-    for aa in peptide:
-        if aa in sidechain_positive:
-            net_charge += math.pow(10, sidechain_positive[aa]) / (math.pow(10, sidechain_positive[aa]) + math.pow(10, pH))
-        if aa in sidechain_negative:
-            net_charge -= math.pow(10, pH) / (math.pow(10, sidechain_negative[aa]) + math.pow(10, pH))
-
-    return net_charge
+    return float(titration.charge(titration.peptide_groups(peptide), pH)[0])
 
+@traced()
 def isoelectric_point(peptide, pH=7.0, min=4, max=12):
-    charge = charge_at_pH(pH, peptide)
-    if max - min > 0.0001:
-        if charge > 0.0:
-            min = pH
-        else:
-            max = pH
-        next_pH = (min + max) / 2
-        return isoelectric_point(peptide, next_pH, min, max)
-    return pH
+    return float(titration.isoelectric_point(titration.peptide_groups(peptide), pH, min, max)[0])
 
+@traced()
 def hydropathy_index(peptide):
-    index = 0
-    for i in peptide:
-        index += float(lookup_value(i, hydropathy()))
-    index /= len(peptide)
-    return index
+    return float(HYDROPATHY[encode_residues(peptide)].sum() / len(peptide))
 
+@traced()
 def atomic_composition(peptide):
-    chain = np.zeros((1,5), dtype=int)[0]
-    for i in peptide:
-        val = lookup_value(i, atomic())
-        chain = np.add(chain, val)
+    chain = ATOMIC[encode_residues(peptide)].sum(axis=0)
 
-    atoms = ["C", "H", "N", "O", "S"]
+    atoms = list(ATOMS)
     formula = []
     for tid, t in enumerate(chain):
         if tid == 1: # Hydrogen
@@ -87,9 +66,11 @@ def atomic_composition(peptide):
     nb_atoms = sum(chain) - (len(peptide)-1)*3
     return formula, nb_atoms
 
+@traced()
 def amino_count(peptide):
     return dict(collections.Counter(peptide))
 
+@traced()
 def charged_residues(peptide):
     pos, neg = 0, 0
     for i in peptide:
@@ -99,6 +80,7 @@ def charged_residues(peptide):
             neg += 1
     return pos, neg
 
+@traced()
 def extinction_coefficient(peptide):
     nY, nW, nC = 0, 0, 0
     for i in peptide:
@@ -114,21 +96,13 @@ def extinction_coefficient(peptide):
     ext_coeff = (nY * 1490) + (nW * 5500) + (nC * 125)
     return ext_coeff
 
+@traced()
 def instability_index(peptide):
-    list = []
-    for pid, amino in enumerate(peptide):
-        layer = [v for k, v in DIWV().items() if amino in k][0]
-        if pid != len(peptide)-1:
-            val = [v for k, v in layer.items() if peptide[pid+1] in k][0]
-            label = amino + peptide[pid+1]
-        else:
-            val = 0.0
-            label = 'NA'
-        list.append(val)
-
-    II = (10/(len(peptide))) * sum(list)
-    return II
+    codes = encode_residues(peptide)
+    II = (10/(len(peptide))) * DIPEPTIDE[codes[:-1], codes[1:]].sum()
+    return float(II)
 
+@traced()
 def aliphatic_index(peptide):
     nA, nV, nI, nL = 0, 0, 0, 0
     for i in peptide:
@@ -147,37 +121,6 @@ def aliphatic_index(peptide):
     index = nA + (2.9 * nV/total_atoms) + (3.9 * (nI/total_atoms + nL/total_atoms)) * 100
     return index
 
+@traced()
 def compress(seq):
-    return len(zlib.compress(seq.encode('utf-8')))
-
-def binary_array_to_hex(arr):
-    bit_string = ''.join(str(b) for b in 1 * arr.flatten())
-    width = int(np.ceil(len(bit_string)/4))
-    return '{:0>{width}x}'.format(int(bit_string, 2), width=width)
-
-def seq_to_pixels(seq):
-    pixels = []
-
-    for n in seq:
-        if n == 'A':
-            pixels.append((30,30,30))
-        if n == 'G':
-            pixels.append((65,150,65))
-        if n == 'C':
-            pixels.append((255,255,255))
-        if n == 'T':
-            pixels.append((0,50,140))
-
-    dim = round(math.sqrt(len(seq)))
-    diff = dim ** 2 - len(seq)
-
-    for _ in range(diff):
-        pixels.append((255,255,0))
-
-    array = np.array(pixels, dtype=np.uint8)
-    return Image.frombytes("RGB", (dim, dim), bytes(array))
-
-def average_hash(image, hash_size=8, mean=np.mean):
-    img = image.convert('L').resize((hash_size, hash_size), Image.ANTIALIAS)
-    pixels = np.asarray(img)
-    return binary_array_to_hex(pixels > mean(pixels))
+    return compressed_size(seq, 'zlib')
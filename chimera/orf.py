@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import collections
+import numpy as np
+from chimera.translate import AMBIGUOUS, CODON_LUT, STOPS, codon_index, codon_indices, encode_bases
+
+# frame: 0 | 1 | 2 offset of the reading frame on its own strand
+# strand: +1 forward | -1 reverse complement
+# start, stop: 0-based forward strand coordinates of the ORF, stop exclusive and including the STOP codon
+ORF = collections.namedtuple('ORF', ['frame', 'strand', 'start', 'stop', 'protein'])
+
+def reverse_complement(codes):
+    rc = 3 - codes[::-1]
+    rc[codes[::-1] == AMBIGUOUS] = AMBIGUOUS
+    return rc
+
+def frame_orfs(frame_idx, start_codons, min_length):
+    # Longest ORF per STOP: the first start codon after the previous in-frame STOP, in codon units
+    stops = np.flatnonzero(np.isin(frame_idx, STOPS))
+    starts = np.flatnonzero(np.isin(frame_idx, start_codons))
+    first = np.searchsorted(starts, np.concatenate(([0], stops + 1))[:len(stops)])
+    valid = first < len(starts)
+    begin = np.append(starts, 0)[first]
+    valid &= begin < stops
+    valid &= stops - begin >= min_length
+    return begin[valid], stops[valid] + 1
+
+def find_orfs(seq, min_length=30, start_codons=('ATG',), strands=(1, -1)):
+    start_codons = [codon_index(c) for c in start_codons]
+    codes = encode_bases(seq)
+    length = len(codes)
+
+    # One codon index pass per strand, every frame is a strided view into it
+    indices, found = {}, []
+    for strand in strands:
+        idx = indices[strand] = codon_indices(codes if strand == 1 else reverse_complement(codes))
+        for frame in range(3):
+            begin, end = frame_orfs(idx[frame::3], start_codons, min_length)
+            begin, end = begin * 3 + frame, end * 3 + frame
+            start, stop = (begin, end) if strand == 1 else (length - end, length - begin)
+            found.append((start, stop, begin, np.full(len(begin), frame), np.full(len(begin), strand)))
+
+    start, stop, offset, frame, strand = (np.concatenate(col) for col in zip(*found))
+    order = np.lexsort((-strand, start))
+
+    # Proteins are only translated as each ORF is consumed
+    for i in order.tolist():
+        codons = indices[strand[i]][offset[i]: offset[i] + stop[i] - start[i]: 3]
+        protein = CODON_LUT[codons].tobytes().decode('ascii')
+        yield ORF(int(frame[i]), int(strand[i]), int(start[i]), int(stop[i]), 'M' + protein[1:])
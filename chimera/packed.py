@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+
+import collections, glob, mmap, os, struct
+import numpy as np
+from chimera.faidx import IndexedFasta
+from chimera.translate import AMBIGUOUS, encode_bases
+
+# 2-bit packing, four bases per byte with the first base in the high bits: A = 00 | C = 01 | G = 10 | T = 11
+# Ambiguous bases are stored as A and recorded as [start, end) runs in the N-mask.
+BASES = 'ACGTN'
+UNPACK = np.array([[b >> s & 3 for s in (6, 4, 2, 0)] for b in range(256)], dtype=np.uint8)
+BYTE_COUNTS = np.array([np.bincount(row, minlength=4) for row in UNPACK], dtype=np.int64)
+DECODE = np.frombuffer(BASES.encode('ascii'), dtype=np.uint8)
+
+def pack_codes(codes):
+    padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    padded[:len(codes)][codes == AMBIGUOUS] = 0
+    quads = padded.reshape(-1, 4)
+    return (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+
+def ambiguous_runs(codes):
+    mask = np.concatenate(([False], codes == AMBIGUOUS, [False]))
+    edges = np.flatnonzero(mask[1:] != mask[:-1])
+    return edges[0::2].astype(np.int64), edges[1::2].astype(np.int64)
+
+class PackedSequence():
+    def __init__(self, data, length, nblocks=None, start=0, reverse=False):
+        self.data = data                                    # Packed bytes, shared between views
+        self.length = length
+        self.nblocks = nblocks if nblocks is not None else (np.empty(0, np.int64), np.empty(0, np.int64))
+        self.start = start                                  # Offset of the view into data, in bases
+        self.reverse = reverse
+
+    @classmethod
+    def from_string(cls, seq):
+        codes = encode_bases(seq)
+        return cls(pack_codes(codes), len(codes), ambiguous_runs(codes))
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, end, step = key.indices(self.length)
+            if step != 1:
+                raise ValueError("PackedSequence only supports contiguous slices")
+            end = max(start, end)
+            if self.reverse:
+                start, end = self.length - end, self.length - start
+            return PackedSequence(self.data, end - start, self.nblocks, self.start + start, self.reverse)
+        if key < 0:
+            key += self.length
+        if not 0 <= key < self.length:
+            raise IndexError("PackedSequence index out of range")
+        return BASES[self[key: key+1].codes()[0]]
+
+    def reverse_complement(self):
+        return PackedSequence(self.data, self.length, self.nblocks, self.start, not self.reverse)
+
+    def mask(self):
+        # N-mask runs clipped to the view, in forward coordinates relative to the view
+        starts, ends = self.nblocks
+        starts = np.clip(starts - self.start, 0, self.length)
+        ends = np.clip(ends - self.start, 0, self.length)
+        keep = ends > starts
+        return starts[keep], ends[keep]
+
+    def unpack(self, start, end):
+        # Raw 2-bit codes of data positions [start, end), ambiguous bases still read as A
+        first = start // 4
+        return UNPACK[np.asarray(self.data[first: -(-end // 4)])].ravel()[start - first*4: end - first*4]
+
+    def codes(self):
+        codes = self.unpack(self.start, self.start + self.length)
+        for s, e in zip(*self.mask()):
+            codes[s: e] = AMBIGUOUS
+        if self.reverse:
+            codes = np.where(codes[::-1] == AMBIGUOUS, AMBIGUOUS, 3 - codes[::-1]).astype(np.uint8)
+        return codes
+
+    def counts(self):
+        # Whole bytes are counted through a per-byte table, the partial bytes at either end are unpacked
+        start, end = self.start, self.start + self.length
+        first, last = -(-start // 4), end // 4
+        if first < last:
+            counts = np.bincount(np.asarray(self.data[first: last]), minlength=256) @ BYTE_COUNTS
+            edges = [(start, first*4), (last*4, end)]
+        else:
+            counts = np.zeros(4, dtype=np.int64)
+            edges = [(start, end)]
+        for s, e in edges:
+            if e > s:
+                counts += np.bincount(self.unpack(s, e), minlength=4)
+
+        n = int(sum(e - s for s, e in zip(*self.mask())))
+        counts[0] -= n
+        result = dict(zip('TGCA' if self.reverse else 'ACGT', counts.tolist()))
+        result = {b: result[b] for b in 'ACGT'}
+        result['N'] = n
+        return result
+
+    def count(self, base):
+        return self.counts().get(base, 0)
+
+    def __bytes__(self):
+        return DECODE[self.codes()].tobytes()
+
+    def __str__(self):
+        return bytes(self).decode('ascii')
+
+    def __repr__(self):
+        return f"PackedSequence(length={self.length}, strand={'-' if self.reverse else '+'})"
+
+# Library file: one mmap for every genome
+# Header: magic 'CHM2' | version u32 | record count u32
+# Record: name u16 + bytes | label u32 + bytes | length u64 | data offset u64 | N-runs u32 + (start u64, end u64) * runs
+# Packed data follows the records, each genome aligned to 8 bytes.
+MAGIC = b'CHM2'
+VERSION = 1
+
+def write_library(path, sequences):
+    entries = []
+    for name, (label, seq) in sequences.items():
+        if not isinstance(seq, PackedSequence):
+            seq = PackedSequence.from_string(seq)
+        elif seq.start % 4 or seq.reverse:
+            codes = seq.codes()
+            seq = PackedSequence(pack_codes(codes), len(codes), ambiguous_runs(codes))
+        entries.append((name, label, seq))
+
+    def record(name, label, seq, offset):
+        starts, ends = seq.mask()
+        name, label = name.encode(), label.encode()
+        runs = np.stack([starts, ends], axis=1).astype('<u8').tobytes()
+        return (struct.pack('<H', len(name)) + name + struct.pack('<I', len(label)) + label +
+                struct.pack('<QQI', len(seq), offset, len(starts)) + runs)
+
+    # Two passes, the header size is needed to place the data
+    header_size = 12 + sum(len(record(n, l, s, 0)) for n, l, s in entries)
+    offset = -(-header_size // 8) * 8
+    records, blobs = [], []
+    for name, label, seq in entries:
+        blob = np.asarray(seq.data[seq.start // 4: -(-(seq.start + len(seq)) // 4)])
+        records.append(record(name, label, seq, offset))
+        blobs.append((offset, blob))
+        offset += -(-len(blob) // 8) * 8
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<II', VERSION, len(entries)) + b''.join(records))
+        for offset, blob in blobs:
+            f.seek(offset)
+            f.write(blob.tobytes())
+
+def read_library(path):
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a packed genome library")
+    version, count = struct.unpack_from('<II', data, 4)
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported library version {version}")
+
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    library = collections.OrderedDict()
+    pos = 12
+    for _ in range(count):
+        (size,) = struct.unpack_from('<H', data, pos)
+        name = data[pos+2: pos+2+size].decode()
+        pos += 2 + size
+        (size,) = struct.unpack_from('<I', data, pos)
+        label = data[pos+4: pos+4+size].decode()
+        pos += 4 + size
+        length, offset, runs = struct.unpack_from('<QQI', data, pos)
+        pos += 20
+        blocks = np.frombuffer(data, dtype='<u8', count=runs*2, offset=pos).reshape(-1, 2).astype(np.int64)
+        pos += runs * 16
+        seq = PackedSequence(buffer[offset: offset + -(-length // 4)], length, (blocks[:, 0], blocks[:, 1]))
+        library[name] = (label, seq)
+    return library
+
+def pack_genomes(directory='genome', path='genome/library.2bit'):
+    sequences = collections.OrderedDict()
+    for fasta in sorted(glob.glob(os.path.join(directory, '*.fasta'))):
+        index = IndexedFasta(fasta)
+        for record in index.records():
+            sequences[os.path.basename(fasta)[:-len('.fasta')] if len(index) == 1 else record] = \
+                (index.header(record)[1:], index.fetch(record))
+        index.close()
+    write_library(path, sequences)
+    return path
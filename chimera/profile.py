@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from chimera.residue import *
+from chimera.protein import residue_codes
+
+# Sliding-window profiles over one or many peptides. Every property is one value per residue (or per adjacent
+# residue pair), window sums come from a single cumulative sum over all peptides laid end to end, so the cost
+# does not depend on the window width. Value k of a profile covers residues [k, k + window) of its peptide,
+# peptides shorter than the window get an empty profile.
+
+def windows(peptides, window):
+    # Start of every window in the concatenated residues, and the number of windows per peptide
+    codes, owner, lengths = residue_codes(peptides)
+    counts = np.maximum(lengths - window + 1, 0)
+    firsts = np.cumsum(lengths) - lengths
+    starts = np.repeat(firsts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+    return codes, owner, starts, counts
+
+def window_sum(values, starts, window):
+    total = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    return total[starts + window] - total[starts]
+
+def split(profile, counts, single):
+    profiles = np.split(profile, np.cumsum(counts)[:-1])
+    return profiles[0] if single else profiles
+
+def hydropathy_profile(peptides, window=9):
+    # Kyte-Doolittle average over each window
+    single = isinstance(peptides, str)
+    codes, _, starts, counts = windows([peptides] if single else peptides, window)
+    return split(window_sum(HYDROPATHY[codes], starts, window) / window, counts, single)
+
+def charge_profile(peptides, window=9, pH=7.0):
+    # Side chain charge inside each window, the free termini are left out as they belong to the whole chain
+    single = isinstance(peptides, str)
+    codes, _, starts, counts = windows([peptides] if single else peptides, window)
+    ph = np.power(10.0, pH)
+    positive = np.power(10.0, np.nan_to_num(SIDECHAIN_POSITIVE, nan=-np.inf))
+    negative = np.power(10.0, np.nan_to_num(SIDECHAIN_NEGATIVE, nan=np.inf))
+    residue = positive / (positive + ph) - ph / (negative + ph)
+    return split(window_sum(residue[codes], starts, window), counts, single)
+
+def aliphatic_profile(peptides, window=9):
+    # measure.aliphatic_index applied to each window
+    single = isinstance(peptides, str)
+    codes, _, starts, counts = windows([peptides] if single else peptides, window)
+    nA, nV, nIL = (window_sum(np.isin(codes, [RESIDUES.index(r) for r in residues]), starts, window)
+                   for residues in ('A', 'V', 'IL'))
+    return split(nA + (2.9 * nV/window) + (3.9 * (nIL/window)) * 100, counts, single)
+
+def instability_profile(peptides, window=9):
+    # measure.instability_index applied to each window: the window - 1 dipeptides inside it, scaled by 10 / window
+    single = isinstance(peptides, str)
+    codes, owner, starts, counts = windows([peptides] if single else peptides, window)
+    pairs = np.zeros(len(codes))
+    inside = owner[1:] == owner[:-1]
+    pairs[:-1][inside] = DIPEPTIDE[codes[:-1][inside], codes[1:][inside]]
+    return split(10 / window * window_sum(pairs, starts, window - 1), counts, single)
+
+PROFILES = {
+    'hydropathy': hydropathy_profile,
+    'charge': charge_profile,
+    'aliphatic': aliphatic_profile,
+    'instability': instability_profile,
+    }
+
+def segments(profile, threshold, window=9, min_length=1, above=True):
+    # Residue ranges [start, end) covered by consecutive windows on one side of the threshold,
+    # e.g. hydropathy >= 1.6 over 19 residues for transmembrane helices, instability > 40 for unstable stretches
+    hits = profile >= threshold if above else profile <= threshold
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], hits.view(np.int8), [0]))))
+    merged = []
+    for s, e in zip(edges[0::2].tolist(), edges[1::2].tolist()):
+        e += window - 1                                     # Last window of the run covers window - 1 more residues
+        if merged and s <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], e)
+        else:
+            merged.append((s, e))
+    return [(s, e) for s, e in merged if e - s >= min_length]
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+import math
+import numpy as np
+from PIL import Image
+from chimera.translate import AMBIGUOUS, encode_bases
+
+# Genome images: one pixel per base, row by row on a square of side round(sqrt(length)), as measure.seq_to_pixels
+# always drew them. Ambiguous bases get no pixel and the area past the last base is padded yellow.
+# Pixels are looked up from base codes (A = 0 | C = 1 | G = 2 | T = 3 | padding = 4), never built one tuple at a time.
+PAD = AMBIGUOUS
+RGB = np.array([(30, 30, 30), (255, 255, 255), (65, 150, 65), (0, 50, 140), (255, 255, 0)], dtype=np.uint8)
+# Grayscale as PIL converts RGB to L: (R * 19595 + G * 38470 + B * 7471 + 0x8000) >> 16
+LUMA = ((RGB.astype(np.int64) @ [19595, 38470, 7471] + 0x8000) >> 16).astype(np.uint8)
+
+# PIL fixed point resampling of 8 bit images
+PRECISION_BITS = 32 - 8 - 2
+
+def pixel_codes(seq):
+    # Codes of the drawn bases and the side of the image, the side still counts the ambiguous bases
+    codes = encode_bases(seq)
+    return codes[codes < AMBIGUOUS], round(math.sqrt(len(codes)))
+
+def band(kept, dim, first, last):
+    # Codes of image rows [first, last)
+    rows = np.full((last - first) * dim, PAD, dtype=np.uint8)
+    part = kept[first * dim: last * dim]
+    rows[:len(part)] = part
+    return rows.reshape(last - first, dim)
+
+def seq_to_pixels(seq, level=0):
+    # Full resolution image, or the mipmap at the given level for very large genomes
+    if level:
+        return mipmap(seq, level)
+    kept, dim = pixel_codes(seq)
+    return Image.fromarray(RGB[band(kept, dim, 0, dim)], 'RGB')
+
+def mipmap(seq, level=1):
+    # Image downscaled by 2 ** level, every pixel the mean colour of its block of bases.
+    # Built one band of blocks at a time, the full resolution image never exists.
+    kept, dim = pixel_codes(seq)
+    factor = 2 ** level
+    side = -(-dim // factor)
+    out = np.empty((side, side, 3), dtype=np.uint8)
+    cols = np.arange(0, dim, factor)
+    widths = np.diff(np.append(cols, dim))
+    for r, first in enumerate(range(0, dim, factor)):
+        last = min(first + factor, dim)
+        sums = np.add.reduceat(RGB[band(kept, dim, first, last)].sum(axis=0, dtype=np.int64), cols, axis=0)
+        out[r] = np.rint(sums / (widths * (last - first))[:, None])
+    return Image.fromarray(out, 'RGB')
+
+def tiles(seq, size=1024):
+    # Full resolution image as (column, row, tile) squares of up to size x size pixels, e.g. for a zoomable viewer
+    kept, dim = pixel_codes(seq)
+    for first in range(0, dim, size):
+        rows = band(kept, dim, first, min(first + size, dim))
+        for x in range(0, dim, size):
+            yield x // size, first // size, Image.fromarray(RGB[rows[:, x: x + size]], 'RGB')
+
+def lanczos_weights(size, out):
+    # (size x out) fixed point Lanczos-3 weights with the bounds, normalisation and rounding of PIL's resize
+    scale = size / out
+    filterscale = max(scale, 1.0)
+    support = 3.0 * filterscale
+    weights = np.zeros((size, out), dtype=np.int64)
+    for o in range(out):
+        center = (o + 0.5) * scale
+        low = max(int(center - support + 0.5), 0)
+        high = min(int(center + support + 0.5), size)
+        x = (np.arange(low, high) - center + 0.5) / filterscale
+        with np.errstate(divide='ignore', invalid='ignore'):
+            w = np.where(x == 0, 1.0, np.sin(np.pi * x) / (np.pi * x) * np.sin(np.pi * x / 3) / (np.pi * x / 3))
+        w = np.where((x >= -3.0) & (x < 3.0), w, 0.0)
+        if w.sum() != 0.0:
+            w = w / w.sum()
+        weights[low: high, o] = np.trunc(w * (1 << PRECISION_BITS) + np.where(w < 0, -0.5, 0.5))
+    return weights
+
+def clip8(ss):
+    return np.clip(ss >> PRECISION_BITS, 0, 255).astype(np.int64)
+
+def genome_hash(seq, hash_size=8, rows=256):
+    # measure.average_hash(seq_to_pixels(seq)) straight from the base codes: the horizontal resampling pass runs
+    # over bands of rows, only the (side x hash_size) intermediate is kept, then the vertical pass as PIL does it
+    kept, dim = pixel_codes(seq)
+    weights = lanczos_weights(dim, hash_size)
+    horizontal = np.empty((dim, hash_size), dtype=np.int64)
+    for first in range(0, dim, rows):
+        last = min(first + rows, dim)
+        horizontal[first: last] = clip8((1 << (PRECISION_BITS - 1)) + LUMA[band(kept, dim, first, last)].astype(np.int64) @ weights)
+    pixels = clip8((1 << (PRECISION_BITS - 1)) + weights.T @ horizontal)
+    return binary_array_to_hex(pixels > pixels.mean())
+
+def binary_array_to_hex(arr):
+    bit_string = ''.join(str(b) for b in 1 * arr.flatten())
+    width = int(np.ceil(len(bit_string)/4))
+    return '{:0>{width}x}'.format(int(bit_string, 2), width=width)
+
+def average_hash(image, hash_size=8, mean=np.mean):
+    img = image.convert('L').resize((hash_size, hash_size), Image.LANCZOS)
+    pixels = np.asarray(img)
+    return binary_array_to_hex(pixels > mean(pixels))
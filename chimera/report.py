@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+import functools, itertools, os, sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import pandas as pd
+from chimera import protein, residue, titration
+from chimera.cache import code_version
+from chimera.fasta import VERSION as FASTA_VERSION, FastaIO
+from chimera.protein import COLUMNS, ProteinAnalyzer
+from chimera.trace import merged, pool_options, remote
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Proteome reports: one row per peptide of the residue chain (split on '*' as compute.py does), every genome
+# analysed in a worker and written out as soon as it is done, so only the genomes in flight are held in memory.
+BATCH = 4096        # Peptides per ProteinAnalyzer, bounds the (peptides x 441) dipeptide counts
+VERSION = code_version(sys.modules[__name__], protein, residue, titration)
+
+def genome_peptides(uid, min_length=1):
+    # (peptide id, start in the residue chain, peptide), ids count every non-empty peptide like compute.py
+    FASTA = FastaIO(uid, lazy=True)
+    peptides, start, pid = [], 0, 0
+    for peptide in FASTA.res.split('*'):
+        if peptide:
+            if len(peptide) >= min_length:
+                peptides.append((pid, start, peptide))
+            pid += 1
+        start += len(peptide) + 1
+    return peptides
+
+def analyze_genome(uid, pH=7.0, min_length=1):
+    # Metrics are cached per genome content, pH and length cut-off: a repeated run neither translates nor analyses
+    FASTA = FastaIO(uid, lazy=True)
+    if FASTA.cache is None:
+        return peptide_metrics(uid, pH, min_length)
+    key = FASTA.cache.key('report', VERSION, FASTA_VERSION, FASTA.digest, float(pH), min_length)
+    return FASTA.cache.memoize(key, lambda: peptide_metrics(uid, pH, min_length))
+
+def peptide_metrics(uid, pH=7.0, min_length=1):
+    peptides = genome_peptides(uid, min_length)
+    frames = []
+    for i in range(0, len(peptides), BATCH):
+        batch = peptides[i: i + BATCH]
+        frame = pd.DataFrame(ProteinAnalyzer([p for _, _, p in batch]).analyze(pH), columns=COLUMNS)
+        frame.insert(0, 'uid', uid)
+        frame.insert(1, 'peptide', [pid for pid, _, _ in batch])
+        frame.insert(2, 'start', [start for _, start, _ in batch])
+        frame['sequence'] = [p for _, _, p in batch]
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['uid', 'peptide', 'start'] + COLUMNS + ['sequence'])
+
+def imap_unordered(pool, fn, items, window):
+    # pool.map in completion order with at most `window` tasks submitted, finished results are not kept around
+    items = iter(items)
+    pending = {pool.submit(fn, item) for item in itertools.islice(items, window)}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending |= {pool.submit(fn, item) for item in itertools.islice(items, 1)}
+            yield future.result()
+
+def reports(uids, pH=7.0, min_length=1, workers=None):
+    # Per-genome frames in completion order, the workers' spans merged into the tracer when tracing
+    with ProcessPoolExecutor(workers, **pool_options()) as pool:
+        for frame in imap_unordered(pool, remote(functools.partial(analyze_genome, pH=pH, min_length=min_length)), uids,
+                                    2 * (workers or os.cpu_count() or 1)):
+            yield merged(frame)
+
+class CSVWriter():
+    def __init__(self, path):
+        self.f = open(path, 'w', newline='')
+        self.header = True
+
+    def write(self, frame):
+        frame.to_csv(self.f, header=self.header, index=False, float_format='%.6g')
+        self.header = False
+
+    def close(self):
+        self.f.close()
+
+class JSONLWriter():
+    def __init__(self, path):
+        self.f = open(path, 'w')
+
+    def write(self, frame):
+        if len(frame):
+            self.f.write(frame.to_json(orient='records', lines=True).rstrip('\n') + '\n')
+
+    def close(self):
+        self.f.close()
+
+class ParquetWriter():
+    # One row group per genome, the schema comes from the first frame
+    def __init__(self, path):
+        if pyarrow is None:
+            raise ImportError("Parquet output needs pyarrow")
+        self.path = path
+        self.writer = None
+
+    def write(self, frame):
+        table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+        if self.writer is None:
+            self.writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+WRITERS = {
+    'csv': CSVWriter,
+    'jsonl': JSONLWriter,
+    'parquet': ParquetWriter,
+    }
+
+def output_format(path, format=None):
+    # Format of the report file, from the extension unless given. Raises ValueError when it cannot be written here.
+    format = format or os.path.splitext(path)[1].lstrip('.').lower()
+    if format not in WRITERS:
+        raise ValueError(f"{path}: unknown format '{format}', expected one of {', '.join(sorted(WRITERS))}")
+    if format == 'parquet' and pyarrow is None:
+        raise ValueError("Parquet output needs pyarrow")
+    return format
+
+def open_writer(path, format=None):
+    return WRITERS[output_format(path, format)](path)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from chimera.codon import amino_weight, pKa, halflife, hydropathy, atomic, DIWV
+
+# Residue codes follow RESIDUES, anything else (X from ambiguous codons, lowercase, gaps) is UNKNOWN_RESIDUE.
+# Unknown residues add nothing to the summed tables and have NaN halflife and pKa values.
+RESIDUES = 'ACDEFGHIKLMNPQRSTVWY'
+UNKNOWN_RESIDUE = len(RESIDUES)
+SIZE = UNKNOWN_RESIDUE + 1
+ATOMS = 'CHNOS'
+
+RESIDUE_LUT = np.full(256, UNKNOWN_RESIDUE, dtype=np.uint8)
+RESIDUE_LUT[np.frombuffer(RESIDUES.encode('ascii'), dtype=np.uint8)] = np.arange(len(RESIDUES))
+
+def encode_residues(peptide):
+    if isinstance(peptide, np.ndarray):
+        return peptide
+    return RESIDUE_LUT[np.frombuffer(peptide.encode('ascii', 'replace'), dtype=np.uint8)]
+
+def compile_table(table, width=None, fill=0.0):
+    # 'Ala / A' keyed codon.py table -> array indexed by residue code
+    shape = (SIZE,) if width is None else (SIZE, width)
+    array = np.full(shape, fill, dtype=np.float64)
+    for k, v in table.items():
+        code = RESIDUES.find(k.split('/')[1].strip())
+        if code >= 0:
+            array[code] = v
+    return array
+
+def compile_pKa(group):
+    array = np.full(SIZE, np.nan)
+    for aa, value in pKa()[group].items():
+        array[RESIDUES.index(aa)] = value
+    return array
+
+def compile_DIWV():
+    # DIWV[a][b]: weight of the dipeptide a followed by b
+    table = DIWV()
+    array = np.zeros((SIZE, SIZE))
+    for a, row in table.items():
+        for b, value in row.items():
+            array[RESIDUES.index(a), RESIDUES.index(b)] = value
+    return array
+
+WEIGHT = compile_table(amino_weight())
+HYDROPATHY = compile_table(hydropathy())
+ATOMIC = compile_table(atomic(), len(ATOMS)).astype(np.int64)
+HALFLIFE = compile_table(halflife(), 3, np.nan)           # Minutes: Mammalian | Yeast | E.Coli
+DIPEPTIDE = compile_DIWV()
+ALPHA_AMINO = compile_pKa('alpha_amino')
+ALPHA_CARBOXY = compile_pKa('alpha_carboxy')
+SIDECHAIN_POSITIVE = compile_pKa('sidechain_positive')
+SIDECHAIN_NEGATIVE = compile_pKa('sidechain_negative')
+WATER_MASS = 18.01524
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+import collections, glob, os
+import numpy as np
+from chimera.align import Scoring, banded_local
+from chimera.faidx import IndexedFasta
+from chimera.orf import reverse_complement
+from chimera.translate import AMBIGUOUS, encode_bases
+
+# strand: +1 query matches the forward genome | -1 query matches the reverse complement
+# query_start, query_end: on the query as given | target_start, target_end: forward genome coordinates, ends exclusive
+Hit = collections.namedtuple('Hit', ['uid', 'strand', 'score', 'identity', 'query_start', 'query_end',
+                                     'target_start', 'target_end', 'seeds'])
+
+def kmer_codes(codes, k):
+    # Every k-mer as a 2-bit packed integer, windows touching an ambiguous base are dropped
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.empty(0, np.uint64), np.empty(0, np.int64)
+    kmers = np.zeros(n, dtype=np.uint64)
+    for i in range(k):
+        kmers = (kmers << np.uint64(2)) | (codes[i: i+n] & 3).astype(np.uint64)
+    ambiguous = np.concatenate(([0], np.cumsum(codes == AMBIGUOUS)))
+    keep = ambiguous[k:] == ambiguous[:-k]
+    return kmers[keep], np.flatnonzero(keep)
+
+def ungapped_score(query, target, diagonal, scoring):
+    # Best scoring ungapped segment on one diagonal (maximum subarray over the match / mismatch scores)
+    lo, hi = max(0, -diagonal), min(len(query), len(target) - diagonal)
+    if hi <= lo:
+        return 0
+    q, t = query[lo: hi], target[lo + diagonal: hi + diagonal]
+    scores = np.where((q == t) & (q != AMBIGUOUS), scoring.match, scoring.mismatch)
+    total = np.concatenate(([0], np.cumsum(scores)))
+    return float(np.max(total - np.minimum.accumulate(total)))
+
+class KmerIndex():
+    def __init__(self, k=12, path='genome/kmer_index.npz', directory='genome'):
+        self.k = k
+        self.path = path
+        self.directory = directory              # FASTA files the seeds point into
+        self.uids = []
+        self.kmers = np.empty(0, np.uint64)     # Sorted seeds
+        self.genome = np.empty(0, np.int32)     # Position of each seed in self.uids
+        self.pos = np.empty(0, np.int64)
+        self.pending = []                       # Sorted seeds of genomes added without merging
+        self.targets = {}
+
+    @classmethod
+    def build(cls, directory='genome', k=12, path='genome/kmer_index.npz'):
+        index = cls(k, path, directory)
+        for fasta in sorted(glob.glob(os.path.join(directory, '*.fasta'))):
+            reader = IndexedFasta(fasta)
+            index.add(os.path.basename(fasta)[:-len('.fasta')], reader.fetch(reader.records()[0]), merge=False)
+            reader.close()
+        index.merge()
+        return index
+
+    @classmethod
+    def load(cls, path='genome/kmer_index.npz'):
+        with np.load(path) as data:
+            index = cls(int(data['k']), path, str(data['directory']))
+            index.uids = data['uids'].tolist()
+            index.kmers, index.genome, index.pos = data['kmers'], data['genome'], data['pos']
+        return index
+
+    @classmethod
+    def open(cls, directory='genome', k=12, path='genome/kmer_index.npz'):
+        return cls.load(path) if os.path.exists(path) else cls.build(directory, k, path)
+
+    def save(self):
+        self.merge()
+        np.savez(self.path, k=self.k, directory=self.directory, uids=np.array(self.uids), kmers=self.kmers, genome=self.genome, pos=self.pos)
+
+    def merge(self):
+        # Seeds of the pending genomes are sorted among themselves, then inserted into the sorted arrays in one pass.
+        # Equal seeds stay in genome then position order.
+        if not self.pending:
+            return
+        kmers, genome, pos = (np.concatenate(column) for column in zip(*self.pending))
+        self.pending = []
+        order = np.argsort(kmers, kind='stable')
+        kmers, genome, pos = kmers[order], genome[order], pos[order]
+        at = np.searchsorted(self.kmers, kmers, side='right')
+        self.kmers = np.insert(self.kmers, at, kmers)
+        self.genome = np.insert(self.genome, at, genome)
+        self.pos = np.insert(self.pos, at, pos)
+
+    def add(self, uid, seq, merge=True):
+        # Only the new genome is k-merised. Without merge its seeds wait for merge(), so a batch of genomes costs
+        # one pass over the library.
+        if uid in self.uids:
+            return False
+        kmers, pos = kmer_codes(encode_bases(seq), self.k)
+        self.uids.append(uid)
+        self.pending.append((kmers, np.full(len(kmers), len(self.uids) - 1, dtype=np.int32), pos))
+        if merge:
+            self.merge()
+        return True
+
+    def seeds(self, codes, max_occurrences=500):
+        # (query position, genome, target position) for every exact k-mer match, repetitive seeds are skipped
+        kmers, qpos = kmer_codes(codes, self.k)
+        lo = np.searchsorted(self.kmers, kmers, side='left')
+        hi = np.searchsorted(self.kmers, kmers, side='right')
+        count = hi - lo
+        keep = (count > 0) & (count <= max_occurrences)
+        lo, count, qpos = lo[keep], count[keep], qpos[keep]
+        slots = np.repeat(lo - (np.cumsum(count) - count), count) + np.arange(count.sum())
+        return np.repeat(qpos, count), self.genome[slots], self.pos[slots]
+
+    def query(self, seq, top=10, band=32, min_seeds=2, min_score=40, candidates=20, scoring=Scoring(2, -3, -5, -2)):
+        query = encode_bases(seq)
+        results = []
+        for strand, codes in ((1, query), (-1, reverse_complement(query))):
+            qpos, genome, tpos = self.seeds(codes)
+            if len(qpos) == 0:
+                continue
+
+            # Seeds are clustered by genome and diagonal bucket, the densest clusters become candidates
+            diagonal = tpos - qpos
+            bucket = diagonal // band
+            _, first, counts = np.unique(genome.astype(np.int64) << 40 | bucket + (1 << 39),
+                                            return_index=True, return_counts=True)
+            found = []
+            for c in np.argsort(-counts, kind='stable')[:candidates]:
+                if counts[c] < min_seeds:
+                    break
+                g = int(genome[first[c]])
+                members = (genome == g) & (bucket == bucket[first[c]])
+                d = int(np.median(diagonal[members]))
+                # Neighbouring buckets of the same hit collapse onto the densest one
+                if any(f[1] == g and abs(f[2] - d) <= band for f in found):
+                    continue
+                # Cheap ungapped pass along the diagonal before paying for a gapped extension
+                if ungapped_score(codes, self.target(g), d, scoring) >= min_score:
+                    found.append((int(counts[c]), g, d))
+            if not found:
+                continue
+
+            extensions = banded_local(codes, [self.target(g) for _, g, _ in found], [d for _, _, d in found], band, scoring)
+            for (seeds, g, _), ext in zip(found, extensions):
+                if ext.score < min_score:
+                    continue
+                qs, qe = (ext.start1, ext.end1) if strand == 1 else (len(codes) - ext.end1, len(codes) - ext.start1)
+                results.append(Hit(self.uids[g], strand, ext.score, ext.matches / ext.columns, qs, qe,
+                                   ext.start2, ext.end2, seeds))
+        results.sort(key=lambda h: (-h.score, -h.identity))
+        return results[:top]
+
+    def target(self, genome):
+        if genome not in self.targets:
+            fasta = os.path.join(self.directory, f"{self.uids[genome]}.fasta")
+            reader = IndexedFasta(fasta)
+            self.targets[genome] = encode_bases(reader.fetch(reader.records()[0]))
+            reader.close()
+        return self.targets[genome]
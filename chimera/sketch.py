@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+import collections, glob, math, os
+import numpy as np
+from chimera.faidx import IndexedFasta
+from chimera.translate import AMBIGUOUS, encode_bases
+
+# Bottom-k MinHash over canonical k-mers: the `size` smallest 64-bit hashes of min(kmer, reverse complement)
+EMPTY = np.iinfo(np.uint64).max
+Match = collections.namedtuple('Match', ['uid', 'jaccard', 'distance', 'ani', 'shared'])
+
+def mix64(x):
+    # SplitMix64 finalizer, uint64 arithmetic wraps
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xbf58476d1ce4e5b9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94d049bb133111eb)
+    return x ^ (x >> np.uint64(31))
+
+def canonical_kmers(codes, k):
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.empty(0, np.uint64)
+    forward = np.zeros(n, dtype=np.uint64)
+    reverse = np.zeros(n, dtype=np.uint64)
+    for i in range(k):
+        forward = (forward << np.uint64(2)) | (codes[i: i+n] & 3).astype(np.uint64)
+        reverse |= (3 - (codes[i: i+n] & 3)).astype(np.uint64) << np.uint64(2 * i)
+    ambiguous = np.concatenate(([0], np.cumsum(codes == AMBIGUOUS)))
+    return np.minimum(forward, reverse)[ambiguous[k:] == ambiguous[:-k]]
+
+def sketch(seq, k=21, size=1000):
+    if not 0 < k <= 31:
+        raise ValueError("k must be between 1 and 31")
+    hashes = np.unique(mix64(canonical_kmers(encode_bases(seq), k)))
+    return hashes[:size]
+
+def pad(sketch, size=1000):
+    row = np.full(size, EMPTY, dtype=np.uint64)
+    row[:min(size, len(sketch))] = sketch[:size]
+    return row
+
+def jaccard_rows(rows, sketch, size=1000):
+    # Bottom-k estimator against every row at once: of the `size` smallest hashes in the union of the two
+    # sketches, the share held by both. Rows are sorted and padded with EMPTY.
+    merged = np.sort(np.concatenate((rows, np.broadcast_to(pad(sketch, size), (len(rows), size))), axis=1), axis=1)
+    filled = merged != EMPTY
+    shared = np.zeros_like(filled)
+    shared[:, 1:] = (merged[:, 1:] == merged[:, :-1]) & filled[:, 1:]
+    rank = np.cumsum(filled & ~shared, axis=1)
+    union = np.minimum(rank[:, -1], size)
+    # Hashes past the size-th distinct value of the union fall outside its bottom-k sketch
+    inside = rank <= union[:, None]
+    common = np.count_nonzero(shared & inside, axis=1)
+    return np.divide(common, union, out=np.zeros(len(rows)), where=union > 0), common
+
+def jaccard(sketch1, sketch2, size=1000):
+    j, shared = jaccard_rows(pad(sketch1, size)[None], sketch2, size)
+    return float(j[0]), int(shared[0])
+
+def mash_distance(j, k=21):
+    # Mash distance (Ondov et al. 2016), ANI is approximately 1 - distance
+    if j <= 0:
+        return 1.0
+    return 0.0 if j >= 1 else -math.log(2 * j / (1 + j)) / k
+
+class SketchLibrary():
+    def __init__(self, k=21, size=1000, path='genome/sketches.npz'):
+        self.k = k
+        self.size = size
+        self.path = path
+        self.uids = []
+        self.sketches = np.empty((0, size), dtype=np.uint64)  # Rows padded with EMPTY
+
+    @classmethod
+    def build(cls, directory='genome', k=21, size=1000, path='genome/sketches.npz'):
+        library = cls(k, size, path)
+        for fasta in sorted(glob.glob(os.path.join(directory, '*.fasta'))):
+            reader = IndexedFasta(fasta)
+            library.add(os.path.basename(fasta)[:-len('.fasta')], reader.fetch(reader.records()[0]))
+            reader.close()
+        return library
+
+    @classmethod
+    def load(cls, path='genome/sketches.npz'):
+        with np.load(path) as data:
+            library = cls(int(data['k']), int(data['size']), path)
+            library.uids = data['uids'].tolist()
+            library.sketches = data['sketches']
+        return library
+
+    @classmethod
+    def open(cls, directory='genome', k=21, size=1000, path='genome/sketches.npz'):
+        return cls.load(path) if os.path.exists(path) else cls.build(directory, k, size, path)
+
+    def save(self):
+        np.savez(self.path, k=self.k, size=self.size, uids=np.array(self.uids), sketches=self.sketches)
+
+    def add(self, uid, seq):
+        if uid in self.uids:
+            return False
+        self.uids.append(uid)
+        self.sketches = np.concatenate((self.sketches, pad(sketch(seq, self.k, self.size), self.size)[None]))
+        return True
+
+    def get(self, uid):
+        row = self.sketches[self.uids.index(uid)]
+        return row[row != EMPTY]
+
+    def compare(self, uid1, uid2):
+        j, shared = jaccard_rows(self.sketches[[self.uids.index(uid1)]], self.get(uid2), self.size)
+        j, shared = float(j[0]), int(shared[0])
+        d = mash_distance(j, self.k)
+        return Match(uid2, j, d, 1 - d, shared)
+
+    def query(self, seq, top=5):
+        # Whole library against one sketch in a single pass
+        j, shared = jaccard_rows(self.sketches, sketch(seq, self.k, self.size), self.size)
+        matches = []
+        for row in np.argsort(-j, kind='stable')[:top]:
+            d = mash_distance(j[row], self.k)
+            matches.append(Match(self.uids[row], float(j[row]), d, 1 - d, int(shared[row])))
+        return matches
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+
+import itertools, mmap, os
+import numpy as np
+
+# PDB structures as NumPy structured arrays, one row per ATOM/HETATM record. The file is mapped, the atom lines
+# are cut out of it as an (atoms x 80) byte matrix and every fixed-column field is converted in one vectorized
+# step. Records may be shorter than 80 columns (GROMACS writes no element), missing elements are inferred from
+# the atom name.
+# Spatial queries go through a cell list: atoms are bucketed in cubes of the query radius, so a radius search
+# only compares atoms of neighbouring cells and all pairs within a cutoff cost O(n) rather than O(n^2).
+ATOM = np.dtype([
+    ('serial', np.int64),
+    ('name', 'U4'),
+    ('altloc', 'U1'),
+    ('resname', 'U4'),
+    ('chain', 'U1'),
+    ('resseq', np.int64),
+    ('icode', 'U1'),
+    ('coord', np.float64, (3,)),
+    ('occupancy', np.float32),
+    ('bfactor', np.float32),
+    ('element', 'U2'),
+    ('hetero', np.bool_),
+    ('model', np.int32),
+    ])
+
+RESIDUE = np.dtype([
+    ('model', np.int32),
+    ('chain', 'U1'),
+    ('resseq', np.int64),
+    ('icode', 'U1'),
+    ('resname', 'U4'),
+    ('start', np.int64),    # First and one past the last atom of the residue
+    ('end', np.int64),
+    ])
+
+WIDTH = 80
+SPACE = ord(' ')
+
+# Van der Waals (Bondi) and covalent radii in Angstroms, DEFAULT_RADII for anything else
+VDW_RADII = {'H': 1.20, 'C': 1.70, 'N': 1.55, 'O': 1.52, 'S': 1.80, 'P': 1.80, 'SE': 1.90, 'F': 1.47, 'CL': 1.75,
+             'BR': 1.85, 'I': 1.98, 'NA': 2.27, 'K': 2.75, 'MG': 1.73, 'CA': 2.31, 'ZN': 1.39, 'FE': 1.94}
+COVALENT_RADII = {'H': 0.31, 'C': 0.76, 'N': 0.71, 'O': 0.66, 'S': 1.05, 'P': 1.07, 'SE': 1.20, 'F': 0.57,
+                  'CL': 1.02, 'BR': 1.20, 'I': 1.39, 'NA': 1.66, 'K': 2.03, 'MG': 1.41, 'CA': 1.76, 'ZN': 1.22,
+                  'FE': 1.32}
+DEFAULT_RADII = (1.80, 0.77)
+BOND_TOLERANCE = 0.45   # Bonded when closer than the sum of the covalent radii plus this
+HBOND_ALLOWANCE = 0.5   # Extra overlap allowed between N/O pairs, hydrogen bonds and salt bridges
+POLAR = ('N', 'O')
+
+def field(lines, start, end):
+    # Columns [start, end) of every line as a bytes array
+    return np.ascontiguousarray(lines[:, start:end]).view(f"S{end - start}").ravel()
+
+def numbers(values, dtype):
+    values = values.copy()
+    values[np.char.strip(values) == b''] = b'0'
+    return values.astype(dtype)
+
+def text(values, dtype):
+    return np.char.strip(values).astype(dtype)
+
+def atom_lines(data):
+    # (atoms x WIDTH) matrix of the ATOM/HETATM lines, padded with spaces, and the model of every atom
+    ends = np.flatnonzero(data == ord('\n'))
+    starts = np.concatenate(([0], ends + 1))
+    ends = np.concatenate((ends, [len(data)]))
+    keep = ends - starts >= 6
+    starts, ends = starts[keep], ends[keep]
+    head = data[starts[:, None] + np.arange(6)].view('S6').ravel()
+    atoms = (head == b'ATOM  ') | (head == b'HETATM')
+    models = np.flatnonzero(head == b'MODEL ')
+    model = np.searchsorted(models, np.flatnonzero(atoms)).astype(np.int32)
+
+    starts, lengths = starts[atoms], ends[atoms] - starts[atoms]
+    columns = np.arange(WIDTH)
+    index = np.minimum(starts[:, None] + columns, len(data) - 1)
+    lines = np.where(columns < lengths[:, None], data[index], SPACE).astype(np.uint8)
+    lines[(lines == ord('\r')) | (lines == ord('\n'))] = SPACE
+    return lines, model
+
+def infer_elements(names, resnames):
+    # Single atom residues (ions) are named after their element, otherwise the first letter of the name
+    stripped = np.char.lstrip(names, '0123456789')
+    first = stripped.astype('U1')
+    return np.where(names == resnames, names, first).astype('U2')
+
+def read_pdb(path):
+    atoms = np.zeros(0, ATOM)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return atoms
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            data = np.frombuffer(mapped, dtype=np.uint8)
+            lines, model = atom_lines(data)
+            del data    # The map can only close once no array points into it
+    atoms = np.zeros(len(lines), ATOM)
+    if not len(lines):
+        return atoms
+
+    atoms['hetero'] = field(lines, 0, 6) == b'HETATM'
+    atoms['serial'] = numbers(field(lines, 6, 11), np.int64)
+    atoms['name'] = text(field(lines, 12, 16), 'U4')
+    atoms['altloc'] = text(field(lines, 16, 17), 'U1')
+    atoms['resname'] = text(field(lines, 17, 21), 'U4')
+    atoms['chain'] = text(field(lines, 21, 22), 'U1')
+    atoms['resseq'] = numbers(field(lines, 22, 26), np.int64)
+    atoms['icode'] = text(field(lines, 26, 27), 'U1')
+    atoms['coord'] = np.stack([numbers(field(lines, a, a + 8), np.float64) for a in (30, 38, 46)], axis=1)
+    atoms['occupancy'] = numbers(field(lines, 54, 60), np.float32)
+    atoms['bfactor'] = numbers(field(lines, 60, 66), np.float32)
+    elements = text(field(lines, 76, 78), 'U2')
+    missing = elements == ''
+    if missing.any():
+        elements[missing] = infer_elements(atoms['name'][missing], atoms['resname'][missing])
+    atoms['element'] = np.char.upper(elements)
+    atoms['model'] = model
+    return atoms
+
+def residues(atoms):
+    # Residue of every atom and the residue table, a new residue starts wherever model, chain, number or
+    # insertion code change between consecutive atoms
+    if not len(atoms):
+        return np.zeros(0, np.int64), np.zeros(0, RESIDUE)
+    change = np.zeros(len(atoms), dtype=bool)
+    change[0] = True
+    for key in ('model', 'chain', 'resseq', 'icode'):
+        change[1:] |= atoms[key][1:] != atoms[key][:-1]
+    starts = np.flatnonzero(change)
+    table = np.zeros(len(starts), RESIDUE)
+    for key in ('model', 'chain', 'resseq', 'icode', 'resname'):
+        table[key] = atoms[key][starts]
+    table['start'] = starts
+    table['end'] = np.append(starts[1:], len(atoms))
+    return np.cumsum(change) - 1, table
+
+def radii(elements, table, default):
+    values = np.full(len(elements), default, dtype=np.float64)
+    for element, radius in table.items():
+        values[elements == element] = radius
+    return values
+
+def expand(counts):
+    # Position of every item within its group, for groups of the given sizes laid end to end
+    return np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+class CellList():
+    def __init__(self, coords, cell=4.0):
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+        self.cell = float(cell)
+        self.origin = self.coords.min(axis=0) if len(self.coords) else np.zeros(3)
+        cells = self.cells(self.coords)
+        self.shape = cells.max(axis=0) + 1 if len(cells) else np.ones(3, dtype=np.int64)
+        keys = self.keys(cells)
+        self.order = np.argsort(keys, kind='stable')
+        self.occupied, self.start, self.count = np.unique(keys[self.order], return_index=True, return_counts=True)
+
+    def __len__(self):
+        return len(self.coords)
+
+    def cells(self, points):
+        return np.floor((points - self.origin) / self.cell).astype(np.int64)
+
+    def keys(self, cells):
+        return (cells[:, 0] * self.shape[1] + cells[:, 1]) * self.shape[2] + cells[:, 2]
+
+    def candidates(self, points, offsets):
+        # (point, atom) pairs from the cells at the given offsets around every point, one offset at a time
+        cells = self.cells(points)
+        for offset in offsets:
+            near = cells + offset
+            inside = np.flatnonzero(((near >= 0) & (near < self.shape)).all(axis=1))
+            keys = self.keys(near[inside])
+            slot = np.minimum(np.searchsorted(self.occupied, keys), len(self.occupied) - 1)
+            found = self.occupied[slot] == keys
+            queries, slot = inside[found], slot[found]
+            counts = self.count[slot]
+            yield np.repeat(queries, counts), self.order[np.repeat(self.start[slot], counts) + expand(counts)]
+
+    def offsets(self, radius, half=False):
+        # Cell offsets covering radius, with half only one of every opposite pair (and the cell itself)
+        reach = int(np.ceil(radius / self.cell))
+        offsets = list(itertools.product(range(-reach, reach + 1), repeat=3))
+        return [o for o in offsets if o >= (0, 0, 0)] if half else offsets
+
+    def within(self, points, radius, candidates):
+        parts = [(np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0))]
+        for i, j in candidates:
+            d = np.sqrt(((points[i] - self.coords[j]) ** 2).sum(axis=1))
+            close = d <= radius
+            parts.append((i[close], j[close], d[close]))
+        return tuple(np.concatenate(p) for p in zip(*parts))
+
+    def neighbors(self, points, radius):
+        # (point, atom, distance) of every atom within radius of the points
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if not len(self) or not len(points):
+            return self.within(points, radius, [])
+        return self.within(points, radius, self.candidates(points, self.offsets(radius)))
+
+    def query(self, point, radius):
+        # Atoms within radius of one point, in index order
+        _, j, _ = self.neighbors(point, radius)
+        return np.sort(j)
+
+    def pairs(self, radius):
+        # (i, j, distance) of every pair of atoms within radius, i < j. Half of the offsets meet every pair of
+        # cells once, pairs within one cell are met twice
+        if not len(self):
+            return self.within(self.coords, radius, [])
+        i, j, d = self.within(self.coords, radius, self.candidates(self.coords, self.offsets(radius, half=True)))
+        keep = i != j
+        same = self.cells(self.coords[i[keep]]) == self.cells(self.coords[j[keep]])
+        keep[keep] = ~same.all(axis=1) | (i[keep] < j[keep])
+        i, j, d = np.minimum(i[keep], j[keep]), np.maximum(i[keep], j[keep]), d[keep]
+        order = np.lexsort((j, i))
+        return i[order], j[order], d[order]
+
+def heavy(atoms):
+    return atoms['element'] != 'H'
+
+def coexist(atoms, i, j):
+    # Atom pairs found in the same structure: same model, and not alternative conformers (different non-blank
+    # altlocs) of one residue
+    altloc_i, altloc_j = atoms['altloc'][i], atoms['altloc'][j]
+    conformers = (altloc_i != '') & (altloc_j != '') & (altloc_i != altloc_j)
+    for key in ('chain', 'resseq', 'icode'):
+        conformers &= atoms[key][i] == atoms[key][j]
+    return (atoms['model'][i] == atoms['model'][j]) & ~conformers
+
+def contacts(atoms, cutoff=4.5, hydrogens=False):
+    # Residue pairs (i < j) with any two atoms within cutoff, and the residue table. Every model of the file
+    # gets its own residues, contacts never cross models.
+    index, table = residues(atoms)
+    selected = np.flatnonzero(np.ones(len(atoms), dtype=bool) if hydrogens else heavy(atoms))
+    i, j, _ = CellList(atoms['coord'][selected], cutoff).pairs(cutoff)
+    same = atoms['model'][selected[i]] == atoms['model'][selected[j]]
+    i, j = i[same], j[same]
+    ri, rj = index[selected[i]], index[selected[j]]
+    ri, rj = np.minimum(ri, rj), np.maximum(ri, rj)
+    keep = ri != rj
+    pairs = np.unique(ri[keep] * len(table) + rj[keep])
+    return np.stack((pairs // len(table), pairs % len(table)), axis=1), table
+
+def contact_map(atoms, cutoff=4.5, hydrogens=False):
+    # Symmetric (residues x residues) boolean map, residues in the order of residues(atoms)
+    pairs, table = contacts(atoms, cutoff, hydrogens)
+    matrix = np.zeros((len(table), len(table)), dtype=bool)
+    matrix[pairs[:, 0], pairs[:, 1]] = matrix[pairs[:, 1], pairs[:, 0]] = True
+    return matrix
+
+def bonds(atoms, index=None):
+    # Covalent bonds (i < j) inferred from distances and covalent radii
+    index = CellList(atoms['coord'], 2 * max(COVALENT_RADII.values()) + BOND_TOLERANCE) if index is None else index
+    covalent = radii(atoms['element'], COVALENT_RADII, DEFAULT_RADII[1])
+    i, j, d = index.pairs(2 * covalent.max() + BOND_TOLERANCE)
+    bonded = (d < covalent[i] + covalent[j] + BOND_TOLERANCE) & coexist(atoms, i, j)
+    return np.stack((i[bonded], j[bonded]), axis=1)
+
+def separated(bond_pairs, n, depth=3):
+    # Keys i * n + j of the atom pairs joined by at most `depth` bonds, both orders, a key may repeat
+    directed = np.concatenate((bond_pairs, bond_pairs[:, ::-1]))
+    directed = directed[np.argsort(directed[:, 0], kind='stable')]
+    first = np.searchsorted(directed[:, 0], np.arange(n))
+    degree = np.bincount(directed[:, 0], minlength=n)
+    reached = frontier = directed
+    for _ in range(depth - 1):
+        # Walk one more bond from the end of every path
+        counts = degree[frontier[:, 1]]
+        nxt = directed[np.repeat(first[frontier[:, 1]], counts) + expand(counts), 1]
+        frontier = np.stack((np.repeat(frontier[:, 0], counts), nxt), axis=1)
+        frontier = frontier[frontier[:, 0] != frontier[:, 1]]
+        reached = np.concatenate((reached, frontier))
+    return reached[:, 0] * n + reached[:, 1]
+
+def clashes(atoms, tolerance=0.4, hydrogens=False):
+    # (i, j, overlap) of the atom pairs overlapping their van der Waals radii by at least `tolerance` Angstroms.
+    # Atoms up to three bonds apart (bonds inferred from distances) are expected to overlap and are left out,
+    # N/O pairs may overlap by HBOND_ALLOWANCE more. Hydrogens are skipped unless asked for as their positions
+    # rarely come from the experiment. Atoms of different models or alternative conformers never clash.
+    selected = np.flatnonzero(np.ones(len(atoms), dtype=bool) if hydrogens else heavy(atoms))
+    atoms = atoms[selected]
+    vdw = radii(atoms['element'], VDW_RADII, DEFAULT_RADII[0])
+    polar = np.isin(atoms['element'], POLAR)
+    index = CellList(atoms['coord'], 2 * vdw.max() - tolerance)
+    i, j, d = index.pairs(2 * vdw.max() - tolerance)
+    overlap = vdw[i] + vdw[j] - d
+    close = (overlap >= tolerance + HBOND_ALLOWANCE * (polar[i] & polar[j])) & coexist(atoms, i, j)
+    i, j, overlap = i[close], j[close], overlap[close]
+    excluded = separated(bonds(atoms, index), len(atoms))
+    keep = ~np.isin(i * len(atoms) + j, excluded)
+    return selected[i[keep]], selected[j[keep]], overlap[keep]
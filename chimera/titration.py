@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import collections
+import numpy as np
+from chimera.residue import *
+
+# Every peptide reduced to its ionizable groups: the free amino terminus and the K | R | H side chains carry
+# positive charge, the free carboxy terminus and the D | E | C | Y side chains negative charge.
+# pKa values and counts are (peptides x groups), terminal pKa values depend on the terminal residue.
+POSITIVE = 'KRH'
+NEGATIVE = 'DECY'
+Groups = collections.namedtuple('Groups', ['positive_pKa', 'positive', 'negative_pKa', 'negative'])
+
+def ionizable_groups(composition, nterm, cterm):
+    composition, nterm, cterm = np.atleast_2d(composition), np.atleast_1d(nterm), np.atleast_1d(cterm)
+    ones = np.ones((len(composition), 1))
+    side = lambda residues, table: np.broadcast_to(table[[RESIDUES.index(r) for r in residues]],
+                                                   (len(composition), len(residues)))
+    columns = lambda residues: composition[:, [RESIDUES.index(r) for r in residues]]
+    return Groups(np.concatenate((ALPHA_AMINO[nterm][:, None], side(POSITIVE, SIDECHAIN_POSITIVE)), axis=1),
+                  np.concatenate((ones, columns(POSITIVE)), axis=1),
+                  np.concatenate((ALPHA_CARBOXY[cterm][:, None], side(NEGATIVE, SIDECHAIN_NEGATIVE)), axis=1),
+                  np.concatenate((ones, columns(NEGATIVE)), axis=1))
+
+def peptide_groups(peptide):
+    codes = encode_residues(peptide)
+    return ionizable_groups(np.bincount(codes, minlength=SIZE), codes[0], codes[-1])
+
+def charge(groups, pH=7.0):
+    # Henderson-Hasselbalch over every group. pH is a scalar, one value per peptide,
+    # or a (peptides x points) grid, the result has the matching shape.
+    ph = np.power(10.0, np.asarray(pH, dtype=np.float64))
+    positive_pKa, negative_pKa = np.power(10.0, groups.positive_pKa), np.power(10.0, groups.negative_pKa)
+    positive, negative = groups.positive, groups.negative
+    if ph.ndim == 2:
+        positive_pKa, positive, negative_pKa, negative = (a[:, None, :] for a in (positive_pKa, positive, negative_pKa, negative))
+    ph = ph[..., None]
+    return (positive * positive_pKa / (positive_pKa + ph)).sum(axis=-1) - (negative * ph / (negative_pKa + ph)).sum(axis=-1)
+
+def isoelectric_point(groups, pH=7.0, low=4.0, high=12.0, tolerance=0.0001):
+    # Bisection from the same starting pH and bracket as the original recursive solver, every peptide per step
+    count = len(groups.positive)
+    pH, low, high = np.full(count, pH, dtype=np.float64), np.full(count, low, dtype=np.float64), np.full(count, high, dtype=np.float64)
+    active = high - low > tolerance
+    while np.any(active):
+        positive = charge(groups, pH) > 0.0
+        low = np.where(active & positive, pH, low)
+        high = np.where(active & ~positive, pH, high)
+        pH = np.where(active, (low + high) / 2, pH)
+        active = high - low > tolerance
+    return np.where(np.isnan(charge(groups, pH)), np.nan, pH)  # Unknown terminal residue
+
+def titration_curve(groups, pH=None):
+    # Net charge of every peptide over a pH grid: returns the grid and a (peptides x points) array
+    pH = np.arange(0.0, 14.0 + 1e-9, 0.1) if pH is None else np.asarray(pH, dtype=np.float64)
+    return pH, charge(groups, np.broadcast_to(pH, (len(groups.positive), len(pH))))
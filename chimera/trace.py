@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+
+import atexit, collections, functools, json, multiprocessing, os, sys, threading, time, tracemalloc
+
+# Opt-in instrumentation: named spans aggregate calls, cumulative and max latency and the bytes allocated while
+# they run, and can be exported as JSON statistics or as a Chrome trace (chrome://tracing, Perfetto).
+# Disabled, a traced function costs one flag test on top of the call.
+# Enabled with CHIMERA_TRACE=1 (summary on stderr at exit) or CHIMERA_TRACE=<path> (exported at exit,
+# CHIMERA_TRACE_FORMAT=json|chrome), or from a script with enable(). CHIMERA_TRACE_MEMORY=0 skips the
+# allocation tracking, which slows allocation heavy code down. Spans are recorded per process: a process pool
+# started with pool_options() runs remote(fn) in its workers, whose spans come back with each result and are
+# merged into the parent's by merged(result).
+MAX_EVENTS = 1 << 20    # Chrome trace events kept, later spans are only aggregated
+Remote = collections.namedtuple('Remote', ['result', 'spans'])
+
+class Span():
+    __slots__ = ('tracer', 'name', 'start', 'memory', 'peak')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        tracer = self.tracer
+        if tracer.memory:
+            # Peaks are tracked per span: the enclosing span keeps the peak reached so far, then it is reset
+            current, peak = tracemalloc.get_traced_memory()
+            if tracer.stack:
+                parent = tracer.stack[-1]
+                parent.peak = max(parent.peak, peak)
+            tracemalloc.reset_peak()
+            self.memory, self.peak = current, current
+        tracer.stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        tracer = self.tracer
+        tracer.stack.pop()
+        allocated = 0
+        if tracer.memory:
+            peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            allocated = peak - self.memory
+            if tracer.stack:
+                parent = tracer.stack[-1]
+                parent.peak = max(parent.peak, peak)
+        tracer.record(self.name, self.start, end - self.start, allocated)
+        return False
+
+class Tracer():
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.reset()
+
+    @property
+    def stack(self):
+        try:
+            return self.local.stack
+        except AttributeError:
+            self.local.stack = []
+            return self.local.stack
+
+    def enable(self, memory=True):
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.memory = False
+
+    def reset(self):
+        self.stats = {}     # name: [calls, cumulative seconds, max seconds, allocated bytes, max allocated bytes]
+        self.events = []
+        self.dropped = 0
+        self.origin = time.perf_counter()
+
+    def span(self, name):
+        return Span(self, name)
+
+    def record(self, name, start, seconds, allocated):
+        with self.lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = [0, 0.0, 0.0, 0, 0]
+            stat[0] += 1
+            stat[1] += seconds
+            stat[2] = max(stat[2], seconds)
+            stat[3] += allocated
+            stat[4] = max(stat[4], allocated)
+            if len(self.events) < MAX_EVENTS:
+                self.events.append((name, start, seconds, allocated, os.getpid(), threading.get_ident()))
+            else:
+                self.dropped += 1
+
+    def collect(self):
+        # Spans recorded since the last collect, cleared from this tracer
+        with self.lock:
+            spans = (self.stats, self.events, self.dropped)
+            self.stats, self.events, self.dropped = {}, [], 0
+        return spans
+
+    def merge(self, spans):
+        # Adds spans collected in another process, perf_counter is the same monotonic clock in every process
+        stats, events, dropped = spans
+        with self.lock:
+            for name, (calls, total, longest, allocated, most) in stats.items():
+                stat = self.stats.get(name)
+                if stat is None:
+                    stat = self.stats[name] = [0, 0.0, 0.0, 0, 0]
+                stat[0] += calls
+                stat[1] += total
+                stat[2] = max(stat[2], longest)
+                stat[3] += allocated
+                stat[4] = max(stat[4], most)
+            kept = events[:max(MAX_EVENTS - len(self.events), 0)]
+            self.events += kept
+            self.dropped += dropped + len(events) - len(kept)
+
+    def summary(self):
+        return {
+            'memory': self.memory,
+            'stages': {name: {'calls': calls, 'total': total, 'mean': total / calls, 'max': longest,
+                              'allocated': allocated, 'max_allocated': most}
+                       for name, (calls, total, longest, allocated, most) in
+                       sorted(self.stats.items(), key=lambda item: -item[1][1])},
+            }
+
+    def chrome(self):
+        # Complete ('X') events in microseconds since the tracer was reset, worker processes on their own rows
+        events = [{'name': name, 'cat': name.split('.')[0], 'ph': 'X', 'pid': pid, 'tid': tid,
+                   'ts': (start - self.origin) * 1e6, 'dur': seconds * 1e6, 'args': {'allocated': allocated}}
+                  for name, start, seconds, allocated, pid, tid in self.events]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'dropped': self.dropped}}
+
+    def export(self, path, format='json'):
+        with open(path, 'w') as f:
+            json.dump(self.chrome() if format == 'chrome' else self.summary(), f, indent=None if format == 'chrome' else 1)
+
+    def report(self, file=sys.stderr):
+        print(f"{'Stage':<34} | {'Calls':>8} | {'Total':>10} | {'Mean':>10} | {'Max':>10} | Allocated", file=file)
+        for name, stage in self.summary()['stages'].items():
+            print(f"{name:<34} | {stage['calls']:>8} | {stage['total']*1000:>8.2f}ms | {stage['mean']*1e6:>8.1f}us | "
+                  f"{stage['max']*1000:>8.2f}ms | {stage['allocated']/2**20:.2f}MB", file=file)
+
+TRACER = Tracer()
+
+def traced(name=None):
+    # Decorator, the span is named after the module and function unless given: @traced() or @traced('fasta.load')
+    def decorate(fn):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return fn(*args, **kwargs)
+            with Span(TRACER, label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def span(name):
+    return TRACER.span(name)
+
+def enable(memory=True):
+    TRACER.enable(memory)
+
+def export(path, format='json'):
+    TRACER.export(path, format)
+
+def start_worker(memory):
+    # Pool initializer: a forked worker starts from a clean tracer instead of a copy of the parent's spans
+    TRACER.reset()
+    TRACER.enable(memory)
+
+def run_remote(fn, *args, **kwargs):
+    result = fn(*args, **kwargs)
+    return Remote(result, TRACER.collect())
+
+def pool_options():
+    # Keyword arguments of ProcessPoolExecutor that trace its workers when tracing is on
+    return {'initializer': start_worker, 'initargs': (TRACER.memory,)} if TRACER.enabled else {}
+
+def remote(fn):
+    return functools.partial(run_remote, fn) if TRACER.enabled else fn
+
+def merged(result):
+    # Result of remote(fn) in the parent, the worker's spans added to TRACER
+    if isinstance(result, Remote):
+        TRACER.merge(result.spans)
+        return result.result
+    return result
+
+def configure(path=None, format=None, memory=None):
+    # Tracing from the environment or a script's flags, reported when the process exits.
+    # Worker processes only trace through pool_options(), they never export.
+    path = path or os.environ.get('CHIMERA_TRACE', '')
+    if path.lower() in ('', '0', 'off') or multiprocessing.parent_process() is not None:
+        return
+    format = format or os.environ.get('CHIMERA_TRACE_FORMAT', 'json')
+    if memory is None:
+        memory = os.environ.get('CHIMERA_TRACE_MEMORY', '1').lower() not in ('0', 'off')
+    TRACER.enable(memory)
+    if path.lower() in ('1', 'on'):
+        atexit.register(TRACER.report)
+    else:
+        atexit.register(TRACER.export, path, format)
+
+configure()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+from chimera.codon import RNA
+from chimera.trace import traced
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Base codes: A = 0 | C = 1 | G = 2 | T/U = 3 | Anything else = 4 (ambiguous)
+# Codon index = 16 * b0 + 4 * b1 + b2, with index 64 reserved for codons containing an ambiguous base
+AMBIGUOUS = 4
+UNKNOWN = 'X'
+
+def codon_table():
+    amino = {c: k.split('/')[1].strip() for k, v in RNA().items() for c in v}
+    return ''.join(amino[''.join('ACGU'[i >> s & 3] for s in (4, 2, 0))] for i in range(64)) + UNKNOWN
+
+def codon_index(codon):
+    code = [BASE_CODES[ord(b)] for b in codon]
+    if len(code) != 3 or AMBIGUOUS in code:
+        return 64
+    return code[0] << 4 | code[1] << 2 | code[2]
+
+BASE_CODES = [AMBIGUOUS] * 256
+for code, bases in enumerate(['Aa', 'Cc', 'Gg', 'TtUu']):
+    for b in bases:
+        BASE_CODES[ord(b)] = code
+
+CODONS = codon_table()
+START = codon_index('AUG')
+STOPS = [i for i, aa in enumerate(CODONS) if aa == '*']
+
+if np is not None:
+    BASE_LUT = np.array(BASE_CODES, dtype=np.uint8)
+    CODON_LUT = np.frombuffer(CODONS.encode('ascii'), dtype=np.uint8)
+
+def encode_bases(seq):
+    if isinstance(seq, np.ndarray):
+        return seq
+    if not isinstance(seq, str): # PackedSequence already holds base codes
+        return seq.codes()
+    return BASE_LUT[np.frombuffer(seq.encode('ascii', 'replace'), dtype=np.uint8)]
+
+def codon_indices(codes):
+    if len(codes) < 3:
+        return np.empty(0, dtype=np.uint8)
+    b0, b1, b2 = codes[:-2], codes[1:-1], codes[2:]
+    idx = (b0 << 4) | (b1 << 2) | b2
+    return np.where((b0 | b1 | b2) & AMBIGUOUS, np.uint8(64), idx).astype(np.uint8)
+
+def reading_frames(idx, length):
+    # Replays the START/STOP gating of the sequential scanner over precomputed codon indices.
+    # Scanning advances one base at a time (three past a STOP), reading advances one codon until a STOP.
+    # Returns the (start, end) base positions of every frame that was read, end exclusive.
+    is_start = idx == START
+    is_stop = np.isin(idx, STOPS)
+    events = np.flatnonzero(is_start | is_stop)
+    event_start = is_start[events]
+
+    end = events + 3
+    for frame in range(3):
+        sel = event_start & (events % 3 == frame)
+        frame_stops = np.flatnonzero(is_stop[frame::3]) * 3 + frame
+        stop = np.append(frame_stops, -1)[np.searchsorted(frame_stops, events[sel])]
+        open_end = events[sel] + (length - events[sel]) // 3 * 3                 # No STOP in frame, read to the last full codon
+        end[sel] = np.where(stop >= 0, stop + 3, open_end)
+
+    # Walk the chain of visited events, each step lands on the first event past the previous jump
+    following = np.searchsorted(events, end).tolist()
+    flags = event_start.tolist()
+    visited = []
+    k, m = 0, len(events)
+    while k < m:
+        if flags[k]:
+            visited.append(k)
+        k = following[k]
+    visited = np.asarray(visited, dtype=np.int64)
+    return events[visited], end[visited]
+
+@traced('translate')
+def translate(seq):
+    if np is None:
+        return translate_python(seq)
+    codes = encode_bases(seq)
+    idx = codon_indices(codes)
+    starts, ends = reading_frames(idx, len(codes))
+    if len(starts) == 0:
+        return ''
+
+    lengths = (ends - starts) // 3
+    offsets = np.repeat(starts - 3 * (np.cumsum(lengths) - lengths), lengths)
+    positions = offsets + 3 * np.arange(lengths.sum())
+    return CODON_LUT[idx[positions]].tobytes().decode('ascii')
+
+def translate_python(seq):
+    seq = str(seq)
+    res = []
+    i, reading = 0, False
+    while i + 3 <= len(seq):
+        amino = CODONS[codon_index(seq[i:i+3])]
+        if amino == 'M':                                                            # START open reading frame
+            reading = True
+        if reading:
+            res.append(amino)
+        if amino == '*':                                                            # STOP open reading frame
+            reading = False
+            i += 3
+        else:
+            i += 3 if reading else 1
+    return ''.join(res)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+import glob, os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from chimera.cache import default_cache, file_digest
+from chimera.faidx import IndexedFasta
+from chimera.translate import CODONS, codon_indices, encode_bases, reading_frames
+
+# Codon usage over the coding regions FastaIO translates: every START/STOP gated reading frame is one gene.
+# Counts are (genes x 64) arrays indexed like chimera.translate, 16 * b0 + 4 * b1 + b2 with A = 0 | C = 1 | G = 2 | T = 3.
+SENSE = np.array([aa != '*' for aa in CODONS[:64]])
+NAMES = [''.join('ACGT'[i >> s & 3] for s in (4, 2, 0)) for i in range(64)]
+FAMILIES = sorted(set(CODONS[:64]))
+MEMBERSHIP = np.array([[aa == family for family in FAMILIES] for aa in CODONS[:64]], dtype=np.float64)   # 64 x families
+FAMILY_SIZE = MEMBERSHIP.sum(axis=0)
+GC3 = np.array([(i & 3) in (1, 2) for i in range(64)])
+
+# Effective number of codons (Wright 1990), amino acids grouped by degeneracy: Nc = 2 + 9 / F2 + 1 / F3 + 5 / F4 + 3 / F6
+DEGENERACY = {size: [f for f, n in zip(FAMILIES, FAMILY_SIZE) if n == size and f != '*'] for size in (2, 3, 4, 6)}
+CLASS_SIZE = {2: 9, 3: 1, 4: 5, 6: 3}
+
+def coding_regions(codes):
+    idx = codon_indices(codes)
+    starts, ends = reading_frames(idx, len(codes))
+    return idx, starts, ends
+
+def codon_counts(seq):
+    # Returns the (start, end) of every gene and a (genes x 64) count matrix, ambiguous codons are skipped
+    idx, starts, ends = coding_regions(encode_bases(seq))
+    lengths = (ends - starts) // 3
+    gene = np.repeat(np.arange(len(starts)), lengths)
+    positions = np.repeat(starts - 3 * (np.cumsum(lengths) - lengths), lengths) + 3 * np.arange(lengths.sum())
+    codons = idx[positions].astype(np.int64)
+    keep = codons < 64
+    counts = np.bincount(gene[keep] * 64 + codons[keep], minlength=len(starts) * 64).reshape(len(starts), 64)
+    return (starts, ends), counts
+
+def rscu(counts):
+    # Relative synonymous codon usage: observed count over the mean count of its synonymous family
+    counts = np.atleast_2d(counts).astype(np.float64)
+    family = counts @ MEMBERSHIP
+    expected = (family / FAMILY_SIZE) @ MEMBERSHIP.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return counts / expected
+
+def enc(counts):
+    # Missing degeneracy classes follow Wright: F3 falls back to the mean of F2 and F4, others to their class mean
+    counts = np.atleast_2d(counts).astype(np.float64)
+    family = counts @ MEMBERSHIP
+    squares = (counts ** 2) @ MEMBERSHIP
+    with np.errstate(divide='ignore', invalid='ignore'):
+        homozygosity = (family * squares / family ** 2 - 1) / (family - 1)
+    homozygosity[family < 2] = np.nan
+    F = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for size, members in DEGENERACY.items():
+            columns = homozygosity[:, [FAMILIES.index(f) for f in members]]
+            observed = np.isfinite(columns)
+            F[size] = np.where(observed, columns, 0).sum(axis=1) / observed.sum(axis=1)
+        F[3] = np.where(np.isnan(F[3]), (F[2] + F[4]) / 2, F[3])
+        nc = 2 + sum(CLASS_SIZE[size] / F[size] for size in (2, 3, 4, 6))
+    return np.minimum(nc, 61.0)
+
+def gc3(counts):
+    # Share of sense codons ending in G or C
+    counts = np.atleast_2d(counts)
+    sense = counts[:, SENSE].sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return counts[:, SENSE & GC3].sum(axis=1) / sense
+
+def content_digest(path):
+    # Digest of the FASTA file a row was counted from, through the default cache when there is one
+    cache = default_cache()
+    return cache.file_digest(path) if cache else file_digest(path)
+
+def genome_counts(path):
+    reader = IndexedFasta(path)
+    seq = reader.fetch(reader.records()[0])
+    reader.close()
+    return codon_counts(seq)[1].sum(axis=0)
+
+class CodonUsage():
+    # Genomes x 64 codon count matrix for the library. Every row keeps the content digest of the file it was counted
+    # from, a genome is counted again only when its file changes.
+    def __init__(self, path='genome/codon_usage.npz', directory='genome'):
+        self.path = path
+        self.directory = directory
+        self.uids = []
+        self.digests = []
+        self.counts = np.empty((0, 64), dtype=np.int64)
+
+    @classmethod
+    def load(cls, path='genome/codon_usage.npz'):
+        with np.load(path) as data:
+            usage = cls(path, str(data['directory']))
+            usage.uids = data['uids'].tolist()
+            usage.counts = data['counts']
+            usage.digests = data['digests'].tolist() if 'digests' in data else [''] * len(usage.uids)
+        return usage
+
+    @classmethod
+    def open(cls, directory='genome', path='genome/codon_usage.npz', workers=None):
+        usage = cls.load(path) if os.path.exists(path) else cls(path, directory)
+        usage.update(workers)
+        return usage
+
+    def save(self):
+        np.savez(self.path, directory=self.directory, uids=np.array(self.uids), digests=np.array(self.digests, dtype=str),
+                 counts=self.counts)
+
+    def add(self, uid, seq, digest=''):
+        # Without the digest of its file the genome is counted again by the next update
+        self.set(uid, codon_counts(seq)[1].sum(axis=0), digest)
+
+    def set(self, uid, counts, digest=''):
+        if uid in self.uids:
+            self.counts[self.uids.index(uid)] = counts
+            self.digests[self.uids.index(uid)] = digest
+        else:
+            self.uids.append(uid)
+            self.digests.append(digest)
+            self.counts = np.concatenate((self.counts, counts[None]))
+
+    def update(self, workers=None):
+        # Genomes missing from the cache or whose file changed are counted in parallel, returns the uids counted
+        paths = {os.path.basename(p)[:-len('.fasta')]: p for p in sorted(glob.glob(os.path.join(self.directory, '*.fasta')))}
+        digests = {uid: content_digest(path) for uid, path in paths.items()}
+        known = dict(zip(self.uids, self.digests))
+        todo = [uid for uid in paths if known.get(uid) != digests[uid]]
+        if todo:
+            with ProcessPoolExecutor(workers) as pool:
+                for uid, counts in zip(todo, pool.map(genome_counts, [paths[uid] for uid in todo])):
+                    self.set(uid, counts, digests[uid])
+        return todo
+
+    def row(self, uid):
+        return self.counts[self.uids.index(uid)]
+
+    def rscu(self):
+        return rscu(self.counts)
+
+    def enc(self):
+        return enc(self.counts)
+
+    def gc3(self):
+        return gc3(self.counts)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+import bisect, collections, functools, itertools, math
+import numpy as np
+from chimera.align import Scoring, align
+from chimera.search import kmer_codes
+from chimera.translate import AMBIGUOUS, CODON_LUT, CODONS, codon_indices, encode_bases, reading_frames
+
+BASES = 'ACGTN'
+
+# kind: 'SNP' | 'INS' (bases only in genome 2) | 'DEL' (bases only in genome 1)
+# pos1, pos2: 0-based positions in each genome, for indels the position the event sits before in the other genome
+# gene: index into the reference genes, -1 outside coding regions
+# effect: 'synonymous' | 'non-synonymous' | 'frameshift' | 'inframe' | 'noncoding'
+Variant = collections.namedtuple('Variant', ['kind', 'pos1', 'pos2', 'ref', 'alt', 'gene', 'effect', 'ref_aa', 'alt_aa'])
+# Gene: reference coordinates, SNP counts by class, frameshifting indels and Nei-Gojobori dN / dS
+Gene = collections.namedtuple('Gene', ['start', 'end', 'codons', 'synonymous', 'nonsynonymous', 'frameshifts', 'dn', 'ds', 'ratio'])
+
+def mutations(i, j):
+    return [(p, (j >> s & 3)) for p, s in enumerate((4, 2, 0)) if (i >> s & 3) != (j >> s & 3)]
+
+def replace(codon, position, base):
+    shift = (2 - position) * 2
+    return codon & ~(3 << shift) | base << shift
+
+def codon_sites():
+    # Nei-Gojobori synonymous sites of every sense codon: at each position, the share of the three possible changes that keep the amino acid
+    sites = np.zeros(64)
+    for i in range(64):
+        if CODONS[i] == '*':
+            continue
+        for p in range(3):
+            changes = [replace(i, p, b) for b in range(4) if replace(i, p, b) != i]
+            sites[i] += sum(CODONS[c] == CODONS[i] for c in changes) / 3
+    return sites
+
+@functools.lru_cache(maxsize=None)
+def codon_differences():
+    # Synonymous / non-synonymous differences between every pair of sense codons, averaged over the
+    # mutational pathways that avoid an intermediate STOP (Nei-Gojobori 1986)
+    sd, nd = np.zeros((64, 64)), np.zeros((64, 64))
+    for i, j in itertools.product(range(64), repeat=2):
+        if CODONS[i] == '*' or CODONS[j] == '*' or i == j:
+            continue
+        paths = []
+        for order in itertools.permutations(mutations(i, j)):
+            codon, s, n, valid = i, 0, 0, True
+            for p, b in order:
+                step = replace(codon, p, b)
+                if CODONS[step] == '*':
+                    valid = False
+                    break
+                s, n = (s + 1, n) if CODONS[step] == CODONS[codon] else (s, n + 1)
+                codon = step
+            if valid:
+                paths.append((s, n))
+        if paths:
+            sd[i, j], nd[i, j] = np.mean(paths, axis=0)
+    return sd, nd
+
+SYNONYMOUS_SITES = codon_sites()
+
+def jukes_cantor(p):
+    if p <= 0:
+        return 0.0
+    return -0.75 * math.log(1 - 4 * p / 3) if p < 0.75 else math.inf
+
+def anchors(a, b, k):
+    # Exact k-mers occurring once in each genome, chained into the longest collinear set
+    kmers1, pos1 = kmer_codes(a, k)
+    kmers2, pos2 = kmer_codes(b, k)
+    unique1, first1, count1 = np.unique(kmers1, return_index=True, return_counts=True)
+    unique2, first2, count2 = np.unique(kmers2, return_index=True, return_counts=True)
+    shared, i1, i2 = np.intersect1d(unique1[count1 == 1], unique2[count2 == 1], assume_unique=True, return_indices=True)
+    p1, p2 = pos1[first1[count1 == 1][i1]], pos2[first2[count2 == 1][i2]]
+    order = np.argsort(p1)
+    p1, p2 = p1[order].tolist(), p2[order].tolist()
+
+    # Longest increasing subsequence of the genome 2 positions
+    tails, tail_index, previous = [], [], [-1] * len(p2)
+    for n, y in enumerate(p2):
+        at = bisect.bisect_left(tails, y)
+        previous[n] = tail_index[at-1] if at else -1
+        if at == len(tails):
+            tails.append(y)
+            tail_index.append(n)
+        else:
+            tails[at], tail_index[at] = y, n
+    chain, n = [], tail_index[-1] if tail_index else -1
+    while n >= 0:
+        chain.append(n)
+        n = previous[n]
+    return [(p1[n], p2[n]) for n in reversed(chain)]
+
+def blocks(chain, k):
+    # Anchors merged into exact-match blocks (start1, start2, length), anchors that would overlap a block on another diagonal are dropped
+    merged = []
+    for x, y in chain:
+        if merged:
+            s1, s2, length = merged[-1]
+            if x - y == s1 - s2 and x <= s1 + length:
+                merged[-1] = (s1, s2, x + k - s1)
+                continue
+            if x < s1 + length or y < s2 + length:
+                continue
+        merged.append((x, y, k))
+    return merged
+
+def decode(codes):
+    return np.frombuffer(BASES.encode('ascii'), dtype=np.uint8)[codes].tobytes().decode('ascii')
+
+def columns(a, b, start1, start2, k, scoring):
+    # Aligned columns of a gap between blocks: (pos1, pos2) with -1 against a gap.
+    # Equal gaps shorter than an anchor, or mostly identical, are substitutions and need no alignment.
+    n, m = len(a), len(b)
+    if n == m and (n < k or np.count_nonzero(a == b) >= 0.7 * n):
+        return np.arange(start1, start1 + n), np.arange(start2, start2 + m)
+    if n == 0 or m == 0:
+        return (np.concatenate((np.arange(start1, start1 + n), np.full(m, -1))),
+                np.concatenate((np.full(n, -1), np.arange(start2, start2 + m))))
+    aligned1, aligned2, _ = align(decode(a), decode(b), scoring)
+    gap1 = np.frombuffer(aligned1.encode(), dtype=np.uint8) == ord('-')
+    gap2 = np.frombuffer(aligned2.encode(), dtype=np.uint8) == ord('-')
+    return (np.where(gap1, -1, start1 + np.cumsum(~gap1) - 1),
+            np.where(gap2, -1, start2 + np.cumsum(~gap2) - 1))
+
+def alignment(a, b, k=15, scoring=Scoring(2, -3, -5, -2)):
+    # Whole-genome alignment as two column arrays, exact blocks in between anchored gaps
+    found = blocks(anchors(a, b, k), k)
+    cols1, cols2 = [], []
+    end1 = end2 = 0
+    for s1, s2, length in found + [(len(a), len(b), 0)]:
+        c1, c2 = columns(a[end1: s1], b[end2: s2], end1, end2, k, scoring)
+        cols1 += [c1, np.arange(s1, s1 + length)]
+        cols2 += [c2, np.arange(s2, s2 + length)]
+        end1, end2 = s1 + length, s2 + length
+    return np.concatenate(cols1).astype(np.int64), np.concatenate(cols2).astype(np.int64)
+
+def genes(codes):
+    # Coding regions of the reference, the same START/STOP gated frames FastaIO translates
+    return reading_frames(codon_indices(codes), len(codes))
+
+def locate(pos, starts, ends):
+    # Reference gene holding each position, -1 outside every gene
+    gene = np.searchsorted(starts, pos, side='right') - 1
+    inside = (gene >= 0) & (pos < np.append(ends, 0)[gene])
+    return np.where(inside, gene, -1)
+
+def following(cols, length):
+    # For every column, the next base of the genome at or after it, length past its last base
+    return np.minimum.accumulate(np.where(cols >= 0, cols, length)[::-1])[::-1]
+
+def diff(seq1, seq2, k=15, scoring=Scoring(2, -3, -5, -2)):
+    # Variants of genome 2 against genome 1, coding effects and dN / dS on the genes of genome 1
+    a, b = encode_bases(seq1), encode_bases(seq2)
+    cols1, cols2 = alignment(a, b, k, scoring)
+    next1, next2 = following(cols1, len(a)), following(cols2, len(b))
+    starts, ends = genes(a)
+    variants = []
+
+    # SNPs: paired columns holding two different unambiguous bases
+    paired = (cols1 >= 0) & (cols2 >= 0)
+    base1 = np.where(paired, a[np.maximum(cols1, 0)], AMBIGUOUS)
+    base2 = np.where(paired, b[np.maximum(cols2, 0)], AMBIGUOUS)
+    snp = paired & (base1 != base2) & (base1 != AMBIGUOUS) & (base2 != AMBIGUOUS)
+    pos1, pos2, alt = cols1[snp], cols2[snp], base2[snp]
+    gene = locate(pos1, starts, ends)
+    coding = gene >= 0
+
+    # Every SNP of a codon goes into its alternative codon, all codons are classified at once
+    codon = np.where(coding, pos1 - (pos1 - np.append(starts, 0)[gene]) % 3, 0)
+    mutated = a.copy()
+    mutated[pos1[coding]] = alt[coding]
+    ref_codon, alt_codon = codon_indices(a)[codon], codon_indices(mutated)[codon]
+    ref_aa, alt_aa = CODON_LUT[ref_codon], CODON_LUT[alt_codon]
+    synonymous = ref_aa == alt_aa
+    for n in range(len(pos1)):
+        effect = ('synonymous' if synonymous[n] else 'non-synonymous') if coding[n] else 'noncoding'
+        variants.append(Variant('SNP', int(pos1[n]), int(pos2[n]), BASES[a[pos1[n]]], BASES[alt[n]], int(gene[n]), effect,
+                                chr(ref_aa[n]) if coding[n] else '', chr(alt_aa[n]) if coding[n] else ''))
+
+    # Indels: runs of gap columns, placed before the next base of the gapped genome
+    frameshifts = np.zeros(len(starts), dtype=np.int64)
+    for kind, gaps, seq, own in (('INS', cols1 < 0, b, cols2), ('DEL', cols2 < 0, a, cols1)):
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], gaps.view(np.int8), [0]))))
+        for s, e in zip(edges[0::2].tolist(), edges[1::2].tolist()):
+            bases = ''.join(BASES[c] for c in seq[own[s: e]])
+            if kind == 'INS':
+                p1, p2, ref, alt_bases = int(next1[s]), int(cols2[s]), '', bases
+                g = int(locate(np.array([p1]), starts, ends)[0]) if p1 < len(a) else -1
+                g = g if g >= 0 and p1 > starts[g] else -1         # Inserting in front of a START leaves the gene intact
+            else:
+                p1, p2, ref, alt_bases = int(cols1[s]), int(next2[s]), bases, ''
+                g = int(locate(np.array([p1]), starts, ends)[0])
+            effect = ('inframe' if (e - s) % 3 == 0 else 'frameshift') if g >= 0 else 'noncoding'
+            if effect == 'frameshift':
+                frameshifts[g] += 1
+            variants.append(Variant(kind, p1, p2, ref, alt_bases, g, effect, '', ''))
+    variants.sort(key=lambda v: (v.pos1, v.pos2))
+
+    # dN / dS (Nei-Gojobori with Jukes-Cantor correction) over the codons changed by SNPs,
+    # synonymous sites averaged between the reference and the mutated gene
+    changed, first = np.unique(codon[coding], return_index=True)
+    ref_c, alt_c, codon_gene = ref_codon[coding][first], alt_codon[coding][first], gene[coding][first]
+    sense = (ref_c < 64) & (alt_c < 64)
+    ref_c, alt_c, codon_gene = ref_c[sense].astype(np.int64), alt_c[sense].astype(np.int64), codon_gene[sense]
+    synonymous_differences, nonsynonymous_differences = codon_differences()
+    sd = np.bincount(codon_gene, synonymous_differences[ref_c, alt_c], minlength=len(starts))
+    nd = np.bincount(codon_gene, nonsynonymous_differences[ref_c, alt_c], minlength=len(starts))
+    shift = np.bincount(codon_gene, (SYNONYMOUS_SITES[alt_c] - SYNONYMOUS_SITES[ref_c]) / 2, minlength=len(starts))
+    syn = np.bincount(gene[coding], synonymous[coding], minlength=len(starts))
+    nonsyn = np.bincount(gene[coding], ~synonymous[coding], minlength=len(starts))
+
+    sites = np.append(SYNONYMOUS_SITES, 0.0)                       # Ambiguous codons carry no sites
+    sense_codon = np.append([aa != '*' for aa in CODONS[:64]], False)
+    reference = codon_indices(a)
+    results = []
+    for g, (s, e) in enumerate(zip(starts.tolist(), ends.tolist())):
+        idx = reference[s: e: 3]
+        S = sites[idx].sum() + shift[g]
+        N = 3 * np.count_nonzero(sense_codon[idx]) - S
+        ds = jukes_cantor(sd[g] / S) if S > 0 else math.nan
+        dn = jukes_cantor(nd[g] / N) if N > 0 else math.nan
+        ratio = dn / ds if ds > 0 else (math.inf if dn > 0 else math.nan)
+        results.append(Gene(s, e, (e - s) // 3, int(syn[g]), int(nonsyn[g]), int(frameshifts[g]), dn, ds, ratio))
+    return variants, results
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+import argparse, sys
+import pandas as pd
+from chimera.catalog import Catalog
+from chimera.compression import CompressionLibrary, compressed_sizes, low_complexity
+from chimera.fasta import FastaIO
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-uid', type=str, default=None, help='Codec sizes and low-complexity regions of one genome')
+parser.add_argument('-window', type=int, default=1000)
+parser.add_argument('-step', type=int, default=100)
+parser.add_argument('-threshold', type=float, default=0.2, help='Compressed over raw size below which a window is low-complexity')
+parser.add_argument('-workers', type=int, default=None)
+parser.add_argument('-output', type=str, default='compression.csv', help='Library sizes (genomes x codecs)')
+args = parser.parse_args(sys.argv[1:])
+
+if args.uid:
+    FASTA = FastaIO(args.uid, lazy=True)
+    length = len(FASTA.genome)
+    print(FASTA.label)
+    for codec, size in compressed_sizes(FASTA.genome).items():
+        print(f"{codec} | {size} bytes | {size * 8 / length:.3f} bits/base")
+    regions = low_complexity(FASTA.genome, args.window, args.step, args.threshold)
+    for start, end in regions:
+        print(f"Low complexity: {start+1}-{end} | {end - start} bases")
+    print(f"{len(regions)} low-complexity regions")
+else:
+    library = CompressionLibrary.open(workers=args.workers)
+    library.save()
+    frame = pd.DataFrame(library.sizes, index=library.uids, columns=library.codecs)
+    catalog = Catalog.open()
+    lengths = pd.Series({uid: (catalog.get(uid) or {}).get('length') for uid in frame.index}, dtype='float64')
+    for codec in library.codecs:
+        frame[f"{codec}_bits"] = frame[codec] * 8 / lengths
+    frame.sort_index().to_csv(args.output, index_label='uid', float_format='%.4f')
+    print(f"{len(library.uids)} genomes written to {args.output}")
@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 
+import argparse, sys, time
+from chimera.catalog import Catalog
 from chimera.fasta import FastaIO
 from chimera.measure import *
 from chimera.codon import halflife
+from chimera.report import WRITERS, open_writer, output_format, reports
+from chimera.trace import configure
 
 def main(UID):
     FASTA = FastaIO(UID)
@@ -11,7 +15,7 @@ def main(UID):
     print("\n" + f"Nucleobases: {len(FASTA.genome)}")
     print(f"GC-Content: {gc_content(FASTA.genome):.3f} %")
     print(f"Compression (zlib): {compress(FASTA.genome)}")
-    print(f"Average Hash: {average_hash(seq_to_pixels(FASTA.genome))}")
+    print(f"Average Hash: {genome_hash(FASTA.genome)}")
 
     print("\n" + ">> GENOME PROFILE")
     print(FASTA.genome)
@@ -75,5 +79,46 @@ def main(UID):
             print(f"Aliphatic Index: {ai:.3f}")
             print(f"Hydropathicity Index (GRAND Average): {hp:.3f}")
 
+def batch(uids, output, format=None, pH=7.0, min_length=1, workers=None):
+    # One row per peptide of every genome, written as each genome finishes
+    writer = open_writer(output, format)
+    t0 = time.perf_counter()
+    total = 0
+    try:
+        for done, frame in enumerate(reports(uids, pH, min_length, workers), 1):
+            if len(frame):
+                writer.write(frame)
+            total += len(frame)
+            seconds = time.perf_counter() - t0
+            print(f"[{done}/{len(uids)}] {frame['uid'].iloc[0] if len(frame) else '-'} | Peptides: {len(frame)}",
+                  f"| {total / seconds:.0f} peptides/s")
+    finally:
+        writer.close()
+    seconds = time.perf_counter() - t0
+    print(f"{total} peptides from {len(uids)} genomes written to {output} in {seconds:.2f}s ({total / seconds:.0f} peptides/s)")
+
 if __name__ == "__main__":
-    main('NC_001542.1') # RABIES VIRUS, COMPLETE GENOME
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-uid', type=str, nargs='+', default=['NC_001542.1']) # RABIES VIRUS, COMPLETE GENOME
+    parser.add_argument('-all', action='store_true', help='Batch report over every genome of the catalog')
+    parser.add_argument('-output', type=str, default=None, help='Batch report file, one row per peptide')
+    parser.add_argument('-format', type=str, default=None, choices=sorted(WRITERS), help='Defaults to the output extension')
+    parser.add_argument('-pH', type=float, default=7.0)
+    parser.add_argument('-min_length', type=int, default=1, help='Shortest peptide to report')
+    parser.add_argument('-workers', type=int, default=None)
+    parser.add_argument('-trace', type=str, default=None, help='Time the pipeline stages: 1 for a summary, or an output file')
+    parser.add_argument('-trace_format', type=str, default=None, choices=['json', 'chrome'])
+    args = parser.parse_args(sys.argv[1:])
+
+    if args.trace:
+        configure(args.trace, args.trace_format)
+
+    if args.all or args.output or len(args.uid) > 1:
+        try:
+            output_format(args.output or 'peptides.csv', args.format)
+        except ValueError as e:
+            parser.error(f"-output: {e}")
+        uids = Catalog.open().uids() if args.all else args.uid
+        batch(uids, args.output or 'peptides.csv', args.format, args.pH, args.min_length, args.workers)
+    else:
+        main(args.uid[0])
\ No newline at end of file
@@ -1,56 +1,83 @@
 #!/usr/bin/env python3
 
-import requests, argparse, sys, os
-import pandas as pd
+import argparse, sys, os
 from chimera.fasta import FastaIO
-from chimera.measure import seq_to_pixels, average_hash, compress
+from chimera.catalog import CODEC_COLUMNS, Catalog, catalog_rows
+from chimera.compression import CompressionLibrary
+from chimera.download import EFETCH, download, local
+from chimera.search import KmerIndex
+from chimera.sketch import SketchLibrary
+from chimera.usage import CodonUsage
+from chimera.variant import diff
 
 parser = argparse.ArgumentParser()
-parser.add_argument('-uid', type=str, default='NC_001542.1')
+parser.add_argument('-uid', type=str, nargs='+', default=['NC_001542.1'])
+parser.add_argument('-file', type=str, default=None, help='Accessions to add, one per line')
+parser.add_argument('-batch', type=int, default=20, help='Accessions per efetch request')
+parser.add_argument('-workers', type=int, default=3, help='Requests in flight')
+parser.add_argument('-processes', type=int, default=None, help='Workers computing the catalog metrics')
+parser.add_argument('-url', type=str, default=EFETCH)
+parser.add_argument('-api_key', type=str, default=os.environ.get('NCBI_API_KEY'))
 args = parser.parse_args(sys.argv[1:])
 
-UID = args.uid
+UIDS = list(args.uid)
+if args.file:
+    with open(args.file) as f:
+        UIDS += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+UIDS = list(dict.fromkeys(UIDS))
 
-db = 'genome_db.csv'
-
-# Check database exists
-if os.path.exists(db):
-    reader = pd.read_csv(db)
-else:
-    print("No directory found")
+# Catalog lookups by uid, created from genome_db.csv on first use
+catalog = Catalog.open(workers=args.processes)
 
 # Check for duplicates
-for row in reader["uid"]:
-    if row == UID:
-        stored = True
-        print(row, "found in library")
-    else:
-        stored = False
-
-# Download and store FASTA
-if stored == False:
-    content = requests.get(f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi?db=nuccore&id={UID}&rettype=fasta")
-    content.raise_for_status()
-
-    filename = f"genome/{UID}.fasta"
-    with open(filename, 'w') as f:
-        f.write(content.text)
-
-    FASTA = FastaIO(UID)
-    
-    pixels = seq_to_pixels(FASTA.genome)
-    hash =  average_hash(pixels)
-
-    new_row = pd.DataFrame(
-        {'uid': UID,
-        'name': (" ").join(FASTA.label.split(" ")[1:]),
-        'length': len(FASTA.genome),
-        'zlib': compress(FASTA.genome),
-        'hash': hash}, index=[0]
-        )
-
-    new_frame = pd.concat([new_row, reader.loc[:]])
-    new_frame = new_frame.sort_values(by='uid').reset_index(drop=True)
-    
-    new_frame.to_csv(db, index=False)
-    print(f"{FASTA.label} added to library")
\ No newline at end of file
+for uid in UIDS:
+    if uid in catalog:
+        print(uid, "found in library")
+new = [uid for uid in UIDS if uid not in catalog]
+
+# Download and store FASTA, files left by an interrupted run are not fetched again
+if new:
+    written, failed = download(new, batch=args.batch, workers=args.workers, url=args.url, api_key=args.api_key, log=print)
+    for uid in failed:
+        print(uid, "could not be downloaded")
+    # Accessions without a version resolve to the stored versioned file, which may already be in the catalog
+    ready = [uid for uid in dict.fromkeys(filter(None, (local('genome', uid) for uid in new))) if uid not in catalog]
+
+if new and ready:
+    rows = catalog_rows(ready, workers=args.processes)
+    catalog.insert(rows)
+    catalog.export_csv('genome_db.csv')
+    for row in rows:
+        print(f"{row['uid']} {row['name']} added to library")
+
+    # Codec sizes were measured with the catalog row
+    compression = CompressionLibrary.load() if os.path.exists('genome/compression.npz') else CompressionLibrary()
+    for row in rows:
+        compression.set(row['uid'], {codec: row[column] for codec, column in CODEC_COLUMNS.items()})
+    compression.update(args.processes)
+    compression.save()
+
+    # Only the new genomes' seeds are merged into the search index
+    index = KmerIndex.open()
+    for uid in ready:
+        index.add(uid, FastaIO(uid, lazy=True).genome, merge=False)
+    index.merge()
+    index.save()
+
+    sketches = SketchLibrary.open()
+    for uid in ready:
+        sketches.add(uid, FastaIO(uid, lazy=True).genome)
+    sketches.save()
+
+    # Variant summary against the closest genome already in the library
+    for uid in ready:
+        genome = FastaIO(uid, lazy=True).genome
+        nearest = [m for m in sketches.query(genome, top=2) if m.uid != uid]
+        if nearest and nearest[0].ani >= 0.9:
+            variants, genes = diff(FastaIO(nearest[0].uid, lazy=True).genome, genome)
+            snps = [v for v in variants if v.kind == 'SNP']
+            print(f"{uid} | Closest genome: {nearest[0].uid} (ANI {nearest[0].ani*100:.2f} %) | SNPs: {len(snps)}",
+                  f"| Non-synonymous: {sum(v.effect == 'non-synonymous' for v in snps)} | Indels: {len(variants) - len(snps)}")
+
+    usage = CodonUsage.open(workers=args.processes)
+    usage.save()
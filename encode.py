@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import argparse, os, sys, time
+from chimera.encode import BLOCK, DNACodec, gc_fraction, max_homopolymer
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-input', type=str, required=True)
+parser.add_argument('-output', type=str, required=True, help='One strand per line when encoding')
+parser.add_argument('-decode', action='store_true')
+parser.add_argument('-block', type=int, default=BLOCK, help='Bytes per strand')
+parser.add_argument('-rotating', action='store_true', help='Rotating code, no base repeats inside a strand')
+parser.add_argument('-whiten', action='store_true', help='XOR blocks with a seeded keystream for GC balance')
+parser.add_argument('-seed', type=int, default=0, help='Keystream seed, 0 to 2 ** 64 - 1')
+args = parser.parse_args(sys.argv[1:])
+if not 0 <= args.seed < 2 ** 64:
+    parser.error("-seed: 0 to 2 ** 64 - 1")
+
+codec = DNACodec(args.block, args.rotating, args.whiten, args.seed)
+t0 = time.perf_counter()
+strands, gc, run = 0, 0, 0
+with open(args.input, 'rb') as src, open(args.output, 'wb') as dst:
+    if args.decode:
+        for chunk in codec.decode_stream(src):
+            dst.write(chunk)
+            strands += 1
+    else:
+        for strand in codec.encode_stream(src):
+            dst.write(strand + b'\n')
+            strands, gc, run = strands + 1, gc + gc_fraction(strand) * len(strand), max(run, max_homopolymer(strand))
+
+seconds = time.perf_counter() - t0
+size = os.path.getsize(args.output if args.decode else args.input)
+print(f"{'Decoded' if args.decode else 'Encoded'} {size} bytes | {strands} strands | {seconds:.3f}s | {size / max(seconds, 1e-9) / 1e6:.1f} MB/s")
+if not args.decode:
+    bases = os.path.getsize(args.output) - strands
+    print(f"Bases: {bases} | Bits/base: {size * 8 / max(bases, 1):.3f} | GC: {gc / max(bases, 1) * 100:.2f} % | Longest homopolymer: {run}")
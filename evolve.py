@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+import argparse, sys, time
+from chimera.evolve import FITNESS, Fitness, Identity, evolve
+from chimera.fasta import FastaIO
+from chimera.measure import hydropathy_index, instability_index, isoelectric_point
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-uid', type=str, default='NC_045512.2')
+# Defaults: the receptor binding motif (residues 439-506) of the SARS-CoV-2 spike, peptide 6 of NC_045512.2
+parser.add_argument('-peptide', type=int, default=6, help='Sequence ID of the protein')
+parser.add_argument('-epitope', nargs=2, type=int, default=[439, 506], help='First and last residue of the protein, 1-based')
+parser.add_argument('-fitness', nargs='+', type=str, default=['stability=1', 'pI=5:7.0', 'hydropathy=2:-0.4', 'identity=20'],
+                    help='Terms as name=weight[:target], names: ' + ' | '.join(sorted(FITNESS) + ['identity']))
+parser.add_argument('-population', type=int, default=200)
+parser.add_argument('-generations', type=int, default=500)
+parser.add_argument('-mutation', type=float, default=0.02)
+parser.add_argument('-seed', type=int, default=0)
+parser.add_argument('-workers', type=int, default=None)
+parser.add_argument('-report', type=int, default=50, help='Print statistics every n generations')
+args = parser.parse_args(sys.argv[1:])
+if args.population <= 2:
+    parser.error("-population: at least 3 candidates, the 2 fittest are kept every generation")
+
+FASTA = FastaIO(args.uid)
+peptides = list(filter(None, FASTA.res.split('*')))
+if not 0 <= args.peptide < len(peptides):
+    parser.error(f"-peptide: {args.uid} has {len(peptides)} peptides")
+sequence = peptides[args.peptide]
+if not 1 <= args.epitope[0] <= args.epitope[1] <= len(sequence):
+    parser.error(f"-epitope: peptide {args.peptide} has {len(sequence)} residues")
+epitope = (args.epitope[0] - 1, args.epitope[1])
+
+terms = []
+for term in args.fitness:
+    name, value = term.split('=')
+    weight, *target = value.split(':')
+    if name == 'identity':
+        terms.append((float(weight), Identity(sequence, epitope)))
+    else:
+        terms.append((float(weight), FITNESS[name](*map(float, target))))
+
+def log(stats):
+    if stats.generation % args.report == 0:
+        print(f"Generation: {stats.generation} | Best: {stats.best:.4f} | Mean: {stats.mean:.4f} | {stats.rate:.0f} candidates/s")
+
+t0 = time.perf_counter()
+best, fitness, history = evolve(sequence, epitope, Fitness(*terms), args.population, args.generations, args.mutation,
+                                seed=args.seed, workers=args.workers, log=log)
+elapsed = time.perf_counter() - t0
+
+mutant = sequence[:epitope[0]] + best + sequence[epitope[1]:]
+evaluations = sum(g.evaluations for g in history)
+print(f"\nEpitope: {sequence[epitope[0]: epitope[1]]}")
+print(f"Evolved: {best}")
+print(f"Changes: {sum(a != b for a, b in zip(sequence[epitope[0]: epitope[1]], best))} | Fitness: {fitness:.4f}")
+for name, fn in (('Instability Index', instability_index), ('Theoretical pI', isoelectric_point), ('Hydropathicity Index', hydropathy_index)):
+    print(f"{name}: {fn(sequence):.3f} > {fn(mutant):.3f}")
+print(f"{len(history)} generations | {evaluations} evaluations | {elapsed:.2f}s | {evaluations / elapsed:.0f} candidates/s")
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+import argparse, os, sys
+from chimera.faidx import IndexedFasta
+from chimera.fasta import FastaIO
+from chimera.sketch import SketchLibrary
+
+parser = argparse.ArgumentParser()
+query_source = parser.add_mutually_exclusive_group(required=True)
+query_source.add_argument('-query', type=str, help='FASTA file or a raw nucleotide sequence')
+query_source.add_argument('-uid', type=str, help='Use a library genome as the query')
+parser.add_argument('-top', type=int, default=5)
+parser.add_argument('-rebuild', action='store_true')
+args = parser.parse_args(sys.argv[1:])
+
+if args.uid:
+    query = FastaIO(args.uid, lazy=True).genome
+elif args.query and os.path.exists(args.query):
+    reader = IndexedFasta(args.query)
+    query = reader.fetch(reader.records()[0])
+else:
+    query = args.query
+
+library = SketchLibrary.build() if args.rebuild else SketchLibrary.open()
+if args.rebuild or not os.path.exists(library.path):
+    library.save()
+
+print(f"Query: {len(query)} bases | Library: {len(library.uids)} sketches (k={library.k}, size={library.size})")
+for match in library.query(query, top=args.top):
+    print(f"{match.uid} | Jaccard: {match.jaccard:.4f} | ANI: {match.ani*100:.2f} % | Shared hashes: {match.shared}")
@@ -49,6 +49,7 @@ import zlib
 from chimera.fasta import FastaIO
 from chimera.measure import Signal
 from chimera.codon import RNA
+from chimera.orf import find_orfs
 
 FASTA = FastaIO('NC_045512.2')
 
@@ -72,20 +73,24 @@ print("\n" + FASTA.res)
 print('FURIN cleavage site (Spike):', S.find('PRRAR'))
 
 # Reverse-engineered proteins
-ORF1a = FASTA.translate(FASTA.genome[266-1: 13483])                                         # ORF1a polyprotein - 4405
-ORF1b = FASTA.translate(FASTA.genome[13468-1: 21555])                                       # ORF1b polyprotein - 2695 overlapping sequence w/ ORF1a
-S = FASTA.translate(FASTA.genome[21563-1: 25384])                                           # Spike glycoprotein (structural) - 1273
-ORF3a = FASTA.translate(FASTA.genome[25393-1: 26220])                                       # ORF3a protein - 275
-E = FASTA.translate(FASTA.genome[26245-1: 26472])                                           # ORF4 envelope protein (structural) - 75
-M = FASTA.translate(FASTA.genome[26523-1: 27191])                                           # ORF5 membrane glycoprotein (structural) - 222
-ORF6 = FASTA.translate(FASTA.genome[27202-1: 27387])                                        # ORF6 protein - 61
-ORF7a = FASTA.translate(FASTA.genome[27394-1: 27759])                                       # ORF7a protein - 121
-ORF7b = FASTA.translate(FASTA.genome[27756-1: 27887])                                       # ORF7b protein - 43
-ORF8 = FASTA.translate(FASTA.genome[27894-1: 28259])                                        # ORF8 protein - 121
-N = FASTA.translate(FASTA.genome[28274-1: 29533])                                           # ORF9 nucleocapsid phosphoprotein (structural) - 419
-ORF10 = FASTA.translate(FASTA.genome[29558-1: 29674])                                       # ORF10 protein - 38
+ORF1a = FASTA.translate(FASTA.region(266-1, 13483))                                         # ORF1a polyprotein - 4405
+ORF1b = FASTA.translate(FASTA.region(13468-1, 21555))                                       # ORF1b polyprotein - 2695 overlapping sequence w/ ORF1a
+S = FASTA.translate(FASTA.region(21563-1, 25384))                                           # Spike glycoprotein (structural) - 1273
+ORF3a = FASTA.translate(FASTA.region(25393-1, 26220))                                       # ORF3a protein - 275
+E = FASTA.translate(FASTA.region(26245-1, 26472))                                           # ORF4 envelope protein (structural) - 75
+M = FASTA.translate(FASTA.region(26523-1, 27191))                                           # ORF5 membrane glycoprotein (structural) - 222
+ORF6 = FASTA.translate(FASTA.region(27202-1, 27387))                                        # ORF6 protein - 61
+ORF7a = FASTA.translate(FASTA.region(27394-1, 27759))                                       # ORF7a protein - 121
+ORF7b = FASTA.translate(FASTA.region(27756-1, 27887))                                       # ORF7b protein - 43
+ORF8 = FASTA.translate(FASTA.region(27894-1, 28259))                                        # ORF8 protein - 121
+N = FASTA.translate(FASTA.region(28274-1, 29533))                                           # ORF9 nucleocapsid phosphoprotein (structural) - 419
+ORF10 = FASTA.translate(FASTA.region(29558-1, 29674))                                       # ORF10 protein - 38
 # print(S)
 
+# Open reading frames (>= 100 residues) across all six frames
+for orf in find_orfs(FASTA.genome, min_length=100):
+    print(f"Strand: {orf.strand:+d} | Frame: {orf.frame} | {orf.start+1}-{orf.stop} | Residues: {len(orf.protein)-1}")
+
 # Angiotensin Converting Enzyme-II (ACE2)
 # Receptor-Binding-Domain (RBD)
 # ACE2 modulates blood pressure
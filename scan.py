@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import argparse, sys
+import numpy as np
+import pandas as pd
+from chimera.fasta import FastaIO
+from chimera.profile import PROFILES, segments
+
+# Defaults flag transmembrane candidates: Kyte-Doolittle >= 1.6 over 19 residues
+parser = argparse.ArgumentParser()
+parser.add_argument('-uid', type=str, default='NC_045512.2')
+parser.add_argument('-property', type=str, default='hydropathy', choices=sorted(PROFILES))
+parser.add_argument('-window', type=int, default=19)
+parser.add_argument('-threshold', type=float, default=1.6)
+parser.add_argument('-below', action='store_true', help='Report stretches below the threshold instead')
+parser.add_argument('-min_length', type=int, default=100, help='Shortest peptide to scan')
+parser.add_argument('-output', type=str, default=None, help='Write every profile to CSV')
+args = parser.parse_args(sys.argv[1:])
+
+FASTA = FastaIO(args.uid)
+peptides = [(pid, p) for pid, p in enumerate(filter(None, FASTA.res.split('*'))) if len(p) >= args.min_length]
+profiles = PROFILES[args.property]([p for _, p in peptides], args.window)
+
+print(FASTA.label)
+rows = []
+for (pid, peptide), profile in zip(peptides, profiles):
+    found = segments(profile, args.threshold, args.window, args.window, above=not args.below)
+    print(f"Sequence ID: {pid} | Length: {len(peptide)} | Segments: {len(found)}")
+    for s, e in found:
+        scores = profile[s: e - args.window + 1]
+        print(f"  {s+1}-{e} | {peptide[s:e]} | Peak: {(scores.min() if args.below else scores.max()):.2f}")
+    if args.output:
+        rows.append(pd.DataFrame({'peptide': pid, 'position': np.arange(len(profile)) + args.window // 2 + 1, args.property: profile}))
+
+if args.output and rows:
+    pd.concat(rows).to_csv(args.output, index=False, float_format='%.4f')
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+
+import argparse, os, sys
+from chimera.faidx import IndexedFasta
+from chimera.fasta import FastaIO
+from chimera.search import KmerIndex
+
+parser = argparse.ArgumentParser()
+query_source = parser.add_mutually_exclusive_group(required=True)
+query_source.add_argument('-query', type=str, help='FASTA file or a raw nucleotide sequence')
+query_source.add_argument('-uid', type=str, help='Use a region of a library genome as the query')
+parser.add_argument('-start', type=int, default=0)
+parser.add_argument('-end', type=int, default=None)
+parser.add_argument('-top', type=int, default=10)
+parser.add_argument('-rebuild', action='store_true')
+args = parser.parse_args(sys.argv[1:])
+
+if args.uid:
+    query = FastaIO(args.uid, lazy=True).region(args.start, args.end)
+elif args.query and os.path.exists(args.query):
+    reader = IndexedFasta(args.query)
+    query = reader.fetch(reader.records()[0], args.start, args.end)
+else:
+    query = args.query
+
+index = KmerIndex.build() if args.rebuild else KmerIndex.open()
+if args.rebuild or not os.path.exists(index.path):
+    index.save()
+
+print(f"Query: {len(query)} bases | Library: {len(index.uids)} genomes, {len(index.kmers)} seeds (k={index.k})")
+for hit in index.query(query, top=args.top):
+    print(f"{hit.uid} | Strand: {hit.strand:+d} | Score: {hit.score:.0f} | Identity: {hit.identity*100:.2f} %",
+          f"| Query: {hit.query_start+1}-{hit.query_end} | Target: {hit.target_start+1}-{hit.target_end} | Seeds: {hit.seeds}")
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+
+import argparse, sys
+import pandas as pd
+from chimera.catalog import Catalog
+from chimera.matrix import METRICS, pairwise, to_distance
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-catalog', type=str, default='genome/catalog.db')
+parser.add_argument('-uid', type=str, nargs='+', help='Restrict the matrix to these catalog entries')
+parser.add_argument('-metric', type=str, default='align', choices=sorted(METRICS))
+parser.add_argument('-max_length', type=int, default=None, help='Skip genomes longer than this')
+parser.add_argument('-workers', type=int, default=None)
+parser.add_argument('-cache', type=str, default='genome/pairs.jsonl')
+parser.add_argument('-output', type=str, default='similarity_matrix.csv')
+parser.add_argument('-distance', action='store_true')
+args = parser.parse_args(sys.argv[1:])
+
+catalog = Catalog.open(args.catalog)
+rows = {row['uid']: row for row in catalog.by_length(high=args.max_length) if not args.uid or row['uid'] in args.uid}
+uids = sorted(rows)
+
+# ncd reads the size of every genome on its own from the catalog, only the pairs are compressed
+library = {uid: f"genome/{uid}.fasta" for uid in uids}
+sizes = {uid: row['lzma'] for uid, row in rows.items() if row['lzma'] is not None}
+uids, matrix = pairwise(library, args.metric, args.workers, args.cache, log=print, sizes=sizes)
+
+kind = METRICS[args.metric][2]
+if args.distance:
+    matrix = to_distance(matrix, kind)
+
+pd.DataFrame(matrix, index=uids, columns=uids).to_csv(args.output)
+print(f"{len(uids)} x {len(uids)} {'distance' if args.distance else kind} matrix written to {args.output}")
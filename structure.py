@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+import argparse, sys, time
+import numpy as np
+from chimera.structure import CellList, clashes, contacts, read_pdb
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-pdb', type=str, default='hip/pdb/6vxx.pdb')
+parser.add_argument('-cutoff', type=float, default=4.5, help='Residue contact distance (Angstroms)')
+parser.add_argument('-tolerance', type=float, default=0.4, help='Van der Waals overlap counted as a clash')
+parser.add_argument('-hydrogens', action='store_true', help='Include hydrogens in contacts and clashes')
+parser.add_argument('-near', type=float, nargs=4, default=None, metavar=('X', 'Y', 'Z', 'RADIUS'), help='Atoms around a point')
+parser.add_argument('-top', type=int, default=10, help='Worst clashes to list')
+args = parser.parse_args(sys.argv[1:])
+
+def label(atom):
+    return f"{atom['chain'] or '-'}:{atom['resname']}{atom['resseq']}{atom['icode']}:{atom['name']}"
+
+t0 = time.perf_counter()
+atoms = read_pdb(args.pdb)
+t1 = time.perf_counter()
+pairs, residues = contacts(atoms, args.cutoff, args.hydrogens)
+t2 = time.perf_counter()
+i, j, overlap = clashes(atoms, args.tolerance, args.hydrogens)
+t3 = time.perf_counter()
+
+chains = np.unique(residues['chain'])
+print(f"{args.pdb} | Atoms: {len(atoms)} | Residues: {len(residues)} | Chains: {' '.join(c or '-' for c in chains)}")
+print(f"Elements: {' '.join(f'{e} {n}' for e, n in zip(*np.unique(atoms['element'], return_counts=True)))}")
+print(f"Residue contacts ({args.cutoff} A): {len(pairs)} | Clashes (>= {args.tolerance} A overlap): {len(i)}")
+print(f"Read: {t1-t0:.3f}s | Contacts: {t2-t1:.3f}s | Clashes: {t3-t2:.3f}s")
+
+for k in np.argsort(-overlap)[:args.top]:
+    print(f"{label(atoms[i[k]]):>20} | {label(atoms[j[k]]):>20} | {overlap[k]:.2f} A")
+
+if args.near:
+    x, y, z, radius = args.near
+    near = CellList(atoms['coord'], radius).query([x, y, z], radius)
+    print(f"\n{len(near)} atoms within {radius} A of ({x}, {y}, {z})")
+    for atom in atoms[near][:args.top]:
+        print(f"{label(atom):>20} | {atom['coord'][0]:.3f} {atom['coord'][1]:.3f} {atom['coord'][2]:.3f}")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import random
+from chimera.align import Scoring, align, alignment_score, identity, score
+
+NEG = float('-inf')
+
+def gotoh(seq1, seq2, scoring):
+    # Textbook Gotoh over full matrices: M ends in a pair, X in a gap in seq2, Y in a gap in seq1.
+    # A gap of length L scores gap_open + (L - 1) * gap_extend, N never matches.
+    n, m = len(seq1), len(seq2)
+    M = [[NEG] * (m + 1) for _ in range(n + 1)]
+    X = [[NEG] * (m + 1) for _ in range(n + 1)]
+    Y = [[NEG] * (m + 1) for _ in range(n + 1)]
+    M[0][0] = 0
+    for i in range(1, n + 1):
+        X[i][0] = scoring.gap_open + (i - 1) * scoring.gap_extend
+    for j in range(1, m + 1):
+        Y[0][j] = scoring.gap_open + (j - 1) * scoring.gap_extend
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            pair = scoring.match if seq1[i-1] == seq2[j-1] != 'N' else scoring.mismatch
+            M[i][j] = max(M[i-1][j-1], X[i-1][j-1], Y[i-1][j-1]) + pair
+            X[i][j] = max(max(M[i-1][j], Y[i-1][j]) + scoring.gap_open, X[i-1][j] + scoring.gap_extend)
+            Y[i][j] = max(max(M[i][j-1], X[i][j-1]) + scoring.gap_open, Y[i][j-1] + scoring.gap_extend)
+    return max(M[n][m], X[n][m], Y[n][m])
+
+rng = random.Random(0)
+schemes = [Scoring(), Scoring(2, -1, -3, -1), Scoring(2, -3, -5, -2), Scoring(1, -1, -2, -2), Scoring(1.5, -0.5, -2.5, -0.5)]
+pairs = [('', ''), ('', 'ACGT'), ('A', ''), ('A', 'A'), ('A', 'C'), ('N', 'N'), ('ACGT', 'ACGT'), ('AAAA', 'A')]
+for _ in range(300):
+    seq1 = ''.join(rng.choice('ACGT' * 6 + 'N') for _ in range(rng.randint(1, 40)))
+    # Related pairs: point mutations and indels of the first sequence, as well as unrelated ones
+    seq2 = list(seq1)
+    for _ in range(rng.randint(0, 8)):
+        p = rng.randrange(len(seq2) + 1)
+        edit = rng.random()
+        if edit < 0.4 and p < len(seq2):
+            seq2[p] = rng.choice('ACGT')
+        elif edit < 0.7:
+            seq2[p:p] = rng.choice('ACGT') * rng.randint(1, 5)
+        else:
+            del seq2[p: p + rng.randint(1, 5)]
+    pairs.append((seq1, ''.join(seq2)))
+    pairs.append((seq1, ''.join(rng.choice('ACGT') for _ in range(rng.randint(0, 40)))))
+
+# Scores match the full Gotoh matrices, the alignment re-scores to the optimum and spells out both sequences
+for seq1, seq2 in pairs:
+    scoring = rng.choice(schemes)
+    expected = gotoh(seq1, seq2, scoring)
+    assert abs(score(seq1, seq2, scoring) - expected) < 1e-9, (seq1, seq2, scoring)
+    aligned1, aligned2, reported = align(seq1, seq2, scoring)
+    assert len(aligned1) == len(aligned2) and not any(x == y == '-' for x, y in zip(aligned1, aligned2))
+    assert aligned1.replace('-', '') == seq1 and aligned2.replace('-', '') == seq2
+    assert abs(reported - expected) < 1e-9 and alignment_score(aligned1, aligned2, scoring) == reported, (seq1, seq2, scoring)
+    assert identity(aligned1, aligned2) <= min(len(seq1), len(seq2))
+
+# Gap scores that would reward gaps are refused
+try:
+    score('ACGT', 'ACG', Scoring(1, 0, 1, 0))
+    raise AssertionError("Positive gap score accepted")
+except ValueError:
+    pass
+print("Alignments match brute force Gotoh")
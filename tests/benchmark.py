@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import glob, os, tempfile
+import numpy as np
+from chimera.benchmark import compare, ladder, load, measure, missing, save
+
+# Measured results carry time, memory and throughput
+result = measure('sum', 'test', 10 ** 6, 'items', lambda: np.ones(10 ** 6).sum(), repeat=2, min_time=0.01)
+assert result['time'] > 0 and result['loops'] >= 1 and result['peak_memory'] >= 8 * 10 ** 6
+assert abs(result['throughput'] - 10 ** 6 / result['time']) < 1e-6 * result['throughput']
+
+# Size ladder spans the corpus from the smallest to the largest genome
+paths = glob.glob('genome/*.fasta')
+steps = ladder(paths, 4)
+sizes = [os.path.getsize(p) for p in steps]
+assert len(steps) == 4 and sizes == sorted(sizes)
+assert sizes[0] == min(map(os.path.getsize, paths)) and sizes[-1] == max(map(os.path.getsize, paths))
+
+# Saved runs compare case by case, only slowdowns past the threshold regress
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'baseline.json')
+    save([result, dict(result, name='other', time=1.0)], path)
+    baseline = load(path)
+assert baseline[0] == result
+current = [dict(result, time=result['time'] * 1.2), dict(result, name='other', time=1.5), dict(result, name='new')]
+rows = compare(baseline, current, threshold=0.25)
+assert [(case, regressed) for case, _, _, _, regressed in rows] == [('sum [test]', False), ('other [test]', True)]
+assert not any(row[-1] for row in compare(baseline, current, threshold=0.6))
+assert compare(baseline, [dict(result, peak_memory=result['peak_memory'] * 2)], memory_threshold=0.5)[0][-1]
+
+# Baseline cases absent from the current run are reported, new cases are not
+assert missing(baseline, current) == [] and missing(baseline, current[1:]) == [baseline[0]]
+assert missing(baseline, [dict(result, input='renamed')]) == baseline
+print("Benchmarks measure, save and compare")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import os, shutil, tempfile, time
+from concurrent.futures import ProcessPoolExecutor
+from chimera.cache import DiskCache, file_digest
+from chimera.fasta import FastaIO
+from chimera.report import analyze_genome, peptide_metrics
+from chimera.translate import translate
+
+def worker(args):
+    directory, i = args
+    cache = DiskCache(directory, max_bytes=20000)
+    for j in range(50):
+        key = cache.key('worker', (i + j) % 20)
+        value = cache.memoize(key, lambda: bytes([j % 256]) * 1000)
+        assert len(value) == 1000
+    return i
+
+with tempfile.TemporaryDirectory() as directory:
+    # Round trip and misses
+    cache = DiskCache(os.path.join(directory, 'cache'), max_bytes=10000)
+    key = cache.key('test', 1)
+    assert cache.get(key) is None and cache.memoize(key, lambda: {'a': [1, 2]}) == {'a': [1, 2]}
+    assert cache.memoize(key, lambda: None) == {'a': [1, 2]}
+
+    # Least recently used entries go first once the cache outgrows its limit
+    keys = [cache.key('lru', i) for i in range(8)]
+    for i, k in enumerate(keys):
+        cache.put(k, b'x' * 2000)
+        time.sleep(0.01)
+        cache.get(keys[0])      # Keep the first entry in use
+    assert cache.size() <= 10000
+    assert cache.get(keys[0]) is not None and cache.get(keys[1]) is None and cache.get(keys[-1]) is not None
+
+    # Writes below the limit only update the running total, a scan happens once it is crossed
+    scans = []
+    entries = cache.entries
+    cache.entries = lambda *args: scans.append(args) or entries(*args)
+    cache.clear()
+    scans.clear()
+    for i in range(4):
+        cache.put(cache.key('count', i), b'x' * 2000)
+    assert not scans
+    with open(os.path.join(cache.directory, '.size')) as f:
+        assert int(f.read()) == cache.size() > 8000
+    scans.clear()
+    for i in range(4, 8):
+        cache.put(cache.key('count', i), b'x' * 2000)
+    assert len(scans) == 4 and cache.size() <= 10000     # Two evictions, each scanning temporaries then entries
+    del cache.entries
+
+    # Temporary files of crashed writers are removed once stale, those of live writers are left alone
+    stale, fresh = (os.path.join(directory, 'cache', 'ab', f"{name}.pkl.1.tmp") for name in ('stale', 'fresh'))
+    os.makedirs(os.path.dirname(stale), exist_ok=True)
+    for path in (stale, fresh):
+        open(path, 'wb').close()
+    os.utime(stale, (time.time() - 2 * 3600,) * 2)
+    cache.evict()
+    assert not os.path.exists(stale) and os.path.exists(fresh)
+
+    # Several processes sharing one directory under eviction pressure
+    shared = os.path.join(directory, 'shared')
+    with ProcessPoolExecutor(4) as pool:
+        assert sorted(pool.map(worker, [(shared, i) for i in range(8)])) == list(range(8))
+    assert DiskCache(shared).size() <= 20000
+    assert not [f for _, _, files in os.walk(shared) for f in files if f.endswith('.tmp')]
+
+    # Editing a genome invalidates its entries
+    os.environ['CHIMERA_CACHE'] = os.path.join(directory, 'genome-cache')
+    uid = 'NC_045512.2'
+    copy = f"genome/{uid}-cache-test.fasta"
+    shutil.copy(f"genome/{uid}.fasta", copy)
+    try:
+        test = FastaIO(f"{uid}-cache-test")
+        assert test.res == translate(test.genome)
+        with open(copy, 'a') as f:
+            f.write('ATGAAATAA\n')
+        edited = FastaIO(f"{uid}-cache-test")
+        assert edited.digest == file_digest(copy) != test.digest
+        assert edited.genome.endswith('ATGAAATAA') and edited.res == translate(edited.genome)
+    finally:
+        os.remove(copy)
+
+    # Lazy translation: a cold run parses and translates, a warm run only reads the cache
+    t0 = time.perf_counter()
+    cold = FastaIO(uid)
+    assert 'res' not in cold.__dict__
+    cold.res
+    t1 = time.perf_counter()
+    warm = FastaIO(uid)
+    warm.res
+    t2 = time.perf_counter()
+    assert (warm.label, warm.genome, warm.res) == (cold.label, cold.genome, translate(cold.genome))
+    print(f"FastaIO cold: {t1-t0:.4f}s | warm: {t2-t1:.4f}s")
+
+    t0 = time.perf_counter()
+    frame = analyze_genome(uid, 7.0, 5)
+    t1 = time.perf_counter()
+    assert analyze_genome(uid, 7.0, 5).equals(frame) and peptide_metrics(uid, 7.0, 5).equals(frame)
+    t2 = time.perf_counter()
+    print(f"Report cold: {t1-t0:.4f}s | warm and uncached: {t2-t1:.4f}s")
+print("Cache round trips, evicts, shares and invalidates")
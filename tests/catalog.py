@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import filecmp, os, tempfile, time
+import pandas as pd
+from chimera.catalog import Catalog, catalog_row
+from chimera.compression import compressed_sizes
+from chimera.fasta import FastaIO
+from chimera.sketch import SketchLibrary, sketch
+
+db = pd.read_csv('genome_db.csv')
+with tempfile.TemporaryDirectory() as directory:
+    for uid in db.uid:
+        os.symlink(os.path.abspath(f"genome/{uid}.fasta"), os.path.join(directory, f"{uid}.fasta"))
+
+    # Import of the CSV with every metric measured, then the export gives the same file back
+    t0 = time.perf_counter()
+    catalog = Catalog.open(os.path.join(directory, 'catalog.db'), directory, workers=2)
+    print(f"Genomes: {len(catalog)} | Import and metrics: {time.perf_counter()-t0:.3f}s")
+    assert len(catalog) == len(db) and catalog.uids() == sorted(db.uid)
+    catalog.export_csv(os.path.join(directory, 'genome_db.csv'))
+    assert filecmp.cmp(os.path.join(directory, 'genome_db.csv'), 'genome_db.csv', shallow=False)
+
+    # Lookups by uid, hash and length range
+    row = catalog.get('NC_045512.2')
+    genome = FastaIO('NC_045512.2', lazy=True).genome
+    sizes = compressed_sizes(genome)
+    assert (row['length'], row['zlib'], row['bz2'], row['lzma'], row['twobit']) == (len(genome), sizes['zlib'], sizes['bz2'], sizes['lzma'], sizes['2bit'])
+    assert abs(row['gc'] - (genome.count('G') + genome.count('C')) / len(genome) * 100) < 1e-9 and 'sketch' not in row
+
+    # Sketches come from the sketch library, genomes it lacks are sketched and saved once
+    sketches = SketchLibrary.build(directory, path=os.path.join(directory, 'sketches.npz'))
+    sketches.uids, sketches.sketches = sketches.uids[1:], sketches.sketches[1:]
+    sketches.save()
+    assert (catalog.sketch('NC_045512.2') == sketch(genome)).all() and catalog.sketch('XX_000000.1') is None
+    assert sorted(SketchLibrary.load(os.path.join(directory, 'sketches.npz')).uids) == catalog.uids()
+    assert 'NC_045512.2' in [r['uid'] for r in catalog.by_hash(row['hash'])]
+    assert [r['uid'] for r in catalog.by_length(29000, 30000)] == sorted(db[(db.length >= 29000) & (db.length <= 30000)].uid,
+                                                                        key=lambda u: (int(db[db.uid == u].length.iloc[0]), u))
+    assert catalog.get('XX_000000.1') is None and 'XX_000000.1' not in catalog
+
+    # Inserts only append: a known uid is left as it was
+    assert catalog.insert([dict(row, name='Replaced')]) == 0 and catalog.get('NC_045512.2')['name'] == row['name']
+    assert catalog.insert([{'uid': 'XX_000000.1', 'name': 'Test', 'length': 10, 'zlib': 18, 'hash': '0' * 16}]) == 1
+    assert len(catalog) == len(db) + 1
+    catalog.close()
+
+    # Empty records are refused with their path
+    empty = os.path.join(directory, 'empty.fasta')
+    with open(empty, 'w') as f:
+        f.write('>empty\n')
+    try:
+        catalog_row(empty)
+        raise AssertionError("Empty record catalogued")
+    except ValueError as e:
+        assert 'empty.fasta' in str(e)
+print("Catalog imports, looks up and exports genome_db.csv")
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import random, time
+import pandas as pd
+from chimera.compression import compressed_sizes, low_complexity, ncd
+from chimera.fasta import FastaIO
+from chimera.packed import PackedSequence
+
+# Streamed zlib sizes against the zlib column of the library, small chunks to cross many boundaries
+db = pd.read_csv('genome_db.csv')
+t0 = time.perf_counter()
+for uid, stored in zip(db.uid, db.zlib):
+    assert compressed_sizes(FastaIO(uid, lazy=True).genome, codecs=('zlib',), size=4096)['zlib'] == stored, uid
+print(f"Genomes: {len(db)} | zlib sizes match genome_db.csv | {time.perf_counter()-t0:.3f}s")
+
+# Packed sequences stream the same bytes, ambiguous runs split across chunks are counted once
+genome = FastaIO('NC_045512.2', lazy=True).genome
+assert compressed_sizes(genome) == compressed_sizes(PackedSequence.from_string(genome))
+assert compressed_sizes('ACGTNNNNACGTNN' + 'N' * 10, codecs=('2bit',), size=3)['2bit'] == 6 + 2 * 16
+
+# A planted homopolymer is the only low-complexity region, identical genomes are at distance ~0
+random.seed(0)
+seq = ''.join(random.choice('ACGT') for _ in range(20000))
+seq = seq[:8000] + 'A' * 3000 + seq[8000:]
+regions = low_complexity(seq)
+assert len(regions) == 1 and regions[0][0] <= 8000 and regions[0][1] >= 11000, regions
+sizes = compressed_sizes(seq, codecs=('lzma',))['lzma']
+assert ncd(sizes, sizes, compressed_sizes(seq, seq, codecs=('lzma',))['lzma']) < 0.05
+print("Codecs, profiles and NCD behave")
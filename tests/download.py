@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import glob, os, tempfile, threading, time
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from chimera.catalog import catalog_rows
+from chimera.download import download
+
+# Stand-in efetch serving the bundled FASTA files: unknown accessions are left out of the response,
+# and the first request fails with 503 to exercise the retries
+requests_seen = []
+
+class Efetch(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+        self.respond(parse_qs(body))
+
+    def do_GET(self):
+        self.respond(parse_qs(urlparse(self.path).query))
+
+    def respond(self, params):
+        requests_seen.append(params['id'][0])
+        if len(requests_seen) == 1:
+            self.send_response(503)
+            self.end_headers()
+            return
+        text = ''
+        for uid in params['id'][0].split(','):
+            for path in glob.glob(os.path.join('genome', f"{uid}.fasta")) or glob.glob(os.path.join('genome', f"{uid}.*.fasta")):
+                with open(path) as f:
+                    text += f.read().rstrip('\n') + '\n\n'
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.end_headers()
+        self.wfile.write(text.encode())
+
+    def log_message(self, *args):
+        pass
+
+server = ThreadingHTTPServer(('127.0.0.1', 0), Efetch)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+url = f"http://127.0.0.1:{server.server_address[1]}/efetch.fcgi"
+
+db = pd.read_csv('genome_db.csv').set_index('uid')
+uids = db.index.tolist()
+with tempfile.TemporaryDirectory() as directory:
+    t0 = time.perf_counter()
+    written, failed = download(uids + ['XX_000000.1', uids[0]], directory, batch=8, workers=3, url=url, backoff=0.01)
+    seconds = time.perf_counter() - t0
+    assert sorted(written) == sorted(uids) and failed == ['XX_000000.1'], failed
+    assert len(requests_seen) == -(-(len(uids) + 1) // 8) + 1
+    for uid in uids:
+        with open(os.path.join(directory, f"{uid}.fasta")) as f, open(os.path.join('genome', f"{uid}.fasta")) as g:
+            assert f.read().rstrip('\n') == g.read().rstrip('\n'), uid
+    print(f"Genomes: {len(uids)} | Requests: {len(requests_seen)} | {seconds:.3f}s")
+
+    # Resume: only the missing file is fetched again, an accession without a version is already stored
+    os.remove(os.path.join(directory, f"{uids[3]}.fasta"))
+    requests_seen.clear()
+    written, failed = download(uids + [uids[5].split('.')[0]], directory, batch=8, url=url, backoff=0.01)
+    assert written == [uids[3]] and not failed
+    assert len(requests_seen) == 2         # 503 then the batch
+
+    # Accessions without a version are stored under the version returned, once
+    os.remove(os.path.join(directory, f"{uids[5]}.fasta"))
+    written, failed = download([uids[5].split('.')[0], uids[5]], directory, url=url, backoff=0.01)
+    assert written == [uids[5]] and not failed
+    assert sorted(os.listdir(directory)) == sorted(f"{uid}.fasta" for uid in uids)
+
+    # Catalog rows computed in the worker pool match the stored catalog
+    for row in catalog_rows(uids, directory, workers=2):
+        stored = db.loc[row['uid']]
+        assert (row['name'], row['length'], row['zlib'], row['hash']) == (stored['name'], stored['length'], stored['zlib'], stored['hash']), row['uid']
+server.shutdown()
+print("Batch download resumes and matches the catalog")
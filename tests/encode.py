@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import io, os, time
+from chimera.encode import DNACodec, bytes_to_dna, encode, gc_fraction, mapping, max_homopolymer
+
+# Same bases as the original bit-string encoder
+message = "ABC123<>?!@£$%^&*()".encode('utf-8')
+assert bytes_to_dna(message).decode('ascii') == encode(''.join(format(x, '08b') for x in message), mapping)
+
+# Round trips of random data through every mode, blocks of every padding
+data = os.urandom(3 * (1 << 20) + 7)
+for rotating in (False, True):
+    for whiten in (False, True):
+        codec = DNACodec(1 << 16, rotating, whiten)
+        t0 = time.perf_counter()
+        strands = list(codec.encode_stream(io.BytesIO(data)))
+        t1 = time.perf_counter()
+        assert b''.join(codec.decode_stream(strands)) == data
+        t2 = time.perf_counter()
+        zeros = codec.encode_block(bytes(10000))
+        if rotating:
+            assert max(max_homopolymer(s) for s in strands) == 1 and max_homopolymer(zeros) == 1
+        if whiten:
+            assert abs(gc_fraction(zeros) - 0.5) < 0.02
+        for n in range(6):
+            assert codec.decode_block(codec.encode_block(b'x' * n, n), n) == b'x' * n
+        print(f"Rotating: {rotating} | Whiten: {whiten} | Encode: {len(data)/(t1-t0)/1e6:.1f} MB/s | Decode: {len(data)/(t2-t1)/1e6:.1f} MB/s")
+
+# A substituted base fails the block checksum
+codec = DNACodec()
+strand = bytearray(codec.encode_block(b'hello world'))
+strand[5] = ord('A') if strand[5] != ord('A') else ord('C')
+try:
+    codec.decode_block(bytes(strand))
+    raise AssertionError("Corrupted strand decoded")
+except ValueError as e:
+    assert str(e) == "Block 0: checksum mismatch", e
+
+# Whitened strands are part of the storage format: the keystream is pinned, not left to a random generator
+codec = DNACodec(whiten=True, seed=7)
+assert codec.keystream(bytes(16), 3).hex() == 'b822e58dcef25f136d9cb6312a4585d4'
+assert codec.encode_block(b'chimera', 1) == b'ATTTGCGGGTAGAAATATGAAATCCTATAATCCTACTTTCTCCA'
+assert DNACodec(whiten=True, seed=8).keystream(bytes(16), 3) != codec.keystream(bytes(16), 3) != codec.keystream(bytes(16), 4)
+
+# Strands too short to hold the checksum are truncated, in both modes
+for rotating in (False, True):
+    codec = DNACodec(rotating=rotating)
+    strands = (b'', codec.encode_block(b'')[:1]) if rotating else (b'', codec.encode_block(b'')[:8])
+    for strand in strands:
+        try:
+            codec.decode_block(strand, 3)
+            raise AssertionError("Truncated strand decoded")
+        except ValueError as e:
+            assert str(e) == "Block 3: truncated strand", e
+print("DNA storage codec round trips")
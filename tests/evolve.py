@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import numpy as np
+from chimera.evolve import Fitness, Hydropathy, Identity, IsoelectricPoint, Stability, evolve, splice
+from chimera.fasta import FastaIO
+from chimera.residue import encode_residues
+
+spike = list(filter(None, FastaIO('NC_045512.2').res.split('*')))[6]
+epitope = (438, 506)
+original = spike[epitope[0]: epitope[1]]
+fitness = Fitness((1.0, Stability()), (5.0, IsoelectricPoint(7.0)), (2.0, Hydropathy(-0.4)), (20.0, Identity(spike, epitope)))
+
+# Splicing writes the mutants over the epitope only
+mutants = np.zeros((3, epitope[1] - epitope[0]), dtype=encode_residues(spike).dtype)
+full = splice(spike, epitope, mutants)
+reference = encode_residues(spike)
+assert full.shape == (3, len(spike)) and (full[:, epitope[0]: epitope[1]] == 0).all()
+assert (full[:, :epitope[0]] == reference[:epitope[0]]).all() and (full[:, epitope[1]:] == reference[epitope[1]:]).all()
+
+# Seeded runs are reproducible, the best fitness never decreases thanks to the elite
+best, score, history = evolve(spike, epitope, fitness, population=60, generations=30, seed=7)
+again = evolve(spike, epitope, fitness, population=60, generations=30, seed=7)
+assert (best, score) == again[:2] and [g.best for g in history] == [g.best for g in again[2]]
+assert evolve(spike, epitope, fitness, population=60, generations=30, seed=8)[:2] != (best, score)
+bests = [g.best for g in history]
+assert all(b2 >= b1 for b1, b2 in zip(bests, bests[1:])) and len(history) == 30
+assert all(g.evaluations == 58 for g in history)
+assert len(best) == len(original) and score == bests[-1]
+assert score >= fitness(splice(spike, epitope, encode_residues(original)[None]))[0]
+
+# The elite survives: when every child is mutated at every position only the kept original scores 1
+identity = Identity(spike, epitope)
+best, score, _ = evolve(spike, epitope, identity, population=20, generations=5, mutation=1.0, elite=1)
+assert best == original and score == 1.0
+best, score, _ = evolve(spike, epitope, identity, population=20, generations=5, mutation=1.0, elite=0)
+assert score < 1.0
+
+# The population has to leave room for children
+for population in (1, 2):
+    try:
+        evolve(spike, epitope, fitness, population=population, generations=1)
+        raise AssertionError(f"population {population} accepted")
+    except ValueError:
+        pass
+print("Evolution is seeded, elitist and leaves the rest of the protein alone")
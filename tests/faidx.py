@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import os, tempfile
+from chimera.faidx import IndexedFasta
+
+with tempfile.TemporaryDirectory() as directory:
+    # Headers containing '>' come back whole, regions span line breaks
+    path = os.path.join(directory, 'test.fasta')
+    with open(path, 'w') as f:
+        f.write(">a first > record\nACGTA\nCGTAC\nGT\n>b second>>record\r\nTTTT\r\nGG\r\n>c\n")
+    reader = IndexedFasta(path)
+    assert reader.records() == ['a', 'b', 'c']
+    assert reader.header('a') == '>a first > record' and reader.header('b') == '>b second>>record' and reader.header('c') == '>c'
+    assert reader.fetch('a') == 'ACGTACGTACGT' and reader.fetch('a', 3, 8) == 'TACGT' and reader.fetch('b') == 'TTTTGG'
+    assert reader.fetch('c') == '' and reader.length('b') == 6
+    reader.close()
+
+    # Duplicate record names are refused instead of shadowing each other
+    path = os.path.join(directory, 'duplicate.fasta')
+    with open(path, 'w') as f:
+        f.write(">a one\nACGT\n>a two\nTTTT\n")
+    try:
+        IndexedFasta(path)
+        raise AssertionError("duplicate records accepted")
+    except ValueError as e:
+        assert 'duplicate' in str(e)
+print("Indexed FASTA headers and regions")
@@ -3,8 +3,9 @@
 import sys
 sys.path.append('../CHIMERA')
 
+import random, time
 from chimera.fasta import FastaIO
-from chimera.huffman import *
+from chimera.huffman import HuffmanCodec, assign_code, build_tree, code_lengths, compress, decompress, encode
 from collections import Counter
 
 FASTA = FastaIO('NC_001542.1')
@@ -22,4 +23,41 @@ encoding = assign_code(node)
 for i in encoding:
     print(f'{i} : {encoding[i]}')
 
-print(encode(FASTA.genome, encoding))
\ No newline at end of file
+print(encode(FASTA.genome, encoding))
+
+# Bit-packed canonical codec: round trips over bases, codons, k-mers and residues
+for name, seq, k in (('Bases', FASTA.genome, 1), ('Codons', FASTA.genome, 3), ('8-mers', FASTA.genome, 8), ('Residues', FASTA.res, 1)):
+    t0 = time.perf_counter()
+    data = compress(seq, k)
+    t1 = time.perf_counter()
+    assert decompress(data) == seq.encode('ascii'), name
+    print(f"{name} | {len(seq)} -> {len(data)} bytes | Encode: {t1-t0:.4f}s | Decode: {time.perf_counter()-t1:.4f}s")
+
+# Code lengths stay within the limit on a heavily skewed alphabet, small blocks cross block boundaries
+skewed = ''.join(chr(65 + i) * 2 ** i for i in range(20))
+codec = HuffmanCodec.fit(skewed, limit=12)
+assert codec.width <= 12 and decompress(codec.encode(skewed, size=1000)) == skewed.encode('ascii')
+for seq in ('', 'A', 'ACGTN' * 3):
+    assert decompress(compress(seq, 3)) == seq.encode('ascii')
+
+# Package-merge: unlimited lengths cost as much as the Huffman tree, limited ones fill the Kraft sum exactly
+random.seed(1)
+for n, limit in ((2, 16), (3, 16), (57, 16), (1000, 30), (1000, 10), (4096, 12)):
+    counts = [random.randint(1, 10 ** 6) for _ in range(n)]
+    lengths = code_lengths(counts, limit).astype(int)
+    assert lengths.max() <= limit and sum(2.0 ** -l for l in lengths) == 1.0, (n, limit)
+    if limit == 30:
+        tree = assign_code(build_tree([(str(i), c) for i, c in enumerate(counts)]))
+        assert sum(l * c for l, c in zip(lengths, counts)) == sum(len(tree[str(i)]) * c for i, c in enumerate(counts))
+
+# Large alphabets: up to 2 ** 16 symbols round trip, more are refused instead of searched for forever
+printable = ''.join(random.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 .,;:!?()[]{}<>=+-*/') for _ in range(300000))
+assert decompress(compress(printable, 2)) == printable.encode('ascii')
+assert set(code_lengths([1] * 2 ** 16)) == {16}
+for counts, seq, k in (([1] * 70000, None, None), (None, printable, 3), (None, ''.join(random.choice('ACGTN') for _ in range(10 ** 6)), 8)):
+    try:
+        code_lengths(counts) if counts else compress(seq, k)
+        raise AssertionError("Alphabet larger than the codes accepted")
+    except ValueError as e:
+        print(e)
+print("Huffman codec round trips")
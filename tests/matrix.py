@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import os, tempfile
+import numpy as np
+from chimera.compression import compressed_size, compressed_sizes, ncd
+from chimera.matrix import load_sequence, minhash_distance, pairwise, to_distance
+
+library = {uid: f"genome/{uid}.fasta" for uid in ('KP876546.1', 'NC_001542.1', 'NC_045512.2', 'MN996532.2')}
+with tempfile.TemporaryDirectory() as directory:
+    # Symmetric with a zero diagonal, every value equal to the metric of the pair computed directly
+    uids, matrix = pairwise(library, 'ncd', workers=1, cache=os.path.join(directory, 'serial.jsonl'))
+    assert uids == list(library) and (matrix == matrix.T).all() and (np.diag(matrix) == 0).all()
+    for i in range(len(uids)):
+        for j in range(i + 1, len(uids)):
+            seq1, seq2 = load_sequence(library[uids[i]]), load_sequence(library[uids[j]])
+            direct = ncd(compressed_size(seq1, 'lzma'), compressed_size(seq2, 'lzma'), compressed_sizes(seq1, seq2, codecs=('lzma',))['lzma'])
+            assert matrix[i, j] == direct, (uids[i], uids[j])
+    # SARS-CoV-2 and the bat coronavirus RaTG13 are the closest pair
+    assert matrix[2, 3] == matrix[~np.eye(len(uids), dtype=bool)].min()
+
+    # Known single-genome sizes and a worker pool give the same matrix
+    sizes = {uid: compressed_size(load_sequence(path), 'lzma') for uid, path in library.items()}
+    _, parallel = pairwise(library, 'ncd', workers=2, cache=os.path.join(directory, 'parallel.jsonl'), sizes=sizes)
+    assert (parallel == matrix).all()
+
+    # Cached pairs are served again without recomputing, minhash agrees with the direct distance
+    _, cached = pairwise(library, 'ncd', workers=2, cache=os.path.join(directory, 'serial.jsonl'))
+    assert (cached == matrix).all()
+    _, minhash = pairwise(library, 'minhash', workers=2, cache=os.path.join(directory, 'minhash.jsonl'))
+    _, serial = pairwise(library, 'minhash', workers=1, cache=os.path.join(directory, 'minhash_serial.jsonl'))
+    assert (minhash == serial).all() and (minhash == minhash.T).all() and (np.diag(minhash) == 0).all()
+    assert minhash[0, 1] == minhash_distance(load_sequence(library[uids[0]]), load_sequence(library[uids[1]]))
+    assert (to_distance(np.full((2, 2), 100.0), 'similarity') == 0).all()
+print("Similarity matrices are symmetric and match the pair metrics")
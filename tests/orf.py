@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+from chimera.fasta import FastaIO
+from chimera.orf import find_orfs
+from chimera.translate import translate_python
+
+COMPLEMENT = str.maketrans('ACGT', 'TGCA')
+
+def reverse_complement(seq):
+    return seq.translate(COMPLEMENT)[::-1]
+
+genome = FastaIO('NC_045512.2', lazy=True, cache=None).genome
+orfs = list(find_orfs(genome, min_length=100))
+
+# Known genes of NC_045512.2 (1-based, inclusive coordinates from the GenBank record). ORFs run from the first
+# start codon after the previous STOP, S has an in-frame ATG 27 bases upstream of its annotated start.
+genes = {'S': (21563, 25384), 'ORF3a': (25393, 26220), 'M': (26523, 27191), 'N': (28274, 29533)}
+forward = {orf.stop: orf for orf in orfs if orf.strand == 1}
+for gene, (start, stop) in genes.items():
+    orf = forward[stop]
+    protein = translate_python(genome[start - 1: stop])
+    assert orf.start <= start - 1 and orf.frame == (start - 1) % 3 and orf.protein.endswith(protein), gene
+    assert orf.protein.startswith('M') and '*' not in orf.protein[:-1] and len(orf.protein) == (orf.stop - orf.start) // 3
+assert [forward[stop].start for _, stop in genes.values()] == [21535, 25392, 26522, 28273]
+assert len(forward[25384].protein) - 9 == 1274     # Spike, 1273 residues and the STOP
+
+# Reverse strand: the genes of the reverse complement are found on strand -1 at the forward coordinates
+rc = reverse_complement(genome)
+reverse = {(orf.start, orf.stop): orf for orf in find_orfs(rc, min_length=100) if orf.strand == -1}
+for gene, (_, stop) in genes.items():
+    orf = forward[stop]
+    assert reverse[(len(rc) - orf.stop, len(rc) - orf.start)].protein == orf.protein, gene
+
+# Proteins are sorted by start and respect min_length (in codons, STOP excluded)
+assert [orf.start for orf in orfs] == sorted(orf.start for orf in orfs)
+for min_length in (30, 300, 1000):
+    found = list(find_orfs(genome, min_length=min_length))
+    assert found and all(len(orf.protein) - 1 >= min_length for orf in found), min_length
+assert len(list(find_orfs(genome, min_length=1000))) < len(list(find_orfs(genome, min_length=300))) < len(list(find_orfs(genome, min_length=30)))
+
+# Alternative start codons are translated as methionine
+seq = 'CC' + 'GTG' + 'AAA' * 40 + 'TAA' + 'CC' + 'TTG' + 'CCC' * 40 + 'TGA'
+assert not list(find_orfs(seq, min_length=30, strands=(1,)))
+alternative = list(find_orfs(seq, min_length=30, start_codons=('ATG', 'GTG', 'TTG'), strands=(1,)))
+assert [(orf.start, orf.protein[:3]) for orf in alternative] == [(2, 'MKK'), (130, 'MPP')]
+assert all(orf.protein.endswith('*') for orf in alternative)
+print(f"ORFs: {len(orfs)} over 100 codons, known genes found on both strands")
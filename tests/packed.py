@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import os, random, re, tempfile, time
+from chimera.packed import PackedSequence, pack_genomes, read_library, write_library
+from chimera.fasta import FastaIO
+
+COMPLEMENT = str.maketrans('ACGTN', 'TGCAN')
+
+def plain(seq):
+    # What the packed form keeps: ACGT, anything else as N
+    return re.sub('[^ACGT]', 'N', seq.upper())
+
+def reverse_complement(seq):
+    return seq.translate(COMPLEMENT)[::-1]
+
+def counts(seq):
+    return {b: seq.count(b) for b in 'ACGTN'}
+
+with tempfile.TemporaryDirectory() as directory:
+    # Every genome of the library round trips through the CHM2 file
+    path = os.path.join(directory, 'library.2bit')
+    t0 = time.perf_counter()
+    pack_genomes('genome', path)
+    library = read_library(path)
+    print(f"Library: {len(library)} genomes, {os.path.getsize(path)} bytes in {time.perf_counter()-t0:.2f}s")
+    assert len(library) == len([f for f in os.listdir('genome') if f.endswith('.fasta')])
+    for uid, (label, seq) in library.items():
+        FASTA = FastaIO(uid, lazy=True, cache=None)
+        assert label == FASTA.label[1:] and str(seq) == plain(FASTA.genome), uid
+
+    # Views, reverse complements and N runs survive a second write, also from unaligned views
+    random.seed(4)
+    seq = ''.join(random.choice('ACGT') for _ in range(1000))
+    seq = seq[:100] + 'N' * 37 + seq[137:500] + 'NNN' + seq[503:997] + 'N' * 3
+    packed = PackedSequence.from_string(seq)
+    sequences = {'full': ('Full', packed), 'view': ('View', packed[5:611]), 'rc': ('RC', packed[3:800].reverse_complement())}
+    path = os.path.join(directory, 'views.2bit')
+    write_library(path, sequences)
+    library = read_library(path)
+    assert [str(s) for _, s in library.values()] == [seq, seq[5:611], reverse_complement(seq[3:800])]
+    assert [label for label, _ in library.values()] == ['Full', 'View', 'RC']
+
+# Slicing, indexing, reverse complements and counts against the plain string, N runs included
+rc = reverse_complement(seq)
+for start, end in [(0, 1000), (1, 999), (99, 140), (136, 503), (500, 504), (7, 7), (998, 1000), (-50, None), (3, -3)]:
+    view, expected = packed[start:end], seq[start:end]
+    assert str(view) == expected and len(view) == len(expected), (start, end)
+    assert view.counts() == counts(expected), (start, end)
+    assert str(view.reverse_complement()) == reverse_complement(expected), (start, end)
+    assert view.reverse_complement().counts() == counts(reverse_complement(expected)), (start, end)
+    assert str(packed.reverse_complement()[start:end]) == rc[start:end], (start, end)
+    assert str(view[2:-2]) == expected[2:-2] and str(view.reverse_complement()[1:]) == reverse_complement(expected)[1:]
+for i in (0, 99, 100, 136, 137, 500, -1, -4):
+    assert packed[i] == seq[i] and packed.reverse_complement()[i] == rc[i], i
+assert packed.count('N') == seq.count('N') == 43 and packed.count('X') == 0
+try:
+    packed[1000]
+    raise AssertionError("index past the end accepted")
+except IndexError:
+    pass
+try:
+    packed[::2]
+    raise AssertionError("strided slice accepted")
+except ValueError:
+    pass
+print("Packed sequences match their strings")
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import time
+from chimera.fasta import FastaIO
+from chimera.measure import aliphatic_index, hydropathy_index, instability_index
+from chimera.profile import PROFILES
+
+# Every window of a profile against the whole-chain function run on that slice
+FASTA = FastaIO('NC_045512.2')
+peptides = [p for p in FASTA.res.split('*') if len(p) >= 2 and 'X' not in p]
+reference = {'hydropathy': hydropathy_index, 'aliphatic': aliphatic_index, 'instability': instability_index}
+
+for window in (1, 9, 19, 101):
+    t0 = time.perf_counter()
+    profiles = {name: fn(peptides, window) for name, fn in PROFILES.items()}
+    t1 = time.perf_counter()
+    for i, peptide in enumerate(peptides):
+        assert len(profiles['hydropathy'][i]) == max(len(peptide) - window + 1, 0)
+        for k in range(0, len(peptide) - window + 1, 17):
+            for name, fn in reference.items():
+                assert abs(profiles[name][i][k] - fn(peptide[k: k+window])) < 1e-9, (name, window, i, k)
+    print(f"Window: {window} | Residues: {sum(map(len, peptides))} | Profiles: {t1-t0:.4f}s")
+
+print("Profiles match the whole-chain indices")
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import glob, os, random, time
+from chimera.codon import halflife
+from chimera.fasta import FastaIO
+from chimera.measure import *
+from chimera.protein import ProteinAnalyzer
+
+# Batched columns against the single-peptide functions of chimera.measure
+peptides = []
+for path in sorted(glob.glob('genome/*.fasta'))[:10]:
+    FASTA = FastaIO(os.path.basename(path)[:-len('.fasta')])
+    peptides += [p for p in FASTA.res.split('*') if len(p) >= 2 and 'X' not in p]
+
+t0 = time.perf_counter()
+columns = ProteinAnalyzer(peptides).analyze()
+t1 = time.perf_counter()
+print(f"Peptides: {len(peptides)} | Residues: {sum(map(len, peptides))} | Batched: {t1-t0:.3f}s")
+
+for i in random.Random(0).sample(range(len(peptides)), 200):
+    peptide = peptides[i]
+    formula, nb_atoms = atomic_composition(peptide)
+    assert columns['type'][i] == peptype(peptide)
+    assert abs(columns['molecular_weight'][i] - molecular_weight(peptide)) < 1e-6
+    assert abs(columns['net_charge'][i] - charge_at_pH(7.0, peptide)) < 1e-9
+    assert columns['isoelectric_point'][i] == isoelectric_point(peptide), peptide
+    assert [columns[f"halflife_{h}"][i] for h in ('mammalian', 'yeast', 'ecoli')] == lookup_value(peptide[0], halflife())
+    assert (columns['formula'][i], columns['atoms'][i]) == (formula, nb_atoms)
+    assert (columns['positive'][i], columns['negative'][i]) == charged_residues(peptide)
+    assert columns['extinction_coefficient'][i] == extinction_coefficient(peptide)
+    assert abs(columns['instability_index'][i] - instability_index(peptide)) < 1e-9
+    assert abs(columns['aliphatic_index'][i] - aliphatic_index(peptide)) < 1e-9
+    assert abs(columns['hydropathy_index'][i] - hydropathy_index(peptide)) < 1e-9
+
+print("Batched analysis matches chimera.measure")
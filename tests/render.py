@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import random, time
+import numpy as np
+import pandas as pd
+from chimera.fasta import FastaIO
+from chimera.render import average_hash, genome_hash, mipmap, seq_to_pixels, tiles
+
+# Hashes computed from the base codes against the ones stored in the library
+db = pd.read_csv('genome_db.csv')
+t0 = time.perf_counter()
+for uid, stored in zip(db.uid, db.hash):
+    assert genome_hash(FastaIO(uid, lazy=True).genome) == stored, uid
+print(f"Genomes: {len(db)} | Hashes match genome_db.csv | {time.perf_counter()-t0:.3f}s")
+
+# Against PIL resizing the full image, ambiguous bases and padding included
+random.seed(0)
+for length in (1, 7, 63, 64, 65, 1000, 54321):
+    seq = ''.join(random.choice('ACGTACGTN') for _ in range(length))
+    assert genome_hash(seq) == average_hash(seq_to_pixels(seq)), length
+
+# Mipmap blocks are the mean colour of the full image, tiles put back together are the full image
+seq = ''.join(random.choice('ACGT') for _ in range(300000))
+image = np.asarray(seq_to_pixels(seq)).astype(np.float64)
+small = np.asarray(mipmap(seq, 3))
+for y, x in ((0, 0), (10, 20), (len(small) - 1, len(small) - 1)):
+    assert np.array_equal(small[y, x], np.rint(image[8*y: 8*y+8, 8*x: 8*x+8].reshape(-1, 3).mean(axis=0))), (y, x)
+canvas = np.zeros_like(image)
+for x, y, tile in tiles(seq, 100):
+    tile = np.asarray(tile)
+    canvas[100*y: 100*y + tile.shape[0], 100*x: 100*x + tile.shape[1]] = tile
+assert np.array_equal(canvas, image)
+print("Hashes, mipmaps and tiles match the full image")
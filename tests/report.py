@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import os, tempfile, time
+import pandas as pd
+from chimera.fasta import FastaIO
+from chimera.measure import isoelectric_point, molecular_weight
+from chimera.report import analyze_genome, open_writer, output_format, pyarrow, reports
+
+# Rows point back into the residue chain and agree with the single-peptide functions
+FASTA = FastaIO('NC_045512.2')
+frame = analyze_genome('NC_045512.2')
+assert len(frame) == len(list(filter(None, FASTA.res.split('*'))))
+for row in frame.itertuples():
+    assert FASTA.res[row.start: row.start + row.length] == row.sequence
+    if 'X' not in row.sequence:
+        assert abs(row.molecular_weight - molecular_weight(row.sequence)) < 1e-6
+        assert abs(row.isoelectric_point - isoelectric_point(row.sequence)) < 1e-9
+
+# Streamed frames written as CSV and JSON lines read back as the same table
+uids = ['NC_045512.2', 'NC_001542.1', 'MN996532.2']
+with tempfile.TemporaryDirectory() as directory:
+    t0 = time.perf_counter()
+    frames = list(reports(uids, min_length=10, workers=2))
+    seconds = time.perf_counter() - t0
+    assert sorted(f['uid'].iloc[0] for f in frames) == sorted(uids)
+    expected = pd.concat(frames, ignore_index=True)
+    for name in ('peptides.csv', 'peptides.jsonl'):
+        path = os.path.join(directory, name)
+        writer = open_writer(path)
+        for f in frames:
+            writer.write(f)
+        writer.close()
+        written = pd.read_csv(path) if name.endswith('.csv') else pd.read_json(path, lines=True)
+        assert len(written) == len(expected) and (written['sequence'] == expected['sequence']).all(), name
+        assert (abs(written['isoelectric_point'] - expected['isoelectric_point']) < 1e-4).all(), name
+
+# Formats are resolved before any genome is analysed: unknown extensions and parquet without pyarrow are refused
+assert output_format('peptides.CSV') == 'csv' and output_format('peptides.out', 'jsonl') == 'jsonl'
+for path in ('peptides.txt',) + (() if pyarrow else ('peptides.parquet',)):
+    try:
+        output_format(path)
+        raise AssertionError(f"{path} accepted")
+    except ValueError:
+        pass
+print(f"Peptides: {len(expected)} | {len(expected) / seconds:.0f} peptides/s | Reports round trip")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import collections, os, tempfile
+import numpy as np
+from chimera.fasta import FastaIO
+from chimera.search import KmerIndex
+from chimera.translate import encode_bases
+
+UIDS = ['KP876546.1', 'NC_001542.1', 'NC_045512.2']     # Order of the build
+COMPLEMENT = str.maketrans('ACGTN', 'TGCAN')
+
+def brute_seeds(query, genomes, k):
+    # (query position, genome, target position) of every exact k-mer match, windows with an N left out
+    where = collections.defaultdict(list)
+    for g, genome in enumerate(genomes):
+        for p in range(len(genome) - k + 1):
+            if 'N' not in genome[p: p + k]:
+                where[genome[p: p + k]].append((g, p))
+    return sorted((q, g, p) for q in range(len(query) - k + 1) for g, p in where.get(query[q: q + k], []))
+
+genomes = [FastaIO(uid, lazy=True).genome for uid in UIDS]
+with tempfile.TemporaryDirectory() as directory:
+    for uid in UIDS:
+        os.symlink(os.path.abspath(f"genome/{uid}.fasta"), os.path.join(directory, f"{uid}.fasta"))
+    index = KmerIndex.build(directory, k=12, path=os.path.join(directory, 'kmer_index.npz'))
+    assert index.uids == UIDS and (index.kmers[1:] >= index.kmers[:-1]).all()
+
+    # Seeds match a brute force scan of the genomes, on both strands
+    region = genomes[2][21000: 21400]
+    for query in (region, region.translate(COMPLEMENT)[::-1], 'ACGT' * 10 + region[:50]):
+        qpos, genome, tpos = index.seeds(encode_bases(query), max_occurrences=10 ** 9)
+        assert sorted(zip(qpos.tolist(), genome.tolist(), tpos.tolist())) == brute_seeds(query, genomes, 12)
+
+    # Hits report the region on the forward genome, whichever strand the query is read from
+    for strand, query in ((1, region), (-1, region.translate(COMPLEMENT)[::-1])):
+        hit = index.query(query)[0]
+        assert (hit.uid, hit.strand, hit.target_start, hit.target_end) == (UIDS[2], strand, 21000, 21400), hit
+        assert (hit.query_start, hit.query_end, hit.identity) == (0, 400, 1.0), hit
+    hit = index.query(region[:150] + 'A' + region[151:])[0]
+    assert hit.identity < 1.0 and (hit.target_start, hit.target_end) == (21000, 21400)
+
+    # Genomes added in a batch merge into the same index as a full build
+    incremental = KmerIndex.build(directory, k=12, path=os.path.join(directory, 'partial.npz'))
+    incremental.uids, keep = UIDS[:1], incremental.genome == 0
+    incremental.kmers, incremental.genome, incremental.pos = incremental.kmers[keep], incremental.genome[keep], incremental.pos[keep]
+    for uid, genome in zip(UIDS[1:], genomes[1:]):
+        assert incremental.add(uid, genome, merge=False)
+    assert not incremental.add(UIDS[1], genomes[1])
+    incremental.merge()
+    for column in ('kmers', 'genome', 'pos'):
+        assert (getattr(incremental, column) == getattr(index, column)).all(), column
+print("Seeds and hits match a brute force scan")
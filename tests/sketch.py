@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import math, random
+import numpy as np
+from chimera.fasta import FastaIO
+from chimera.sketch import SketchLibrary, canonical_kmers, jaccard, mash_distance, sketch
+from chimera.translate import encode_bases
+
+def exact_jaccard(seq1, seq2, k=21):
+    a, b = (np.unique(canonical_kmers(encode_bases(s), k)) for s in (seq1, seq2))
+    return len(np.intersect1d(a, b, assume_unique=True)) / len(np.union1d(a, b))
+
+def genome(uid):
+    return FastaIO(uid, lazy=True, cache=None).genome
+
+# The bottom-k estimate stays within a few standard errors of the exact k-mer Jaccard
+random.seed(8)
+sars = genome('NC_045512.2')
+mutated = ''.join(random.choice('ACGT'.replace(b, '')) if random.random() < 0.005 else b for b in sars)
+pairs = [('NC_045512.2 / mutated', sars, mutated),
+         ('NC_045512.2 / MN996532.2', sars, genome('MN996532.2')),
+         ('NC_045512.2 / MZ937000.1', sars, genome('MZ937000.1')),
+         ('NC_003310.1 / NC_001611.1', genome('NC_003310.1'), genome('NC_001611.1'))]
+for size in (1000, 4000):
+    for name, seq1, seq2 in pairs:
+        exact = exact_jaccard(seq1, seq2)
+        estimate, shared = jaccard(sketch(seq1, size=size), sketch(seq2, size=size), size)
+        error = math.sqrt(max(exact * (1 - exact), 1e-4) / size)
+        print(f"{name:<26} | size {size} | Exact: {exact:.4f} | Estimate: {estimate:.4f} | Shared: {shared}")
+        assert abs(estimate - exact) <= 4 * error + 0.002, (name, size)
+        assert 0 < exact < 1
+
+# Identical inputs: Jaccard 1, Mash distance 0, ANI 1. Unrelated inputs: distance 1
+s = sketch(sars)
+assert jaccard(s, s) == (1.0, len(s)) == (1.0, 1000) and mash_distance(1.0) == 0.0
+assert jaccard(s, sketch(sars[::-1].translate(str.maketrans('ACGT', 'TGCA'))))[0] == 1.0      # Canonical k-mers
+assert mash_distance(0.0) == 1.0 and 0 < mash_distance(0.5) < mash_distance(0.1) < 1
+
+library = SketchLibrary(path=None)
+for uid in ('NC_045512.2', 'MN996532.2', 'NC_002737.2'):
+    library.add(uid, genome(uid))
+best = library.query(sars, top=3)
+assert best[0].uid == 'NC_045512.2' and best[0].distance == 0.0 and best[0].ani == 1.0 and best[0].shared == 1000
+assert best[1].uid == 'MN996532.2' and best[1].ani > 0.95 and best[2].jaccard == 0.0
+assert library.compare('NC_045512.2', 'MN996532.2') == best[1]
+print("Sketches estimate the k-mer Jaccard")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import glob, os, tempfile, time
+import numpy as np
+from chimera.structure import CellList, bonds, clashes, contact_map, contacts, read_pdb, residues
+
+# Every field matches a line by line read of the fixed columns
+for path in sorted(glob.glob('hip/pdb/*.pdb')):
+    t0 = time.perf_counter()
+    atoms = read_pdb(path)
+    seconds = time.perf_counter() - t0
+    with open(path) as f:
+        lines = [line.rstrip('\n').ljust(80) for line in f if line.startswith(('ATOM', 'HETATM'))]
+    assert len(atoms) == len(lines), path
+    assert (atoms['coord'] == [[float(l[30:38]), float(l[38:46]), float(l[46:54])] for l in lines]).all(), path
+    assert list(atoms['name']) == [l[12:16].strip() for l in lines] and list(atoms['chain']) == [l[21].strip() for l in lines]
+    assert list(atoms['resseq']) == [int(l[22:26]) for l in lines] and list(atoms['serial']) == [int(l[6:11]) for l in lines]
+    assert np.allclose(atoms['bfactor'], [float(l[60:66] or 0) for l in lines])
+    assert list(atoms['hetero']) == [l.startswith('HETATM') for l in lines]
+    assert (atoms['element'] != '').all()
+    print(f"{os.path.basename(path)}: {len(atoms)} atoms in {seconds:.3f}s")
+
+# Elements are inferred when the column is missing, water and ions included
+atoms = read_pdb('hip/pdb/input.pdb')
+assert set(atoms['element']) == {'C', 'CL', 'H', 'N', 'O', 'S'} and (atoms['element'][atoms['name'] == 'OW'] == 'O').all()
+with tempfile.TemporaryDirectory() as directory:
+    empty = os.path.join(directory, 'empty.pdb')
+    open(empty, 'w').close()
+    assert len(read_pdb(empty)) == 0
+
+# Cell list radius queries and pairs match brute force
+atoms = read_pdb('hip/pdb/1ubq.pdb')
+xyz = atoms['coord']
+distances = np.sqrt(((xyz[:, None] - xyz[None]) ** 2).sum(axis=2))
+for cell, radius in ((4.0, 4.0), (3.0, 7.5), (10.0, 2.0)):
+    index = CellList(xyz, cell)
+    i, j, d = index.pairs(radius)
+    expected = np.nonzero(np.triu(distances <= radius, 1))
+    assert (i == expected[0]).all() and (j == expected[1]).all() and np.allclose(d, distances[expected])
+    for point in (xyz[0], xyz.mean(axis=0), xyz.max(axis=0) + 2):
+        assert (index.query(point, radius) == np.flatnonzero(np.sqrt(((xyz - point) ** 2).sum(axis=1)) <= radius)).all()
+
+# Residue contacts, the map is symmetric and agrees with brute force over heavy atoms
+index, table = residues(atoms)
+assert len(table) == 134 and (table['end'] - table['start'] > 0).all() and (index[table['start']] == np.arange(len(table))).all()
+matrix = contact_map(atoms, 4.5)
+expected = np.zeros_like(matrix)
+close = np.nonzero((distances <= 4.5) & (index[:, None] != index[None]))
+expected[index[close[0]], index[close[1]]] = True
+assert (matrix == matrix.T).all() and (matrix == expected).all()
+assert len(contacts(atoms, 4.5)[0]) == np.triu(matrix).sum()
+
+# Bonds: every residue of the protein chain is linked to the next by a peptide bond
+pairs = bonds(atoms)
+names = atoms['name']
+peptide = (names[pairs[:, 0]] == 'C') & (names[pairs[:, 1]] == 'N')
+assert peptide.sum() == 75         # 76 residues in the chain
+
+# Clashes leave bonded atoms out and catch atoms pushed into each other
+i, j, overlap = clashes(atoms)
+assert (overlap >= 0.4).all() and not np.isin(i * len(atoms) + j, pairs[:, 0] * len(atoms) + pairs[:, 1]).any()
+moved = atoms.copy()
+moved['coord'][100] = moved['coord'][400] + [1.5, 0.0, 0.0]
+i, j, overlap = clashes(moved)
+assert 100 in i or 100 in j
+
+# NMR style files: every model is its own structure, copies of a residue in other models are not in contact
+with open('hip/pdb/1ubq.pdb') as f:
+    lines = [line for line in f if line.startswith(('ATOM', 'HETATM'))]
+single = clashes(atoms)
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'models.pdb')
+    with open(path, 'w') as f:
+        for model in (1, 2):
+            f.write(f"MODEL     {model:>4}\n" + ''.join(lines) + "ENDMDL\n")
+    models = read_pdb(path)
+    assert (models['model'] == np.repeat([1, 2], len(atoms))).all()
+    i, j, overlap = clashes(models)
+    assert len(i) == 2 * len(single[0]) and (models['model'][i] == models['model'][j]).all()
+    pairs, table = contacts(models)
+    assert len(pairs) == 2 * len(contacts(atoms)[0]) and (table['model'][pairs[:, 0]] == table['model'][pairs[:, 1]]).all()
+
+    # Alternative conformers of a residue never clash with each other
+    path = os.path.join(directory, 'altloc.pdb')
+    with open(path, 'w') as f:
+        for line in lines:
+            if line[22:26] == '  23' and line[12:16].strip() not in ('N', 'CA', 'C', 'O'):
+                f.write(line[:16] + 'A' + line[17:])
+                f.write(line[:16] + 'B' + line[17:30] + f"{float(line[30:38]) + 2.5:8.3f}" + line[38:])
+            else:
+                f.write(line)
+    conformers = read_pdb(path)
+    i, j, overlap = clashes(conformers)
+    altloc = conformers['altloc']
+    assert len(i) and not ((altloc[i] != '') & (altloc[j] != '') & (altloc[i] != altloc[j])).any()
+
+# Pair search scales linearly: twice the structure costs about twice the time
+big = read_pdb('hip/pdb/6vxx.pdb')['coord']
+times = []
+for n in (len(big) // 4, len(big)):
+    t0 = time.perf_counter()
+    CellList(big[:n], 4.5).pairs(4.5)
+    times.append(time.perf_counter() - t0)
+print(f"Pairs within 4.5 A: {len(big) // 4} atoms {times[0]:.3f}s | {len(big)} atoms {times[1]:.3f}s")
+assert times[1] < 10 * times[0]
+print("Structures load, index and measure contacts")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import math, random
+import numpy as np
+from chimera.codon import pKa
+from chimera.residue import RESIDUES, SIZE, encode_residues
+from chimera.titration import charge, ionizable_groups, isoelectric_point, peptide_groups, titration_curve
+
+# Baseline: the scalar Henderson-Hasselbalch sum and recursive bisection measure.py used before chimera.titration
+def baseline_charge(pH, peptide):
+    table = pKa()
+    net = math.pow(10, table['alpha_amino'][peptide[0]]) / (math.pow(10, table['alpha_amino'][peptide[0]]) + math.pow(10, pH))
+    net -= math.pow(10, pH) / (math.pow(10, table['alpha_carboxy'][peptide[-1]]) + math.pow(10, pH))
+    for aa in peptide:
+        if aa in table['sidechain_positive']:
+            net += math.pow(10, table['sidechain_positive'][aa]) / (math.pow(10, table['sidechain_positive'][aa]) + math.pow(10, pH))
+        if aa in table['sidechain_negative']:
+            net -= math.pow(10, pH) / (math.pow(10, table['sidechain_negative'][aa]) + math.pow(10, pH))
+    return net
+
+def baseline_pI(peptide, pH=7.0, low=4, high=12):
+    while high - low > 0.0001:
+        if baseline_charge(pH, peptide) > 0.0:
+            low = pH
+        else:
+            high = pH
+        pH = (low + high) / 2
+    return pH
+
+rng = random.Random(0)
+peptides = [''.join(rng.choice(RESIDUES[:20]) for _ in range(rng.randint(2, 300))) for _ in range(300)]
+edges = {'GAVLIGSTNQ': 'no ionizable side chain', 'DDEEDDEE': 'all acidic', 'KKRRKKRR': 'all basic', 'HHHHHH': 'histidines',
+         'AW': 'dipeptide'}
+peptides += list(edges)
+
+# One peptide at a time: charge and pI agree with the baseline
+for peptide in peptides:
+    groups = peptide_groups(peptide)
+    for pH in (0.0, 3.5, 7.0, 9.25, 14.0):
+        assert abs(charge(groups, pH)[0] - baseline_charge(pH, peptide)) < 1e-9, (peptide, pH)
+    assert abs(isoelectric_point(groups)[0] - baseline_pI(peptide)) < 1e-9, peptide
+
+# Whole batches in one call, per peptide pH values included
+codes = [encode_residues(p) for p in peptides]
+groups = ionizable_groups(np.array([np.bincount(c, minlength=SIZE) for c in codes]), [c[0] for c in codes], [c[-1] for c in codes])
+pI = isoelectric_point(groups)
+assert np.allclose(pI, [baseline_pI(p) for p in peptides], atol=1e-9, rtol=0)
+assert np.allclose(charge(groups, pI), [baseline_charge(ph, p) for ph, p in zip(pI.tolist(), peptides)], atol=1e-9, rtol=0)
+
+# Edge cases: neutral peptides sit between the termini, acidic and basic ones end on the bracket of the search
+assert 5.0 < isoelectric_point(peptide_groups('GAVLIGSTNQ'))[0] < 7.0
+assert isoelectric_point(peptide_groups('DDEEDDEE'))[0] - 4.0 < 0.001
+assert 12.0 - isoelectric_point(peptide_groups('KKRRKKRR'))[0] < 0.001
+assert charge(peptide_groups('DDEEDDEE'), 7.0)[0] < -7.5 and charge(peptide_groups('KKRRKKRR'), 7.0)[0] > 7.5
+
+# The titration curve falls with pH and crosses zero at the isoelectric point
+grid, curves = titration_curve(groups)
+assert curves.shape == (len(peptides), len(grid)) and (np.diff(curves, axis=1) < 0).all()
+inside = (pI > 4.001) & (pI < 11.999)
+assert np.allclose(charge(groups, pI)[inside], 0, atol=1e-3)
+print("Titration matches the scalar baseline")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import json, os, subprocess, tempfile, time, timeit
+import numpy as np
+from chimera import measure
+from chimera.fasta import FastaIO
+from chimera.trace import TRACER, span, traced
+
+peptide = 'MKVLAAGIVALLLAAGCSSSKEETTWY'
+
+# Disabled: nothing is recorded and the wrapper costs next to nothing
+measure.isoelectric_point(peptide)
+assert TRACER.stats == {} and not TRACER.events
+raw = min(timeit.repeat(lambda: measure.gc_content.__wrapped__(peptide), number=100000, repeat=3))
+wrapped = min(timeit.repeat(lambda: measure.gc_content(peptide), number=100000, repeat=3))
+print(f"Disabled overhead: {(wrapped - raw) / 100000 * 1e9:.0f}ns per call")
+
+@traced('test.allocate')
+def allocate(n):
+    return np.ones(n)
+
+# Enabled: calls, latency and allocations per stage, nested spans keep their own peaks
+TRACER.enable()
+for peptide_ in [peptide] * 5:
+    measure.isoelectric_point(peptide_)
+with span('test.outer'):
+    allocate(10 ** 6)
+    time.sleep(0.01)
+FastaIO('NC_001542.1', cache=None).res
+stages = TRACER.summary()['stages']
+TRACER.disable()
+assert stages['measure.isoelectric_point']['calls'] == 5
+assert stages['test.allocate']['allocated'] >= 8 * 10 ** 6 and stages['test.outer']['allocated'] >= 8 * 10 ** 6
+assert stages['test.outer']['total'] >= 0.01 + stages['test.allocate']['total']
+assert stages['fasta.load']['calls'] == 1 and stages['translate']['calls'] == 1
+assert all(stage['max'] <= stage['total'] and stage['mean'] <= stage['max'] for stage in stages.values())
+
+with tempfile.TemporaryDirectory() as directory:
+    # Chrome trace: one complete event per call
+    path = os.path.join(directory, 'trace.json')
+    TRACER.export(path, 'chrome')
+    with open(path) as f:
+        events = json.load(f)['traceEvents']
+    assert len(events) == sum(stage['calls'] for stage in stages.values())
+    assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in events)
+
+    # compute.py under CHIMERA_TRACE exports the stages at exit
+    path = os.path.join(directory, 'stages.json')
+    subprocess.run([sys.executable, 'compute.py', '-uid', 'NC_001542.1'], check=True, stdout=subprocess.DEVNULL,
+                   env=dict(os.environ, CHIMERA_TRACE=path, CHIMERA_CACHE='off', PYTHONPATH='.'))
+    with open(path) as f:
+        stages = json.load(f)['stages']
+    assert {'fasta.load', 'translate', 'measure.isoelectric_point', 'measure.instability_index'} <= set(stages)
+
+    # Batch mode: the spans of the worker processes are merged into the export
+    output = os.path.join(directory, 'peptides.csv')
+    subprocess.run([sys.executable, 'compute.py', '-uid', 'NC_001542.1', 'NC_045512.2', '-output', output, '-workers', '2',
+                    '-trace', path, '-trace_format', 'chrome'], check=True, stdout=subprocess.DEVNULL,
+                   env=dict(os.environ, CHIMERA_CACHE='off', PYTHONPATH='.'))
+    with open(path) as f:
+        events = json.load(f)['traceEvents']
+    translations = [e for e in events if e['name'] == 'translate']
+    assert len(translations) == 2
+print("Spans aggregate and export")
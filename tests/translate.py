@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import glob, os, random, time
+from chimera.codon import RNA
+from chimera.fasta import FastaIO
+from chimera.translate import translate, translate_python
+
+# Reference: the original codon-by-codon scanner from FastaIO.translate
+def reference(seq):
+    codon_table = RNA()
+    i, count = 0, 1
+    res = ''
+    while i < len(seq):
+        codon = seq[i:i+3].replace('T', 'U')
+        amino = [k for k, v in codon_table.items() if codon in v]
+
+        if codon=='AUG':
+            count = 3
+        if count==3 and len(codon)==3:
+            res += str(amino).split('/')[1].replace("']", "").strip()
+        if codon=='UAG' or codon=='UAA' or codon=='UGA':
+            i += 2
+            count = 1
+
+        i += count
+    return res
+
+for path in sorted(glob.glob('genome/*.fasta')):
+    UID = os.path.basename(path)[:-len('.fasta')]
+    FASTA = FastaIO(UID)
+
+    t0 = time.perf_counter()
+    expected = reference(FASTA.genome)
+    t1 = time.perf_counter()
+    res = translate(FASTA.genome)
+    t2 = time.perf_counter()
+
+    assert res == expected, UID
+    assert FASTA.res == expected, UID
+    assert translate_python(FASTA.genome) == expected, UID
+    print(f"{UID} | Nucleobases: {len(FASTA.genome)} | Residues: {len(res)} | Reference: {t1-t0:.3f}s | Vectorized: {t2-t1:.4f}s")
+
+# Short random sequences exercise the edge cases: partial codons, back-to-back STOPs, unterminated frames
+random.seed(0)
+for _ in range(5000):
+    seq = ''.join(random.choice('ACGT') for _ in range(random.randint(0, 48)))
+    assert translate(seq) == translate_python(seq) == reference(seq), seq
+
+# Ambiguous bases inside an open reading frame translate to X
+assert translate('ATGNCCTAA') == translate_python('ATGNCCTAA') == 'MX*'
+print("Translation matches reference")
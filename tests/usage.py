@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import os, shutil, tempfile
+import numpy as np
+from chimera.translate import CODONS
+from chimera.usage import FAMILIES, SENSE, CodonUsage, codon_counts, enc, gc3, genome_counts, rscu
+
+with tempfile.TemporaryDirectory() as directory:
+    for uid in ('NC_045512.2', 'NC_001542.1'):
+        shutil.copy(f"genome/{uid}.fasta", directory)
+    path = os.path.join(directory, 'codon_usage.npz')
+
+    # Counted once, then served from the saved matrix
+    usage = CodonUsage(path, directory)
+    assert sorted(usage.update(workers=1)) == ['NC_001542.1', 'NC_045512.2']
+    usage.save()
+    usage = CodonUsage.load(path)
+    assert usage.update(workers=1) == []
+    assert (usage.row('NC_045512.2') == genome_counts(f"genome/NC_045512.2.fasta")).all()
+
+    # An edited genome is counted again, the other one is left alone
+    fasta = os.path.join(directory, 'NC_001542.1.fasta')
+    with open(fasta, 'r+b') as f:
+        data = f.read()
+        f.seek(data.index(b'ATG', data.index(b'\n')))     # First start codon, now a STOP
+        f.write(b'TAG')
+    assert usage.update(workers=1) == ['NC_001542.1']
+    assert (usage.row('NC_001542.1') == genome_counts(fasta)).all()
+    assert (usage.row('NC_001542.1') != genome_counts('genome/NC_001542.1.fasta')).any()
+
+    # Rows added from a sequence have no digest and are recounted from their file
+    usage.add('NC_045512.2', 'ATGAAATAA')
+    assert usage.row('NC_045512.2').sum() == codon_counts('ATGAAATAA')[1].sum()
+    assert usage.update(workers=1) == ['NC_045512.2']
+    assert (usage.row('NC_045512.2') == genome_counts('genome/NC_045512.2.fasta')).all()
+
+# Known values: uniform usage has every RSCU at 1 and the full 61 effective codons,
+# a single codon per amino acid leaves 20 and an RSCU equal to the size of its family
+uniform = np.where(SENSE, 1000, 0)
+assert enc(uniform)[0] == 61.0 and np.allclose(rscu(uniform)[0][SENSE], 1.0)
+single = np.zeros(64, dtype=np.int64)
+for family in FAMILIES:
+    if family != '*':
+        single[CODONS[:64].index(family)] = 50
+assert enc(single)[0] == 20.0
+assert [rscu(single)[0][CODONS[:64].index(f)] for f in FAMILIES if f != '*'] == [CODONS[:64].count(f) for f in FAMILIES if f != '*']
+
+# GC3 over sense codons only: ATG GCC GCA AAG TTT then the TAA stop, 3 of 5 end in G or C
+(starts, ends), counts = codon_counts('CCATGGCCGCAAAGTTTTAACC')
+assert (list(starts), list(ends)) == ([2], [20]) and counts.sum() == 6 and gc3(counts.sum(axis=0))[0] == 0.6
+print("Codon usage follows genome content")
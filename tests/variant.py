@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import sys
+sys.path.append('../CHIMERA')
+
+import random, time
+from chimera.fasta import FastaIO
+from chimera.translate import CODONS, codon_index, encode_bases
+from chimera.variant import diff, genes
+
+# Plant SNPs and indels in a real genome and recover them
+FASTA = FastaIO('NC_045512.2')
+genome = FASTA.genome
+rng = random.Random(0)
+mutant = list(genome)
+planted = sorted(rng.sample(range(100, len(genome) - 100, 60), 200))
+planted = [p for i, p in enumerate(planted) if i == 0 or p - planted[i-1] > 20]
+for p in planted:
+    mutant[p] = rng.choice([b for b in 'ACGT' if b != genome[p]])
+mutant = ''.join(mutant)
+mutant = mutant[:5000] + mutant[5003:12000] + 'GT' + mutant[12000:]
+
+t0 = time.perf_counter()
+variants, summary = diff(genome, mutant)
+t1 = time.perf_counter()
+print(f"Variants: {len(variants)} | Genes: {len(summary)} | {t1-t0:.3f}s")
+
+snps = [v for v in variants if v.kind == 'SNP']
+assert [v.pos1 for v in snps] == [p for p in planted if not 5000 <= p < 5003], "SNP positions"
+assert sum(v.kind == 'DEL' and len(v.ref) == 3 for v in variants) == 1
+assert sum(v.kind == 'INS' and v.alt == 'GT' for v in variants) == 1
+
+# Every coding SNP agrees with a codon-by-codon translation of both genomes
+starts, ends = genes(encode_bases(genome))
+for v in snps:
+    if v.gene < 0:
+        continue
+    s = v.pos1 - (v.pos1 - starts[v.gene]) % 3
+    ref = CODONS[codon_index(genome[s: s+3])]
+    alt = ''.join(mutant[v.pos2 - (v.pos1 - s) + i] for i in range(3))
+    alt = CODONS[codon_index(alt)]
+    assert (v.ref_aa, v.alt_aa) == (ref, alt)
+    assert v.effect == ('synonymous' if ref == alt else 'non-synonymous')
+print("Planted variants recovered")
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+
+import argparse, sys
+import numpy as np
+import pandas as pd
+from chimera.fasta import FastaIO
+from chimera.protein import ProteinAnalyzer
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-uid', type=str, default='NC_001542.1')
+parser.add_argument('-min_length', type=int, default=20, help='Shortest peptide to include')
+parser.add_argument('-step', type=float, default=0.1, help='pH resolution of the curves')
+parser.add_argument('-output', type=str, default='titration.csv')
+args = parser.parse_args(sys.argv[1:])
+
+FASTA = FastaIO(args.uid)
+peptides = [(pid, p) for pid, p in enumerate(filter(None, FASTA.res.split('*'))) if len(p) >= args.min_length]
+analyzer = ProteinAnalyzer([p for _, p in peptides])
+
+# Net Charge Graph: one column of charge per peptide against the pH grid
+pH, curves = analyzer.titration_curve(np.arange(0.0, 14.0 + args.step / 2, args.step))
+frame = pd.DataFrame(curves.T, columns=[f"peptide_{pid}" for pid, _ in peptides])
+frame.insert(0, 'pH', pH)
+frame.to_csv(args.output, index=False, float_format='%.4f')
+
+print(FASTA.label)
+for (pid, peptide), pI, net in zip(peptides, analyzer.isoelectric_point(), analyzer.net_charge(7.0)):
+    print(f"Sequence ID: {pid} | Length: {len(peptide)} | Theoretical pI: {pI:.2f} | Net Charge (pH = 7.0): {net:.2f}")
+print(f"{len(peptides)} titration curves ({len(pH)} points) written to {args.output}")
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+import argparse, sys
+import numpy as np
+import pandas as pd
+from chimera.fasta import FastaIO
+from chimera.translate import CODONS
+from chimera.usage import CodonUsage, NAMES, codon_counts, enc, gc3, rscu
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-uid', type=str, default=None, help='Codon table and per-gene statistics of one genome')
+parser.add_argument('-min_codons', type=int, default=100, help='Shortest gene to report')
+parser.add_argument('-workers', type=int, default=None)
+parser.add_argument('-output', type=str, default='codon_usage.csv', help='Library matrix (genomes x 64 codons)')
+args = parser.parse_args(sys.argv[1:])
+
+if args.uid:
+    FASTA = FastaIO(args.uid)
+    (starts, ends), counts = codon_counts(FASTA.genome)
+    total = counts.sum(axis=0)
+    print(FASTA.label)
+    print(f"Genes: {len(starts)} | Codons: {total.sum()} | ENC: {enc(total)[0]:.2f} | GC3: {gc3(total)[0]*100:.2f} %")
+    relative = rscu(total)[0]
+    for i in np.argsort([CODONS[i] for i in range(64)], kind='stable'):
+        print(f"{NAMES[i]} | {CODONS[i]} | {total[i]:>6} | {total[i] * 1000 / max(total.sum(), 1):6.2f} /1000 | RSCU: {relative[i]:.2f}")
+    for g, (s, e) in enumerate(zip(starts, ends)):
+        if (e - s) // 3 >= args.min_codons:
+            print(f"Gene: {s+1}-{e} | Codons: {(e - s) // 3} | ENC: {enc(counts[g])[0]:.2f} | GC3: {gc3(counts[g])[0]*100:.2f} %")
+else:
+    usage = CodonUsage.open(workers=args.workers)
+    usage.save()
+    frame = pd.DataFrame(usage.counts, index=usage.uids, columns=NAMES)
+    frame['enc'], frame['gc3'] = usage.enc(), usage.gc3()
+    frame.sort_index().to_csv(args.output, index_label='uid', float_format='%.4f')
+    for uid, nc, g in zip(usage.uids, usage.enc(), usage.gc3()):
+        print(f"{uid} | Codons: {usage.row(uid).sum()} | ENC: {nc:.2f} | GC3: {g*100:.2f} %")
+    print(f"{len(usage.uids)} genomes written to {args.output}")
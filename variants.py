@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+import argparse, collections, sys
+import pandas as pd
+from chimera.fasta import FastaIO
+from chimera.variant import diff
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-uid', nargs=2, type=str, default=['NC_045512.2', 'MN996532.2'], help='Reference and compared genome')
+parser.add_argument('-k', type=int, default=15, help='Anchor k-mer length')
+parser.add_argument('-output', type=str, default=None, help='Write the variants to CSV')
+parser.add_argument('-quiet', action='store_true', help='Only print the summary')
+args = parser.parse_args(sys.argv[1:])
+
+ref, alt = FastaIO(args.uid[0], lazy=True), FastaIO(args.uid[1], lazy=True)
+variants, genes = diff(ref.genome, alt.genome, args.k)
+
+print(f"Reference: {ref.label}")
+print(f"Compared: {alt.label}")
+counts = collections.Counter((v.kind, v.effect) for v in variants)
+print(" | ".join(f"{kind} {effect}: {n}" for (kind, effect), n in sorted(counts.items())))
+
+for g, gene in enumerate(genes):
+    print(f"Gene {g}: {gene.start+1}-{gene.end} | Codons: {gene.codons} | Synonymous: {gene.synonymous}",
+          f"| Non-synonymous: {gene.nonsynonymous} | Frameshifts: {gene.frameshifts}",
+          f"| dN: {gene.dn:.4f} | dS: {gene.ds:.4f} | dN/dS: {gene.ratio:.3f}")
+
+if not args.quiet:
+    for v in variants:
+        change = f"{v.ref_aa} > {v.alt_aa}" if v.ref_aa else ''
+        print(f"{v.kind} | {v.pos1+1} | {v.pos2+1} | {v.ref or '-'} > {v.alt or '-'} | {v.effect} {change}")
+
+if args.output:
+    pd.DataFrame(variants, columns=variants[0]._fields if variants else None).to_csv(args.output, index=False)